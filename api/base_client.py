@@ -1,15 +1,29 @@
 import logging
-from typing import Optional
+from typing import Any, Iterator, Optional, Type
 
 import requests
 
 from api.auth import AuthStrategy, NoAuth
+from api.json_backend import JSONBackend, ModelT, decode_models, get_backend
+from api.streaming import iter_json_array
+from api.transport import HTTPTransport, Transport
+from api.utils import check_response
+
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class BaseClient:
-    def __init__(self, base_url: str, auth_strategy: Optional[AuthStrategy] = None):
+    def __init__(
+        self,
+        base_url: str,
+        auth_strategy: Optional[AuthStrategy] = None,
+        json_backend: Optional[JSONBackend] = None,
+        transport: Optional[Transport] = None,
+    ):
         self._base_url = base_url
         self._auth_strategy = auth_strategy or NoAuth()
+        self._json = json_backend or get_backend()
+        self._transport = transport or HTTPTransport()
         self._default_headers = {
             "Accept": "application/json",
         }
@@ -24,10 +38,14 @@ class BaseClient:
         path: str,
         headers: dict | None = None,
         auth: bool = True,
+        stream: bool = False,
         **kwargs,
     ):
         """
         Handles HTTP requests.
+
+        With ``stream=True`` the body is not read up front; the caller must consume or
+        close the response.
         """
         url = f"{self._base_url}{path}"
 
@@ -46,7 +64,7 @@ class BaseClient:
             f"\n\tData: {kwargs}"
         )
 
-        response = session.send(prepared_request)
+        response = self._transport.send(session, prepared_request, stream=stream)
 
         response.raise_for_status()
         return response
@@ -62,3 +80,34 @@ class BaseClient:
         Makes a POST request.
         """
         return self._make_request("post", url, params=params, auth=auth)
+
+    def decode(self, response: requests.Response) -> Any:
+        """
+        Decodes a response body with the client's JSON backend.
+        """
+        return self._json.loads(response.content)
+
+    def get_models(
+        self, url, model: Type[ModelT], params: dict = None, auth: bool = True
+    ) -> list[ModelT]:
+        """
+        Makes a GET request and validates the items of the response's ``data`` array
+        as *model*, decoded with the client's JSON backend.
+        """
+        response = self._make_request("get", url, params=params, auth=auth)
+        check_response(response)
+        return decode_models(response.content, model, self._json)
+
+    def iter_data(
+        self, url, params: dict = None, auth: bool = True, key: str = "data"
+    ) -> Iterator[Any]:
+        """
+        Makes a streaming GET request and yields the items of the response's *key* array
+        one by one, decoding the body incrementally as it arrives.
+        """
+        response = self._make_request("get", url, params=params, auth=auth, stream=True)
+        try:
+            check_response(response)
+            yield from iter_json_array(response.iter_content(STREAM_CHUNK_SIZE), key)
+        finally:
+            response.close()
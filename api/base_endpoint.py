@@ -12,3 +12,6 @@ class BaseEndpoint:
 
         self._get = client.get
         self._post = client.post
+        self._get_models = client.get_models
+        self._iter_data = client.iter_data
+        self._decode = client.decode
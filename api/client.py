@@ -1,6 +1,7 @@
 from api.auth import QueryParamAuth
 from api.base_client import BaseClient
 from api.endpoints import Shops, Products, Auth
+from api.transport import Transport
 
 AUTH_PARAM_NAME = "sessionId"
 
@@ -10,19 +11,29 @@ class BoskoAPI(BaseClient):
     products: Products
     _auth: Auth
 
-    def __init__(self, token: str | None = None, base_url: str | None = None):
+    def __init__(
+        self,
+        token: str | None = None,
+        base_url: str | None = None,
+        transport: Transport | None = None,
+    ):
         self._base_url = base_url or "https://bosko.getloyalty.me"
         self._token = token
 
         super().__init__(
             self._base_url,
             auth_strategy=QueryParamAuth(self._token, param_name=AUTH_PARAM_NAME),
+            transport=transport,
         )
 
         self.shops = Shops(self)
         self.products = Products(self)
         self._auth = Auth(self)
 
+    @property
+    def token(self) -> str | None:
+        return self._token
+
     def set_token(self, token: str):
         """
         Set the session token for the API client.
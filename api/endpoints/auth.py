@@ -27,7 +27,7 @@ class Auth(BaseEndpoint):
 
         check_response(response)
 
-        data = response.json().get("data", None)
+        data = self._decode(response).get("data", None)
 
         if not data:
             raise ValueError("Login failed, no data returned.")
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List
 
 from api.base_endpoint import BaseEndpoint
 from api.models.product import Product, BaseProduct
@@ -20,13 +20,28 @@ class Products(BaseEndpoint):
             List[Product]: A list of Product objects representing the products at the specified shop.
         """
         endpoint = "/JSON/Products/getAll"
-        params = {"shopId": shop_id, "limit": limit, "current_page": current_page}
-        response = self._get(endpoint, params=params)
+        params = {"shopId": shop_id, "limit": limit, "currentPage": current_page}
 
-        check_response(response)
+        return self._get_models(endpoint, Product, params=params)
+
+    def iter_at_shop(
+        self, shop_id: int, limit: int | None = None, current_page: int | None = None
+    ) -> Iterator[Product]:
+        """
+        Stream the products available at a specific shop, yielding them one at a time.
+
+        Args:
+            shop_id (int): The ID of the shop to fetch products from.
+            limit (int | None): The maximum number of products to return. If None, returns all products.
+            current_page (int | None): The page number to return. If None, returns the first page.
+        Returns:
+            Iterator[Product]: Product objects, in response order.
+        """
+        endpoint = "/JSON/Products/getAll"
+        params = {"shopId": shop_id, "limit": limit, "currentPage": current_page}
 
-        data = response.json().get("data", [])
-        return [Product(**item) for item in data]
+        for item in self._iter_data(endpoint, params=params):
+            yield Product(**item)
 
     def search(
         self,
@@ -45,13 +60,31 @@ class Products(BaseEndpoint):
             List[BaseProduct]: A list of BaseProduct objects matching the search criteria.
         """
         endpoint = "/JSON/Products/search"
-        params = {"phrase": query, "limit": limit, "current_page": current_page}
-        response = self._get(endpoint, params=params)
+        params = {"phrase": query, "limit": limit, "currentPage": current_page}
 
-        check_response(response)
+        return self._get_models(endpoint, BaseProduct, params=params)
+
+    def iter_search(
+        self,
+        query: str | None = None,
+        limit: int | None = None,
+        current_page: int | None = None,
+    ) -> Iterator[BaseProduct]:
+        """
+        Stream search results, yielding them one at a time.
+
+        Args:
+            query (str | None): The search query. If None, returns all products.
+            limit (int | None): The maximum number of products to return. If None, returns all products.
+            current_page (int | None): The page number to return. If None, returns the first page.
+        Returns:
+            Iterator[BaseProduct]: BaseProduct objects matching the search criteria.
+        """
+        endpoint = "/JSON/Products/search"
+        params = {"phrase": query, "limit": limit, "currentPage": current_page}
 
-        data = response.json().get("data", [])
-        return [BaseProduct(**item) for item in data]
+        for item in self._iter_data(endpoint, params=params):
+            yield BaseProduct(**item)
 
     def mark_as_favourite(self, product_id: int, is_favourite: bool = True) -> None:
         """
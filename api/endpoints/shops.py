@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List
 
 from api.base_endpoint import BaseEndpoint
 from api.models.shop import Shop
@@ -21,12 +21,27 @@ class Shops(BaseEndpoint):
         endpoint = "/JSON/Shops/getAll"
         params = {"limit": limit, "currentPage": current_page}
 
-        response = self._get(endpoint, params=params)
+        return self._get_models(endpoint, Shop, params=params)
 
-        check_response(response)
+    def iter_all(
+        self, limit: int | None = None, current_page: int | None = None
+    ) -> Iterator[Shop]:
+        """
+        Stream all stores from the API, validating and yielding them one at a time.
+
+        Unlike :meth:`get_all`, the response body is never held in memory whole.
+
+        Args:
+            limit (int | None): The maximum number of stores to return. If None, returns all stores.
+            current_page (int | None): The page number to return. If None, returns the first page.
+        Returns:
+            Iterator[Shop]: Shop objects, in response order.
+        """
+        endpoint = "/JSON/Shops/getAll"
+        params = {"limit": limit, "currentPage": current_page}
 
-        data = response.json().get("data", [])
-        return [Shop(**item) for item in data]
+        for item in self._iter_data(endpoint, params=params):
+            yield Shop(**item)
 
     def mark_as_favourite(self, shop_id: int, is_favourite: bool = True) -> None:
         """
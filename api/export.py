@@ -0,0 +1,297 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, TextIO
+
+from api.client import BoskoAPI
+from api.models.product import Product
+from api.models.shop import Shop
+
+SHOP_FIELDS = (
+    "shop_id",
+    "name",
+    "city",
+    "address",
+    "latitude",
+    "longitude",
+    "has_garden",
+)
+PRODUCT_FIELDS = (
+    "shop_id",
+    "product_id",
+    "name",
+    "description",
+    "price",
+    "is_available_in_shop",
+    "is_available_in_garden",
+    "photo_url",
+)
+STATE_FILE = "export-state.json"
+
+Writer = Callable[[str, tuple[str, ...], Iterable[dict]], None]
+
+
+# ── Row mapping ─────────────────────────────────────────────────────
+
+
+def _shop_rows(shops: list[Shop]) -> Iterator[dict]:
+    for shop in shops:
+        yield {
+            "shop_id": shop.id,
+            "name": shop.name,
+            "city": shop.city.name,
+            "address": shop.address,
+            "latitude": shop.latitude,
+            "longitude": shop.longitude,
+            "has_garden": shop.hasGarden,
+        }
+
+
+def _product_rows(shop_id: int, products: list[Product]) -> Iterator[dict]:
+    for product in products:
+        yield {
+            "shop_id": shop_id,
+            "product_id": product.id,
+            "name": product.name,
+            "description": product.description,
+            "price": product.price,
+            "is_available_in_shop": product.isAvailableInShop,
+            "is_available_in_garden": product.isAvailableInGarden,
+            "photo_url": str(product.photo.url),
+        }
+
+
+def inventory_digest(products: list[Product]) -> str:
+    """
+    Fingerprint a shop's product list, independent of the order the API returns it in.
+
+    Args:
+        products (list[Product]): The shop's products.
+    Returns:
+        str: A hex digest that changes whenever any exported field changes.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for row in sorted(_product_rows(0, products), key=lambda row: row["product_id"]):
+        digest.update(json.dumps(row, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+# ── Writers ─────────────────────────────────────────────────────────
+
+
+def _write_jsonl(path: str, fields: tuple[str, ...], rows: Iterable[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        for row in rows:
+            file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def _write_csv(path: str, fields: tuple[str, ...], rows: Iterable[dict]) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _parquet_writer() -> Writer:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from None
+
+    def write(path: str, fields: tuple[str, ...], rows: Iterable[dict]) -> None:
+        rows = list(rows)
+        columns = {field: [row[field] for row in rows] for field in fields}
+        pyarrow.parquet.write_table(pyarrow.table(columns), path)
+
+    return write
+
+
+def get_writer(fmt: str) -> Writer:
+    """
+    Return the row writer for an export format.
+
+    Args:
+        fmt (str): "jsonl", "csv" or "parquet" (which requires pyarrow).
+    Returns:
+        Writer: A function writing ``rows`` with columns ``fields`` to ``path``.
+    """
+    if fmt == "jsonl":
+        return _write_jsonl
+    if fmt == "csv":
+        return _write_csv
+    if fmt == "parquet":
+        return _parquet_writer()
+    raise ValueError(f"Unknown export format {fmt!r}, expected jsonl, csv or parquet")
+
+
+def _write_atomic(writer: Writer, path: str, fields, rows) -> int:
+    """Write to a temporary file, then move it into place; returns the size written."""
+    tmp_path = f"{path}.tmp"
+    writer(tmp_path, fields, rows)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+# ── Export ──────────────────────────────────────────────────────────
+
+
+@dataclass
+class ExportStats:
+    shops: int = 0
+    written: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    failed: int = 0
+    products: int = 0
+    bytes_written: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def done(self) -> int:
+        return self.written + self.unchanged + self.failed
+
+    def summary(self) -> str:
+        rate = self.done / self.elapsed if self.elapsed else 0.0
+        return (
+            f"{self.done}/{self.shops} shops ({self.written} written, "
+            f"{self.unchanged} unchanged, {self.failed} failed), "
+            f"{self.products:,} products, {self.bytes_written / 2**20:.1f} MiB "
+            f"in {self.elapsed:.1f}s ({rate:.1f} shops/s)"
+        )
+
+
+class _Progress:
+    def __init__(self, stats: ExportStats, stream: TextIO | None, interval: float):
+        self._stats = stats
+        self._stream = stream
+        self._interval = interval
+        self._started = time.perf_counter()
+        self._last = self._started
+
+    def update(self, final: bool = False) -> None:
+        now = time.perf_counter()
+        self._stats.elapsed = now - self._started
+        if self._stream is None or (not final and now - self._last < self._interval):
+            return
+        self._last = now
+        print(("done: " if final else "") + self._stats.summary(), file=self._stream)
+
+
+def _fetch_products(api: BoskoAPI, shop_id: int) -> list[Product]:
+    # Streamed: a worker holds the shop's products, not also its raw response body
+    return list(api.products.iter_at_shop(shop_id))
+
+
+def _load_state(path: str) -> dict[str, str]:
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def export_catalog(
+    api: BoskoAPI,
+    output_dir: str,
+    fmt: str = "jsonl",
+    concurrency: int = 8,
+    incremental: bool = False,
+    progress: TextIO | None = sys.stderr,
+    progress_interval: float = 2.0,
+) -> ExportStats:
+    """
+    Export every shop and its current product list.
+
+    Writes ``shops.<fmt>`` and one ``products/<shop_id>.<fmt>`` file per shop into
+    *output_dir*. Product lists are fetched by *concurrency* worker threads and each is
+    written as soon as it arrives, so at most a few lists are held in memory at once.
+    Every file is replaced atomically, and the inventory digest of each shop is kept in
+    ``export-state.json``.
+
+    Args:
+        api (BoskoAPI): An authenticated API client.
+        output_dir (str): The directory to export into (created if missing).
+        fmt (str): "jsonl", "csv" or "parquet". Defaults to "jsonl".
+        concurrency (int): Product lists fetched at once. Defaults to 8.
+        incremental (bool): Only rewrite the files of shops whose inventory changed
+            since the last export, and delete those of shops that no longer exist.
+        progress (TextIO | None): Where to report progress and throughput, or None.
+        progress_interval (float): Seconds between progress reports.
+    Returns:
+        ExportStats: Counts of shops written, unchanged and failed, and throughput.
+    """
+    writer = get_writer(fmt)
+    products_dir = os.path.join(output_dir, "products")
+    os.makedirs(products_dir, exist_ok=True)
+    state_path = os.path.join(output_dir, STATE_FILE)
+    previous = _load_state(state_path) if incremental else {}
+
+    shops = list(api.shops.iter_all())
+    stats = ExportStats(shops=len(shops))
+    stats.bytes_written += _write_atomic(
+        writer, os.path.join(output_dir, f"shops.{fmt}"), SHOP_FIELDS, _shop_rows(shops)
+    )
+    reporter = _Progress(stats, progress, progress_interval)
+
+    state: dict[str, str] = {}
+
+    def handle(shop: Shop, products: list[Product]) -> None:
+        key = str(shop.id)
+        path = os.path.join(products_dir, f"{shop.id}.{fmt}")
+        state[key] = inventory_digest(products)
+        stats.products += len(products)
+        if previous.get(key) == state[key] and os.path.exists(path):
+            stats.unchanged += 1
+            return
+        stats.bytes_written += _write_atomic(
+            writer, path, PRODUCT_FIELDS, _product_rows(shop.id, products)
+        )
+        stats.written += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = {}
+        queued = iter(shops)
+        while True:
+            # Keep a bounded window of fetches in flight
+            while len(pending) < 2 * concurrency:
+                shop = next(queued, None)
+                if shop is None:
+                    break
+                pending[pool.submit(_fetch_products, api, shop.id)] = shop
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                shop = pending.pop(future)
+                try:
+                    handle(shop, future.result())
+                except Exception:
+                    logging.warning(f"Export of shop {shop.id} failed", exc_info=True)
+                    stats.failed += 1
+                    # Its file from the last export, if any, is left in place
+                    if str(shop.id) in previous:
+                        state[str(shop.id)] = previous[str(shop.id)]
+            reporter.update()
+
+    if incremental:
+        current = {str(shop.id) for shop in shops}
+        for key in set(previous) - current:
+            path = os.path.join(products_dir, f"{key}.{fmt}")
+            if os.path.exists(path):
+                os.remove(path)
+            stats.removed += 1
+
+    tmp_state = f"{state_path}.tmp"
+    with open(tmp_state, "w", encoding="utf-8") as file:
+        json.dump(state, file, sort_keys=True)
+    os.replace(tmp_state, state_path)
+
+    reporter.update(final=True)
+    return stats
@@ -0,0 +1,95 @@
+import json
+import os
+from functools import lru_cache
+from typing import Any, Callable, Generic, NamedTuple, Optional, Type, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Backend names in order of preference when none is configured
+PREFERENCE = ("pydantic", "orjson", "msgspec", "json")
+
+
+class JSONBackend(NamedTuple):
+    name: str
+    loads: Callable[[bytes], Any]
+    # Parses bytes straight into validated models (pydantic-core), instead of loads()
+    # followed by validation of the resulting dicts
+    typed: bool = False
+
+
+def _load(name: str) -> Optional[JSONBackend]:
+    """Return the backend called *name*, or ``None`` if its package isn't installed."""
+    if name == "pydantic":
+        from pydantic_core import from_json
+
+        return JSONBackend("pydantic", from_json, typed=True)
+    if name == "orjson":
+        try:
+            import orjson
+        except ImportError:
+            return None
+        return JSONBackend("orjson", orjson.loads)
+    if name == "msgspec":
+        try:
+            import msgspec
+        except ImportError:
+            return None
+        return JSONBackend("msgspec", msgspec.json.Decoder().decode)
+    if name == "json":
+        return JSONBackend("json", json.loads)
+    raise ValueError(f"Unknown JSON backend {name!r}, expected one of {PREFERENCE}")
+
+
+@lru_cache(maxsize=None)
+def get_backend(name: Optional[str] = None) -> JSONBackend:
+    """
+    Return a JSON decoding backend.
+
+    Args:
+        name (str | None): "pydantic", "orjson", "msgspec" or "json". If None, uses
+            the ``BOSKO_JSON_BACKEND`` environment variable, or else "pydantic".
+    Returns:
+        JSONBackend: The backend's name, its ``loads`` function and whether it
+            decodes models in one pass.
+    """
+    name = name or os.getenv("BOSKO_JSON_BACKEND")
+    if name:
+        backend = _load(name)
+        if backend is None:
+            raise ImportError(f"JSON backend {name!r} is not installed")
+        return backend
+    return next(b for b in map(_load, PREFERENCE) if b is not None)
+
+
+class _Envelope(BaseModel, Generic[ModelT]):
+    data: Optional[list[ModelT]] = None
+
+
+@lru_cache(maxsize=None)
+def _envelope_adapter(model: Type[ModelT]) -> TypeAdapter:
+    return TypeAdapter(_Envelope[model])
+
+
+def decode_models(
+    body: bytes, model: Type[ModelT], backend: Optional[JSONBackend] = None
+) -> list[ModelT]:
+    """
+    Decode a ``{"data": [...]}`` response body into a list of *model*.
+
+    With the "pydantic" backend, pydantic-core parses and validates the bytes in one
+    pass, without building the intermediate dicts; other backends parse first.
+
+    Args:
+        body (bytes): The raw response body.
+        model (Type[BaseModel]): The item model, e.g. ``Shop`` or ``Product``.
+        backend (JSONBackend | None): Defaults to :func:`get_backend`.
+    Returns:
+        list[BaseModel]: The validated items (empty if ``data`` is missing or null).
+    """
+    backend = backend or get_backend()
+    adapter = _envelope_adapter(model)
+    if backend.typed:
+        return adapter.validate_json(body).data or []
+    return adapter.validate_python(backend.loads(body)).data or []
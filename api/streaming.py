@@ -0,0 +1,106 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Buffer:
+    """Text buffer over a stream of byte chunks, refilled on demand."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next chunk; ``False`` once the stream is exhausted."""
+        if self.eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.text += self._utf8.decode(b"", final=True)
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer holds at most ~one item
+        self.text = self.text[self.pos :] + self._utf8.decode(chunk)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character (consuming the whitespace), ``""`` at the end."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(
+                f"Malformed JSON stream: expected one of {chars!r}, got {char!r}"
+            )
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more chunks as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A value ending exactly at the buffer end may be truncated (e.g. a number)
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str = "data") -> Iterator[Any]:
+    """
+    Incrementally decode the array under *key* of a top-level JSON object.
+
+    Items are yielded one at a time as soon as they have been read, so only the
+    current item (plus one network chunk) is held in memory rather than the whole
+    response body and its decoded tree. Other top-level values are skipped; if *key*
+    is missing or ``null``, nothing is yielded.
+
+    Args:
+        chunks (Iterable[bytes]): The response body, e.g. ``response.iter_content()``.
+        key (str): The top-level key holding the array. Defaults to ``"data"``.
+    Returns:
+        Iterator[Any]: The decoded array items.
+    """
+    buffer = _Buffer(chunks)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+
+    while True:
+        name = buffer.value()
+        buffer.expect(":")
+        if name == key and buffer.peek() == "[":
+            buffer.expect("[")
+            if buffer.peek() != "]":
+                while True:
+                    yield buffer.value()
+                    if buffer.expect(",]") == "]":
+                        break
+            else:
+                buffer.expect("]")
+        else:
+            buffer.value()
+
+        if buffer.expect(",}") == "}":
+            return
@@ -0,0 +1,171 @@
+import atexit
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import requests
+
+# Query parameters and response payloads never written to a cassette
+SCRUBBED_PARAMS = ("sessionId", "email", "password")
+SCRUBBED_RESPONSES = ("/JSON/Authorization/login",)
+SCRUBBED = "scrubbed"
+
+
+class Transport(ABC):
+    @abstractmethod
+    def send(
+        self,
+        session: requests.Session,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+    ) -> requests.Response:
+        """
+        Send a prepared request and return its response.
+        """
+        pass
+
+
+class HTTPTransport(Transport):
+    def send(
+        self,
+        session: requests.Session,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+    ) -> requests.Response:
+        return session.send(request, stream=stream)
+
+
+def _exchange_key(method: str, url: str) -> str:
+    """
+    ``"GET /path?query"`` with credentials scrubbed and the query sorted, so a request
+    matches its recording whatever the base URL, session or parameter order.
+    """
+    parsed = urlparse(url)
+    query = sorted(
+        (name, SCRUBBED if name in SCRUBBED_PARAMS else value)
+        for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+    )
+    return f"{method.upper()} {parsed.path}" + (f"?{urlencode(query)}" if query else "")
+
+
+def _scrub_body(path: str, body: bytes) -> bytes:
+    if path not in SCRUBBED_RESPONSES:
+        return body
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return body
+    if isinstance(payload, dict) and payload.get("data"):
+        payload["data"] = SCRUBBED
+    return json.dumps(payload).encode()
+
+
+class RecordingTransport(Transport):
+    """
+    Sends requests through another transport and appends every exchange to a cassette:
+    a gzip-compressed JSON Lines file with one request, its response and its timing per
+    line. Session IDs, credentials and login tokens are scrubbed before writing.
+    """
+
+    def __init__(self, path: str, transport: Transport | None = None):
+        self._path = path
+        self._transport = transport or HTTPTransport()
+        self._file = None
+        self._lock = threading.Lock()
+
+    def send(
+        self,
+        session: requests.Session,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+    ) -> requests.Response:
+        started = time.perf_counter()
+        response = self._transport.send(session, request, stream=stream)
+        body = response.content  # streamed responses are replayed from this buffer
+        elapsed = time.perf_counter() - started
+
+        key = _exchange_key(request.method, request.url)
+        exchange = {
+            "request": key,
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type"),
+            "elapsed": round(elapsed, 6),
+            "body": _scrub_body(urlparse(request.url).path, body).decode(
+                "utf-8", "surrogateescape"
+            ),
+        }
+        line = json.dumps(exchange, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+                # Appending adds a gzip member; readers see one continuous stream
+                self._file = gzip.open(self._path, "at", encoding="utf-8")
+                atexit.register(self.close)
+            self._file.write(line)
+        return response
+
+    def close(self) -> None:
+        """
+        Flush and close the cassette.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ReplayTransport(Transport):
+    """
+    Answers requests from a cassette written by :class:`RecordingTransport`, without any
+    network access.
+
+    Recordings of the same request are replayed in their original order; once they run
+    out, the last one keeps being served. Each response is delayed by its recorded
+    latency multiplied by *time_scale* (``0`` answers immediately).
+    """
+
+    def __init__(self, path: str, time_scale: float = 1.0):
+        self._time_scale = time_scale
+        self._exchanges: dict[str, deque] = defaultdict(deque)
+        self._lock = threading.Lock()
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                exchange = json.loads(line)
+                self._exchanges[exchange["request"]].append(exchange)
+
+    def __len__(self) -> int:
+        return sum(len(recorded) for recorded in self._exchanges.values())
+
+    def send(
+        self,
+        session: requests.Session,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+    ) -> requests.Response:
+        key = _exchange_key(request.method, request.url)
+        with self._lock:
+            recorded = self._exchanges.get(key)
+            if not recorded:
+                raise LookupError(f"No recorded response for {key}")
+            exchange = recorded.popleft() if len(recorded) > 1 else recorded[0]
+
+        delay = exchange["elapsed"] * self._time_scale
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = exchange["status"]
+        if exchange["content_type"]:
+            response.headers["content-type"] = exchange["content_type"]
+        response.raw = io.BytesIO(exchange["body"].encode("utf-8", "surrogateescape"))
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=delay)
+        return response
@@ -0,0 +1,13 @@
+"""Benchmarks — run as ``python -m benchmarks.<name>``."""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+# Benchmarks import bot.services, which opens the flavor history store: keep it out of
+# ./data (the bot's own) unless a path is given explicitly
+if "HISTORY_DB_PATH" not in os.environ:
+    _tmp = tempfile.mkdtemp(prefix="bosko-bench-")
+    atexit.register(shutil.rmtree, _tmp, ignore_errors=True)
+    os.environ["HISTORY_DB_PATH"] = os.path.join(_tmp, "history.sqlite3")
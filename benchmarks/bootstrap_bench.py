@@ -0,0 +1,96 @@
+"""Bootstrap benchmark — building the flavor catalog from product lists vs. one search.
+
+Starting from cold caches against the stub API (simulated upstream latency), compares
+the start-up warm-up paths:
+
+* ``per shop`` — every shop's product list (the previous warm-up),
+* ``search``   — the whole catalog through the paginated search endpoint, plus the
+  product lists of the shops that are someone's favorite (``--favorite-shops``),
+
+then runs ``--queries`` flavor searches, as autocomplete and /add_favorite do, and
+reports the upstream requests, wall time and flavors known for each.
+
+Usage::
+
+    python -m benchmarks.bootstrap_bench --shops 400 --favorite-shops 40
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from api.client import BoskoAPI
+from benchmarks.stub_api import StubCatalog, StubTransport
+from bot import services
+from bot.catalog import FlavorCatalog
+from bot.warmup import warm_up_caches
+
+
+def _reset(catalog: StubCatalog, latency: float) -> StubTransport:
+    services.get_cached_shops.cache_clear()
+    services.get_products_at_shop.cache_clear()
+    services.get_catalog_products.cache_clear()
+    services._search_cache.clear()
+    services.catalog = FlavorCatalog(services.normalize)
+    transport = StubTransport(catalog, latency)
+    services._api = BoskoAPI(token="bench", transport=transport)
+    return transport
+
+
+async def bootstrap(path: str, shop_ids: list[int], favorites: list[int]) -> None:
+    if path == "per shop":
+        services.get_cached_shops()
+        await asyncio.gather(
+            *(asyncio.to_thread(services.get_products_at_shop, i) for i in shop_ids)
+        )
+    else:
+        await warm_up_caches(favorites)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shops", type=int, default=400)
+    parser.add_argument("--flavors", type=int, default=1500)
+    parser.add_argument("--favorite-shops", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--upstream-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    catalog = StubCatalog(shops=args.shops, flavors=args.flavors)
+    rng = random.Random(0)
+    favorites = rng.sample(catalog.shop_ids, args.favorite_shops)
+    queries = [
+        services.normalize(name)[: rng.randint(3, 8)]
+        for name in rng.choices(catalog.flavors, k=args.queries)
+    ]
+    print(
+        f"{args.shops} shops, {args.flavors} flavors, {args.favorite_shops} favorite "
+        f"shops, {args.upstream_latency * 1000:.0f} ms upstream latency\n"
+    )
+    print(
+        f"  {'path':<9} {'bootstrap':>10} {'requests':>9} {'flavors':>8}"
+        f"   {'searches':>9} {'requests':>9}"
+    )
+
+    for path in ("per shop", "search"):
+        transport = _reset(catalog, args.upstream_latency)
+        started = time.perf_counter()
+        asyncio.run(bootstrap(path, catalog.shop_ids, favorites))
+        elapsed = time.perf_counter() - started
+        bootstrap_calls = sum(transport.calls.values())
+        flavors = len(services.catalog)
+
+        started = time.perf_counter()
+        for query in queries:
+            services.cached_api_search(query)
+        searching = time.perf_counter() - started
+        search_calls = sum(transport.calls.values()) - bootstrap_calls
+        print(
+            f"  {path:<9} {elapsed:>9.2f}s {bootstrap_calls:>9} {flavors:>8}"
+            f"   {searching:>8.2f}s {search_calls:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Cache policy benchmark — sweep + random-access replay against LRU and W-TinyLFU.
+
+Replays the access pattern of ``/search_available`` sweeps (every shop in order) mixed
+with Zipf-distributed ``/products`` lookups, and compares the hit rate of the old
+``ttl_cache`` (LRU, 128 entries) with the size-bounded ``sized_ttl_cache`` at several
+memory budgets. Values are real ``Product`` lists from the stub catalog.
+
+Usage::
+
+    python -m benchmarks.cache_bench --shops 300 --sweeps 20
+"""
+
+import argparse
+import random
+
+from api.models.product import Product
+from benchmarks.stub_api import StubCatalog
+from bot.cache import approx_sizeof, sized_ttl_cache
+from bot.utils import ttl_cache
+
+
+def build_workload(shops: int, sweeps: int, lookups_per_sweep: int, seed: int):
+    rng = random.Random(seed)
+    shop_ids = list(range(1, shops + 1))
+    weights = [1 / rank for rank in range(1, shops + 1)]  # Zipf(1) popularity
+    popular = shop_ids[:]
+    rng.shuffle(popular)
+
+    workload = []
+    for _ in range(sweeps):
+        workload.extend(shop_ids)
+        workload.extend(rng.choices(popular, weights, k=lookups_per_sweep))
+    return workload
+
+
+def replay(cached_fn, loader, workload) -> float:
+    """Run *workload* through *cached_fn*; a hit is any access that didn't reach *loader*."""
+    for shop_id in workload:
+        cached_fn(shop_id)
+    return 1 - loader.calls / len(workload)
+
+
+def make_loader(catalog: StubCatalog):
+    def load(shop_id: int):
+        load.calls += 1
+        return [
+            Product(**catalog.product_payload(pid))
+            for pid in catalog.shop_product_ids(shop_id)
+        ]
+
+    load.calls = 0
+    return load
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shops", type=int, default=300)
+    parser.add_argument("--per-shop", type=int, default=30)
+    parser.add_argument("--sweeps", type=int, default=20)
+    parser.add_argument("--lookups-per-sweep", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    catalog = StubCatalog(shops=args.shops, per_shop=args.per_shop)
+    workload = build_workload(
+        args.shops, args.sweeps, args.lookups_per_sweep, args.seed
+    )
+    entry_bytes = approx_sizeof(make_loader(catalog)(1))
+    print(
+        f"{len(workload)} accesses over {args.shops} shops, "
+        f"~{entry_bytes / 1024:.0f} KiB per product list\n"
+    )
+
+    loader = make_loader(catalog)
+    lru_rate = replay(ttl_cache(max_age=3600)(loader), loader, workload)
+    print(f"  {'ttl_cache (LRU, 128 entries)':<42} hit rate {lru_rate:6.1%}")
+
+    for entries in (64, 128, 256, args.shops):
+        loader = make_loader(catalog)
+        budget = entries * entry_bytes
+        cached = sized_ttl_cache(max_age=3600, max_bytes=budget)(loader)
+        rate = replay(cached, loader, workload)
+        info = cached.cache_info()
+        label = f"sized_ttl_cache ({budget / 2**20:.1f} MiB ≈ {entries} lists)"
+        print(
+            f"  {label:<42} hit rate {rate:6.1%}  "
+            f"(entries={info.entries}, evictions={info.evictions}, "
+            f"rejections={info.rejections})"
+        )
+
+
+if __name__ == "__main__":
+    main()
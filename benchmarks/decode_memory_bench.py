@@ -0,0 +1,117 @@
+"""Decode memory benchmark — peak memory of ``Shops.get_all`` buffered vs. streamed.
+
+A ``Shops/getAll`` payload (default 1,000 shops from the stub catalog) is written to a
+file and served from disk, as a socket would deliver it, so the body is not resident
+unless the decode path reads it all. Each path runs in a fresh interpreter and reports
+its peak RSS growth and, in a second run, its ``tracemalloc`` peak:
+
+* ``buffered`` — the previous path: ``response.json()``, then a list of ``Shop`` models,
+* ``streamed`` — ``list(Shops.iter_all())`` (what the bot's shop list uses),
+* ``iterated`` — ``Shops.iter_all()`` consumed without keeping the models,
+* ``typed``    — ``Shops.get_all()``, validating the body bytes straight into models.
+
+Usage::
+
+    python -m benchmarks.decode_memory_bench --shops 1000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+PATHS = ("buffered", "streamed", "iterated", "typed")
+
+
+def _peak_rss_kib() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(payload_path: str, path: str, trace: bool) -> None:
+    import requests
+
+    from api.client import BoskoAPI
+    from api.models.shop import Shop
+
+    class FileBackedAPI(BoskoAPI):
+        def _make_request(self, method, url, headers=None, auth=True, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response.headers["content-type"] = "application/json; charset=utf-8"
+            response.raw = open(payload_path, "rb")
+            return response
+
+    api = FileBackedAPI(token="bench")
+    # Warm up imports and pydantic's validators
+    next(api.shops.iter_all())
+    api.shops.get_all()
+
+    if trace:
+        import tracemalloc
+
+        tracemalloc.start()
+    baseline = _peak_rss_kib()
+
+    if path == "buffered":
+        response = api.get("/JSON/Shops/getAll")
+        shops = [Shop(**item) for item in response.json().get("data", [])]
+        count = len(shops)
+    elif path == "streamed":
+        shops = list(api.shops.iter_all())
+        count = len(shops)
+    elif path == "iterated":
+        names = {shop.id: shop.name for shop in api.shops.iter_all()}
+        count = len(names)
+    else:
+        shops = api.shops.get_all()
+        count = len(shops)
+
+    result = {"count": count, "rss_kib": _peak_rss_kib() - baseline}
+    if trace:
+        result["traced_kib"] = tracemalloc.get_traced_memory()[1] // 1024
+    print(json.dumps(result))
+
+
+def _run(payload_path: str, path: str, trace: bool) -> dict:
+    args = [sys.executable, "-m", "benchmarks.decode_memory_bench"]
+    args += ["--child", payload_path, path] + (["--trace"] if trace else [])
+    out = subprocess.run(args, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shops", type=int, default=1000)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, trace=args.trace)
+        return
+
+    from benchmarks.stub_api import StubCatalog
+
+    catalog = StubCatalog(shops=args.shops)
+    with tempfile.TemporaryDirectory() as tmp:
+        payload_path = os.path.join(tmp, "shops.json")
+        with open(payload_path, "w") as file:
+            json.dump(catalog.respond("get", "/JSON/Shops/getAll", {}), file)
+        size = os.path.getsize(payload_path)
+        print(f"{args.shops} shops, {size / 2**20:.1f} MiB payload\n")
+        print(f"  {'path':<10} {'peak RSS growth':>16} {'tracemalloc peak':>17}")
+        for path in PATHS:
+            rss = _run(payload_path, path, trace=False)
+            traced = _run(payload_path, path, trace=True)
+            assert rss["count"] == traced["count"] == args.shops
+            print(
+                f"  {path:<10} {rss['rss_kib'] / 1024:>12.1f} MiB "
+                f"{traced['traced_kib'] / 1024:>13.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
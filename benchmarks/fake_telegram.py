@@ -0,0 +1,155 @@
+"""In-process fake of the Telegram Bot API, plugged in as a ``BaseRequest`` transport."""
+
+import asyncio
+import itertools
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from telegram import Update
+from telegram.request import BaseRequest, RequestData
+
+BOT_USER = {
+    "id": 1,
+    "is_bot": True,
+    "first_name": "Bosko",
+    "username": "bosko_load_test_bot",
+    "can_join_groups": False,
+    "can_read_all_group_messages": False,
+    "supports_inline_queries": True,
+}
+
+
+class FakeTelegramRequest(BaseRequest):
+    """Answers Bot API calls locally and reports every outgoing message.
+
+    Args:
+        on_send: Called as ``on_send(chat_id, method, parameters)`` for every method that
+            targets a chat (``sendMessage``, ``editMessageText``, ...).
+        latency: Simulated Bot API round-trip time in seconds.
+    """
+
+    def __init__(
+        self,
+        on_send: Callable[[int, str, dict], None] | None = None,
+        latency: float = 0.0,
+    ):
+        self._on_send = on_send
+        self._latency = latency
+        self._message_ids = itertools.count(1)
+        self._file_ids = itertools.count(1)
+        self.calls: dict[str, int] = {}
+
+    @property
+    def read_timeout(self) -> float | None:
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: RequestData | None = None,
+        read_timeout=None,
+        write_timeout=None,
+        connect_timeout=None,
+        pool_timeout=None,
+    ) -> tuple[int, bytes]:
+        endpoint = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data else {}
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+        if endpoint == "getUpdates":
+            await asyncio.sleep(1)
+            return 200, json.dumps({"ok": True, "result": []}).encode()
+        if self._latency:
+            await asyncio.sleep(self._latency)
+
+        result = self._result_for(endpoint, params)
+        if "chat_id" in params and self._on_send is not None:
+            self._on_send(int(params["chat_id"]), endpoint, params)
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+    def _message(self, params: dict, **extra: Any) -> dict:
+        chat_id = int(params.get("chat_id", 0))
+        return {
+            "message_id": params.get("message_id") or next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            **extra,
+        }
+
+    def _photo(self) -> list[dict]:
+        file_id = f"fake-file-{next(self._file_ids)}"
+        return [
+            {"file_id": file_id, "file_unique_id": file_id, "width": 640, "height": 640}
+        ]
+
+    def _result_for(self, endpoint: str, params: dict) -> Any:
+        if endpoint == "getMe":
+            return BOT_USER
+        if endpoint in ("sendMessage", "editMessageText"):
+            return self._message(params, text=params.get("text", ""))
+        if endpoint == "sendPhoto":
+            return self._message(params, photo=self._photo())
+        if endpoint == "sendMediaGroup":
+            media = params.get("media") or []
+            if isinstance(media, str):
+                media = json.loads(media)
+            return [self._message(params, photo=self._photo()) for _ in media]
+        return True
+
+
+class UpdateFactory:
+    """Builds synthetic private-chat ``Update`` objects for a given bot."""
+
+    def __init__(self, bot):
+        self._bot = bot
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+
+    def text(self, user_id: int, text: str) -> Update:
+        user = {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"}
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": user,
+            "text": text,
+        }
+        if text.startswith("/"):
+            command = text.split()[0]
+            message["entities"] = [
+                {"type": "bot_command", "offset": 0, "length": len(command)}
+            ]
+        return Update.de_json(
+            {"update_id": next(self._update_ids), "message": message}, self._bot
+        )
+
+    def callback(self, user_id: int, data: str, message_id: int) -> Update:
+        """A press of an inline button with *data* under the bot's message *message_id*."""
+        user = {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"}
+        message = {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": BOT_USER,
+            "text": "",
+        }
+        query = {
+            "id": str(next(self._update_ids)),
+            "from": user,
+            "chat_instance": str(user_id),
+            "message": message,
+            "data": data,
+        }
+        return Update.de_json(
+            {"update_id": next(self._update_ids), "callback_query": query}, self._bot
+        )
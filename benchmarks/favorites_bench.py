@@ -0,0 +1,120 @@
+"""Favorites benchmark — daily favorites checks via product lists vs. account favourites.
+
+Simulates a morning wave of daily checks for ``--users`` users with random favorite
+flavors and shops against the stub API (simulated upstream latency), starting with
+cold caches, and compares:
+
+* ``local``   — each favorite shop's product list, matched with the availability matrix,
+* ``account`` — favorites synced to the account with concurrent ``markAsFavourite``
+  calls, then one shop list with ``availableFavouriteProducts`` for every user,
+* ``next day`` — the account path again once the shop list has expired, with the
+  favourites already in sync.
+
+Both must find the same flavors; the benchmark reports upstream requests and wall time.
+
+Usage::
+
+    python -m benchmarks.favorites_bench --users 2000 --shops 200 --upstream-latency 0.02
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+from api.client import BoskoAPI
+from benchmarks.stub_api import StubCatalog, StubTransport
+from bot import services
+from bot.account_favorites import account_favorites, find_available
+from bot.formatting import format_flavor_name
+
+
+def make_users(catalog: StubCatalog, users: int, seed: int) -> list[tuple[list, list]]:
+    rng = random.Random(seed)
+    popular = catalog.flavors[:60]  # most users like the same few dozen flavors
+    return [
+        (
+            [
+                format_flavor_name(name)
+                for name in rng.sample(popular, rng.randint(1, 5))
+            ],
+            rng.sample(catalog.shop_ids, rng.randint(1, 4)),
+        )
+        for _ in range(users)
+    ]
+
+
+def _reset(catalog: StubCatalog, latency: float, cold: bool = True) -> StubTransport:
+    services.get_favorite_availability.cache_clear()
+    if cold:
+        services.get_cached_shops.cache_clear()
+        services.get_products_at_shop.cache_clear()
+        services._search_cache.clear()
+        services._product_ids.clear()
+    transport = StubTransport(catalog, latency)
+    services._api = BoskoAPI(token="bench", transport=transport)
+    return transport
+
+
+def check_local(users) -> list[set]:
+    found = []
+    for flavor_names, shop_ids in users:
+        for shop_id in shop_ids:
+            services.get_products_at_shop(shop_id)
+        flavor_ids = services.favorite_flavor_ids(flavor_names)
+        found.append(set(services.availability.match(flavor_ids, shop_ids)))
+    return found
+
+
+async def check_account(users) -> list[set]:
+    names = {name for flavor_names, _ in users for name in flavor_names}
+    product_ids = await asyncio.to_thread(services.favorite_product_ids, names)
+    await account_favorites.sync(product_ids)
+
+    found = []
+    for flavor_names, shop_ids in users:
+        flavor_ids = services.favorite_flavor_ids(flavor_names)
+        found.append(set(await find_available(flavor_names, flavor_ids, shop_ids)))
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--upstream-latency", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    catalog = StubCatalog(shops=args.shops)
+    users = make_users(catalog, args.users, args.seed)
+    print(
+        f"{args.users} users, {args.shops} shops, "
+        f"{args.upstream_latency * 1000:.0f} ms upstream latency\n"
+    )
+    print(f"  {'path':<8} {'wall time':>10} {'requests':>9}  by endpoint")
+
+    results = {}
+    for path in ("local", "account", "next day"):
+        transport = _reset(catalog, args.upstream_latency, cold=path != "next day")
+        started = time.perf_counter()
+        if path == "local":
+            results[path] = check_local(users)
+        else:
+            results[path] = asyncio.run(check_account(users))
+        elapsed = time.perf_counter() - started
+        calls: Counter = transport.calls
+        endpoints = ", ".join(
+            f"{name.rsplit('/JSON/', 1)[-1]}={count}"
+            for name, count in sorted(calls.items())
+        )
+        print(f"  {path:<8} {elapsed:>9.2f}s {sum(calls.values()):>9}  {endpoints}")
+
+    assert results["local"] == results["account"] == results["next day"]
+    matched = sum(1 for found in results["local"] if found)
+    print(f"\n  both paths found favorites in stock for {matched} users")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Decode + validate benchmark — JSON backends and the typed path across payload sizes.
+
+For ``Shops/getAll``, ``Products/getAll`` and ``Products/search`` payloads of several
+sizes from the stub catalog, times turning response bytes into validated models:
+
+* ``<backend>`` — :func:`api.json_backend.decode_models` with each installed backend
+  (``pydantic`` parses bytes straight to models, the others ``loads`` first),
+* ``streamed``  — :func:`api.streaming.iter_json_array`, then ``Model(**item)``.
+
+Usage::
+
+    python -m benchmarks.json_bench --repeat 5
+"""
+
+import argparse
+import json
+import time
+
+from api.json_backend import PREFERENCE, _load, decode_models
+from api.models.product import BaseProduct, Product
+from api.models.shop import Shop
+from api.streaming import iter_json_array
+from benchmarks.stub_api import StubCatalog
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _payloads(sizes: list[int]):
+    """``(label, body, model)`` for each endpoint and size."""
+    for size in sizes:
+        catalog = StubCatalog(shops=size, flavors=max(size, 30), per_shop=size)
+        for label, path, params, model in (
+            ("shops", "/JSON/Shops/getAll", {}, Shop),
+            ("products", "/JSON/Products/getAll", {"shopId": 1}, Product),
+            ("search", "/JSON/Products/search", {"phrase": ""}, BaseProduct),
+        ):
+            body = json.dumps(catalog.respond("get", path, params)).encode()
+            yield f"{label} ×{size}", body, model
+
+
+def _best(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = [b for b in map(_load, PREFERENCE) if b is not None]
+    columns = [b.name for b in backends] + ["streamed"]
+    print(f"{'payload':<16} {'KiB':>7} " + " ".join(f"{c:>9}" for c in columns))
+    print(f"{'':<16} {'':>7} " + " ".join(f"{'ms':>9}" for _ in columns))
+
+    for label, body, model in _payloads(args.sizes):
+        chunks = lambda: (  # noqa: E731
+            body[i : i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)
+        )
+        paths = [lambda b=b: decode_models(body, model, b) for b in backends]
+        paths.append(lambda: [model(**item) for item in iter_json_array(chunks())])
+
+        expected = decode_models(body, model)
+        timings = []
+        for path in paths:
+            assert path() == expected
+            timings.append(_best(path, args.repeat))
+        print(
+            f"{label:<16} {len(body) / 1024:>7.0f} "
+            + " ".join(f"{t * 1000:>9.2f}" for t in timings)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""End-to-end load test — drive the real bot ``Application`` with thousands of fake chats.
+
+The application is built by ``bot.bosko_bot.build_application`` with a fake Bot API
+transport (no network) and the Bosko API replaced by :mod:`benchmarks.stub_api`.
+Synthetic updates are pushed into the update queue at a target rate and the harness
+reports end-to-end reply latency, event-loop lag and memory growth, then fires the
+morning wave of scheduled daily-update jobs.
+
+Usage::
+
+    python -m benchmarks.load_test --users 2000 --rate 200 --upstream-latency 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import resource
+import time
+import tracemalloc
+from collections import defaultdict
+
+from telegram.ext import Application, DictPersistence
+
+from benchmarks.fake_telegram import FakeTelegramRequest, UpdateFactory
+from benchmarks.stub_api import StubBoskoAPI, StubCatalog
+from bot import services
+from bot.bosko_bot import build_application
+from bot.constants import DAILY_JOB_PREFIX
+from bot.formatting import format_flavor_name
+
+REPLY_TIMEOUT = 30.0
+SCENARIO_WEIGHTS = {
+    "shops": 3,
+    "products": 3,
+    "search_available": 2,
+    "favorites_and_daily_updates": 2,
+}
+
+
+# ── Measurement helpers ─────────────────────────────────────────────
+
+
+def _percentiles(samples: list[float]) -> str:
+    if not samples:
+        return "n=0"
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return (
+        f"n={len(ordered)} p50={pick(0.50) * 1000:.1f}ms p95={pick(0.95) * 1000:.1f}ms "
+        f"p99={pick(0.99) * 1000:.1f}ms max={ordered[-1] * 1000:.1f}ms"
+    )
+
+
+def _rss_mib() -> float:
+    """Current resident set size in MiB (falls back to peak RSS off Linux)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LoopLagMonitor:
+    """Samples how late ``asyncio.sleep`` wakes up — a direct measure of event-loop stalls."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+# ── Harness ─────────────────────────────────────────────────────────
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.catalog = StubCatalog(
+            shops=args.shops, flavors=args.flavors, per_shop=args.per_shop
+        )
+        self.api = StubBoskoAPI(self.catalog, latency=args.upstream_latency)
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.timeouts: dict[str, int] = defaultdict(int)
+        self._waiters: dict[int, asyncio.Future] = {}
+        self.request = FakeTelegramRequest(
+            on_send=self._on_send, latency=args.telegram_latency
+        )
+        self.app: Application | None = None
+        self.updates: UpdateFactory | None = None
+
+    def _on_send(self, chat_id: int, method: str, params: dict) -> None:
+        waiter = self._waiters.pop(chat_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(params.get("text", ""))
+
+    async def send(self, user_id: int, text: str, label: str) -> str | None:
+        """Inject one update and wait for the bot's first reply to that chat."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[user_id] = waiter
+        started = time.perf_counter()
+        await self.app.update_queue.put(self.updates.text(user_id, text))
+        try:
+            reply = await asyncio.wait_for(waiter, REPLY_TIMEOUT)
+        except asyncio.TimeoutError:
+            self._waiters.pop(user_id, None)
+            self.timeouts[label] += 1
+            return None
+        self.latencies[label].append(time.perf_counter() - started)
+        return reply
+
+    # ── Scenarios ───────────────────────────────────────────────────
+
+    def _random_shop_name(self) -> str:
+        return self.catalog.shop_payload(random.choice(self.catalog.shop_ids))["name"]
+
+    async def scenario_shops(self, user_id: int) -> None:
+        query = random.choice(["", " Warszawa", " Kraków"])
+        await self.send(user_id, f"/shops{query}", "/shops")
+
+    async def scenario_products(self, user_id: int) -> None:
+        await self.send(user_id, f"/products {self._random_shop_name()}", "/products")
+
+    async def scenario_search_available(self, user_id: int) -> None:
+        flavor = random.choice(self.catalog.flavors).split()[0]
+        await self.send(user_id, f"/search_available {flavor}", "/search_available")
+
+    async def scenario_favorites_and_daily_updates(self, user_id: int) -> None:
+        flavor = random.choice(self.catalog.flavors)
+        steps = [
+            ("/add_favorite", "/add_favorite"),
+            ("🍦 Flavors", "favorites: type"),
+            (flavor.split()[0], "favorites: flavor search"),
+            (format_flavor_name(flavor), "favorites: select"),
+            ("✅ Done selecting", "favorites: done"),
+            ("/add_favorite", "/add_favorite"),
+            ("🏪 Shops", "favorites: type"),
+            ("🏪 Search by shop name", "favorites: shop method"),
+        ]
+        for text, label in steps:
+            if await self.send(user_id, text, label) is None:
+                return
+
+        shop_name = self._random_shop_name()
+        reply = await self.send(user_id, shop_name, "favorites: shop search")
+        if reply and reply.startswith("Found"):
+            await self.send(user_id, shop_name, "favorites: select")
+            await self.send(user_id, "✅ Done selecting", "favorites: done")
+
+        for text, label in [
+            ("/daily_updates", "/daily_updates"),
+            ("⏰ Set Daily Updates", "daily_updates: choice"),
+            ("09:00", "daily_updates: time"),
+            ("🗓️ All days", "daily_updates: days"),
+        ]:
+            if await self.send(user_id, text, label) is None:
+                return
+
+    # ── Phases ──────────────────────────────────────────────────────
+
+    async def load_phase(self) -> float:
+        scenarios = list(SCENARIO_WEIGHTS)
+        weights = list(SCENARIO_WEIGHTS.values())
+        tasks = []
+        started = time.perf_counter()
+        for i in range(self.args.users):
+            user_id = 100_000 + i
+            scenario = random.choices(scenarios, weights)[0]
+            tasks.append(
+                asyncio.create_task(getattr(self, f"scenario_{scenario}")(user_id))
+            )
+            await asyncio.sleep(1 / self.args.rate)
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+    async def morning_wave(self) -> tuple[int, float]:
+        """Fire every scheduled daily job at once, with interactive traffic on top."""
+        jobs = [
+            job
+            for job in self.app.job_queue.jobs()
+            if job.name and job.name.startswith(DAILY_JOB_PREFIX)
+        ]
+        started = time.perf_counter()
+        wave = asyncio.gather(*(job.run(self.app) for job in jobs))
+        interactive = [
+            asyncio.create_task(
+                self.send(900_000 + i, "/shops Warszawa", "/shops (during wave)")
+            )
+            for i in range(min(100, self.args.users))
+        ]
+        await wave
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*interactive)
+        return len(jobs), elapsed
+
+    async def run(self) -> None:
+        random.seed(self.args.seed)
+        services._api = self.api
+
+        tracemalloc.start()
+        rss_start = _rss_mib()
+
+        self.app = build_application(
+            token="123456:LOAD-TEST",
+            persistence=DictPersistence(),
+            request=self.request,
+        )
+        self.updates = UpdateFactory(self.app.bot)
+        self.app.bot.rate_limiter.spread_window = self.args.spread_window
+        monitor = LoopLagMonitor()
+
+        async with self.app:
+            if self.app.post_init:
+                await self.app.post_init(self.app)
+            await self.app.start()
+            monitor.start()
+
+            load_elapsed = await self.load_phase()
+            rss_after_load = _rss_mib()
+            wave_jobs, wave_elapsed = await self.morning_wave()
+
+            await monitor.stop()
+            await self.app.stop()
+
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"\n── Load phase: {self.args.users} sessions in {load_elapsed:.1f}s")
+        for label, samples in sorted(self.latencies.items()):
+            timeouts = self.timeouts.get(label, 0)
+            suffix = f" timeouts={timeouts}" if timeouts else ""
+            print(f"  {label:<28} {_percentiles(samples)}{suffix}")
+        print(f"\n── Morning wave: {wave_jobs} jobs in {wave_elapsed:.2f}s")
+        print(f"\n── Event-loop lag: {_percentiles(monitor.samples)}")
+        print(
+            f"\n── Memory: RSS {rss_start:.1f} → {rss_after_load:.1f} → {_rss_mib():.1f} MiB, "
+            f"traced current={current / 2**20:.1f} MiB peak={peak / 2**20:.1f} MiB"
+        )
+        products = services.cache_stats()["products"]
+        print(
+            f"\n── Product cache: hits={products['hits']} misses={products['misses']} "
+            f"(misses are fetched upstream on a user request)"
+        )
+        print(f"── Upstream calls: {dict(self.api.calls)}")
+        print(f"── Bot API calls: {self.request.calls}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500, help="Simulated chats")
+    parser.add_argument(
+        "--rate", type=float, default=100.0, help="New sessions per second"
+    )
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--flavors", type=int, default=500)
+    parser.add_argument("--per-shop", type=int, default=30)
+    parser.add_argument(
+        "--upstream-latency", type=float, default=0.0, help="Bosko API latency (s)"
+    )
+    parser.add_argument(
+        "--telegram-latency", type=float, default=0.0, help="Bot API latency (s)"
+    )
+    parser.add_argument(
+        "--spread-window",
+        type=float,
+        default=5.0,
+        help="Window (s) over which the morning wave's notifications are spread",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    asyncio.run(LoadTest(args).run())
+    logging.shutdown()
+
+
+if __name__ == "__main__":
+    main()
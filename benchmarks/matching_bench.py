@@ -0,0 +1,120 @@
+"""Favorites matching benchmark — per-user loops vs. the vectorized availability matrix.
+
+Builds a synthetic morning wave (default 10k subscribers × 200 shops × 500 flavors) and
+times three ways of answering "which of my favorite flavors are at my favorite shops":
+
+* ``strings``  — the original per-user triple loop with ``normalize`` containment
+  (timed on a sample of users and extrapolated — it takes about a minute otherwise),
+* ``id sets``  — per-user integer set intersection over the interned catalog,
+* ``matrix``   — :meth:`AvailabilityMatrix.match_all` for all subscribers at once.
+
+Usage::
+
+    python -m benchmarks.matching_bench --users 10000 --shops 200 --flavors 500
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.stub_api import flavor_names
+from bot.availability import AvailabilityMatrix
+from bot.catalog import FlavorCatalog
+from bot.services import normalize
+
+
+class _Named:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def _timed(label: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<10} {elapsed * 1000:9.1f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--flavors", type=int, default=500)
+    parser.add_argument("--per-shop", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = flavor_names(args.flavors)
+    inventories = {
+        shop_id: [_Named(n) for n in rng.sample(names, args.per_shop)]
+        for shop_id in range(1, args.shops + 1)
+    }
+    users = [
+        (
+            rng.sample(names, rng.randint(1, 10)),
+            rng.sample(range(1, args.shops + 1), rng.randint(1, 5)),
+        )
+        for _ in range(args.users)
+    ]
+
+    catalog = FlavorCatalog(normalize)
+    matrix = AvailabilityMatrix()
+    for shop_id, products in inventories.items():
+        matrix.set_shop(shop_id, catalog.update_shop(shop_id, products))
+    favorite_ids = [(catalog.intern_all(flavors), shops) for flavors, shops in users]
+
+    print(
+        f"{args.users} users × {args.shops} shops × {args.flavors} flavors "
+        f"({args.per_shop} stocked per shop)\n"
+    )
+
+    sample = users[: max(1, args.users // 10)]
+
+    def strings():
+        return [
+            sorted(
+                (shop_id, catalog.intern(product.name))
+                for shop_id in shops
+                for product in inventories[shop_id]
+                for flavor in flavors
+                if normalize(flavor) in normalize(product.name)
+            )
+            for flavors, shops in sample
+        ]
+
+    def id_sets():
+        return [
+            sorted(
+                (shop_id, flavor_id)
+                for shop_id in shops
+                for flavor_id in catalog.flavors_at(shop_id) & flavor_ids
+            )
+            for flavor_ids, shops in favorite_ids
+        ]
+
+    def matrix_all():
+        subscribers = matrix.subscribers(favorite_ids)
+        return [sorted(pairs) for pairs in matrix.match_all(subscribers)]
+
+    started = time.perf_counter()
+    strings()
+    elapsed = (time.perf_counter() - started) * len(users) / len(sample)
+    print(
+        f"  {'strings':<10} {elapsed * 1000:9.1f} ms (extrapolated from {len(sample)})"
+    )
+
+    baseline = _timed("id sets", id_sets)
+    assert _timed("matrix", matrix_all) == baseline
+
+    subscribers = matrix.subscribers(favorite_ids)
+    _timed("matrix*", lambda: matrix.match_all(subscribers))
+    print("\n  * match only, with subscriber masks prebuilt")
+    print(f"  {sum(map(len, baseline))} (shop, flavor) notifications in total")
+
+
+if __name__ == "__main__":
+    main()
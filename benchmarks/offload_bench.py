@@ -0,0 +1,196 @@
+"""Offload benchmark — event-loop lag during a morning wave, with and without worker pools.
+
+Drives the real bot ``Application`` (fake Bot API transport, stub Bosko API with
+``--upstream-latency``) with ``--users`` subscribers whose daily-update jobs all fire
+at once, while ``--interactive`` other users send ``/products`` commands. Before the
+wave, the product lists of ``--cold`` of the shops expire (as overnight). Runs the
+wave twice:
+
+* ``on loop``   — daily checks as before: product lists loaded (fetch and parse) and
+  favorites matched one user at a time, on the event loop,
+* ``offloaded`` — product lists loaded in the worker threads, and the favorites of
+  every check in flight matched together in one vectorized pass in a worker thread.
+
+Reports event-loop lag (how late a 10 ms timer fires) during the wave, the wave's
+duration and the reply latency of the interactive commands.
+
+Usage::
+
+    CHAT_MESSAGES_PER_SECOND=1000 GLOBAL_MESSAGES_PER_SECOND=100000 \
+    python -m benchmarks.offload_bench --users 2000
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+from telegram.ext import DictPersistence
+
+from benchmarks.fake_telegram import FakeTelegramRequest, UpdateFactory
+from benchmarks.load_test import LoopLagMonitor, _percentiles
+from benchmarks.stub_api import StubBoskoAPI, StubCatalog
+from bot import services, workers
+from bot.bosko_bot import build_application
+from bot.constants import CPU_WORKERS, DAILY_JOB_PREFIX, WORKER_THREADS
+from bot.formatting import format_flavor_name
+from bot.handlers.daily_updates import restore_daily_jobs
+
+REPLY_TIMEOUT = 60.0
+
+
+async def _check_on_loop(context) -> None:
+    """The local-mode daily check as it was, for comparison."""
+    job_data = context.job.data
+    flavor_ids = services.favorite_flavor_ids(job_data["favorite_flavors"])
+    shop_names = {}
+    for shop in job_data["favorite_shops"]:
+        services.get_products_at_shop(shop.id)
+        shop_names[shop.id] = shop.name
+    matches = services.availability.match(flavor_ids, shop_names)
+    found = [
+        f"🍦 {format_flavor_name(services.catalog.name_of(flavor_id))} at "
+        f"*{shop_names[shop_id]}*"
+        for shop_id, flavor_id in matches
+    ]
+    if found:
+        await context.bot.send_message(
+            chat_id=context.job.chat_id,
+            text="📅 *Daily Favorites Update*\n\n" + "\n".join(found),
+            parse_mode="Markdown",
+        )
+
+
+async def run(args: argparse.Namespace, on_loop: bool) -> dict:
+    rng = random.Random(args.seed)
+    catalog = StubCatalog(
+        shops=args.shops, flavors=args.flavors, per_shop=args.per_shop
+    )
+    api = StubBoskoAPI(catalog, latency=args.upstream_latency)
+    services._api = api
+    services.get_products_at_shop.cache_clear()
+    waiters: dict[int, asyncio.Future] = {}
+
+    def on_send(chat_id: int, method: str, params: dict) -> None:
+        waiter = waiters.pop(chat_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(params.get("text", ""))
+
+    app = build_application(
+        token="123456:OFFLOAD",
+        persistence=DictPersistence(),
+        request=FakeTelegramRequest(on_send=on_send),
+    )
+    app.bot.rate_limiter.spread_window = args.spread_window
+    updates = UpdateFactory(app.bot)
+
+    async def send(user_id: int, text: str) -> float | None:
+        waiters[user_id] = asyncio.get_running_loop().create_future()
+        started = time.perf_counter()
+        await app.update_queue.put(updates.text(user_id, text))
+        try:
+            await asyncio.wait_for(waiters[user_id], REPLY_TIMEOUT)
+        except asyncio.TimeoutError:
+            return None
+        return time.perf_counter() - started
+
+    async with app:
+        workers.install(asyncio.get_running_loop())
+        await app.start()
+
+        # Yesterday: every shop's product list loaded, every subscriber scheduled
+        shops = await asyncio.to_thread(services.get_cached_shops)
+        await asyncio.gather(
+            *(asyncio.to_thread(services.get_products_at_shop, s.id) for s in shops)
+        )
+        for i in range(args.users):
+            user_id = 100_000 + i
+            app.user_data[user_id].update(
+                favorite_flavors=rng.sample(catalog.flavors, args.favorite_flavors),
+                favorite_shops=rng.sample(shops, args.favorite_shops),
+                daily_updates_config={
+                    "update_time": "08:00",
+                    "days": (1, 2, 3, 4, 5),
+                    "timezone": "Europe/Warsaw",
+                    "chat_id": user_id,
+                },
+            )
+        await restore_daily_jobs(app)
+        jobs = [
+            job
+            for job in app.job_queue.jobs()
+            if job.name and job.name.startswith(DAILY_JOB_PREFIX)
+        ]
+        if on_loop:
+            for job in jobs:
+                job.callback = _check_on_loop
+
+        # This morning: some lists expired overnight
+        for shop in rng.sample(shops, int(args.cold * len(shops))):
+            services.get_products_at_shop.cache.invalidate((shop.id,))
+        fetched = sum(api.calls.values())
+
+        monitor = LoopLagMonitor()
+        monitor.start()
+        started = time.perf_counter()
+        wave = asyncio.gather(*(job.run(app) for job in jobs))
+        interactive = []
+        for i in range(args.interactive):
+            shop = rng.choice(shops)
+            interactive.append(
+                asyncio.create_task(send(900_000 + i, f"/products {shop.name}"))
+            )
+            await asyncio.sleep(args.interactive_interval)
+        await wave
+        elapsed = time.perf_counter() - started
+        replies = await asyncio.gather(*interactive)
+        await monitor.stop()
+        await app.stop()
+
+    return {
+        "jobs": len(jobs),
+        "elapsed": elapsed,
+        "lag": monitor.samples,
+        "replies": [r for r in replies if r is not None],
+        "timeouts": sum(r is None for r in replies),
+        "upstream": sum(api.calls.values()) - fetched,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--flavors", type=int, default=500)
+    parser.add_argument("--per-shop", type=int, default=30)
+    parser.add_argument("--favorite-flavors", type=int, default=3)
+    parser.add_argument("--favorite-shops", type=int, default=3)
+    parser.add_argument("--cold", type=float, default=0.3)
+    parser.add_argument("--upstream-latency", type=float, default=0.02)
+    parser.add_argument("--interactive", type=int, default=100)
+    parser.add_argument("--interactive-interval", type=float, default=0.01)
+    parser.add_argument("--spread-window", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(
+        f"{args.users} subscribers, {args.shops} shops ({args.cold:.0%} cold), "
+        f"{args.upstream_latency * 1000:.0f} ms upstream latency; "
+        f"WORKER_THREADS={WORKER_THREADS} CPU_WORKERS={CPU_WORKERS}\n"
+    )
+    for label, on_loop in (("on loop", True), ("offloaded", False)):
+        result = asyncio.run(run(args, on_loop))
+        timeouts = f", {result['timeouts']} timed out" if result["timeouts"] else ""
+        print(
+            f"  {label:<9} {result['jobs']} checks in {result['elapsed']:.2f}s "
+            f"({result['upstream']} upstream requests)\n"
+            f"    event-loop lag   {_percentiles(result['lag'])}\n"
+            f"    /products reply  {_percentiles(result['replies'])}{timeouts}"
+        )
+    workers.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Pagination benchmark — paging through long result lists from the rendered page cache.
+
+Drives the real bot ``Application`` (fake Bot API transport, stub Bosko API with
+simulated latency) with ``/shops`` and ``/products`` on warm caches, then has
+``--chats`` chats press "Next ▶" through every page. Reports the longest message sent
+(Telegram rejects more than 4096 characters), the time per command and per page flip,
+and the upstream requests made while paging.
+
+Usage::
+
+    CHAT_MESSAGES_PER_SECOND=1000 GLOBAL_MESSAGES_PER_SECOND=100000 \
+        python -m benchmarks.pagination_bench --chats 50
+
+(lifting the send limits, which would otherwise pace the page flips).
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from telegram.ext import DictPersistence
+
+from benchmarks.fake_telegram import FakeTelegramRequest, UpdateFactory
+from benchmarks.load_test import _percentiles
+from benchmarks.stub_api import StubBoskoAPI, StubCatalog
+from bot import services
+from bot.bosko_bot import build_application
+
+
+async def run(args: argparse.Namespace) -> None:
+    catalog = StubCatalog(shops=args.shops, per_shop=args.per_shop)
+    api = StubBoskoAPI(catalog, latency=args.upstream_latency)
+    services._api = api
+
+    waiters: dict[int, asyncio.Future] = {}
+    longest = 0
+
+    def on_send(chat_id: int, method: str, params: dict) -> None:
+        nonlocal longest
+        longest = max(longest, len(params.get("text", "")))
+        waiter = waiters.pop(chat_id, None)
+        if waiter is not None and method != "answerCallbackQuery":
+            waiter.set_result(params)
+
+    app = build_application(
+        token="123456:PAGINATION",
+        persistence=DictPersistence(),
+        request=FakeTelegramRequest(on_send=on_send),
+    )
+    updates = UpdateFactory(app.bot)
+
+    async def send(update, chat_id: int) -> tuple[float, dict]:
+        waiters[chat_id] = asyncio.get_running_loop().create_future()
+        started = time.perf_counter()
+        await app.update_queue.put(update)
+        params = await asyncio.wait_for(waiters[chat_id], 30)
+        return time.perf_counter() - started, params
+
+    async def page_through(chat_id: int, text: str, timings: dict) -> int:
+        elapsed, params = await send(updates.text(chat_id, text), chat_id)
+        timings["command"].append(elapsed)
+        pages = 1
+        while markup := params.get("reply_markup"):
+            buttons = [
+                button["callback_data"]
+                for row in markup["inline_keyboard"]
+                for button in row
+                if button["text"].startswith("Next")
+            ]
+            if not buttons:
+                break
+            update = updates.callback(chat_id, buttons[0], 1)
+            elapsed, params = await send(update, chat_id)
+            timings["flip"].append(elapsed)
+            pages += 1
+        return pages
+
+    async with app:
+        await app.start()
+        shop_id = catalog.shop_ids[0]
+        shop_name = catalog.shop_payload(shop_id)["name"]
+        # Warm caches: the first reply is then the result itself, not a placeholder
+        services.get_cached_shops()
+        services.get_products_at_shop(shop_id)
+        for text in ("/shops", f"/products {shop_name}"):
+            timings = {"command": [], "flip": []}
+            calls = sum(api.calls.values())
+            results = await asyncio.gather(
+                *(page_through(chat_id, text, timings) for chat_id in range(args.chats))
+            )
+            print(f"{text.split()[0]}: {results[0]} pages per chat")
+            print(f"  command  {_percentiles(timings['command'])}")
+            print(f"  flip     {_percentiles(timings['flip'])}")
+            print(f"  upstream requests: {sum(api.calls.values()) - calls}\n")
+        await app.stop()
+
+    print(f"longest message: {longest} characters")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shops", type=int, default=600)
+    parser.add_argument("--per-shop", type=int, default=80)
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--upstream-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Prefetch benchmark — /products after picking favorite shops, with and without speculation.
+
+Drives the real bot ``Application`` (fake Bot API transport, stub Bosko API with
+simulated latency) with ``--users`` users (arriving at ``--rate`` per second) who each
+add a favorite shop by browsing a city, think for ``--think`` seconds, then ask for its
+``/products``. Starting from cold product caches, reports how long the product list
+took to arrive, with speculative prefetch off and on, and the prefetcher's hit rate.
+
+Usage::
+
+    python -m benchmarks.prefetch_bench --users 50 --upstream-latency 0.3
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+from telegram.ext import DictPersistence
+
+from benchmarks.fake_telegram import FakeTelegramRequest, UpdateFactory
+from benchmarks.load_test import _percentiles
+from benchmarks.stub_api import StubBoskoAPI, StubCatalog
+from bot import services
+from bot.bosko_bot import build_application
+from bot.constants import (
+    CACHE_TTL_SECONDS,
+    PREFETCH_CONCURRENCY,
+    PREFETCH_PER_MINUTE,
+)
+from bot.prefetch import prefetcher
+
+REPLY_TIMEOUT = 60.0
+
+
+async def run(args: argparse.Namespace, per_minute: float) -> tuple[list, dict]:
+    catalog = StubCatalog(shops=args.shops)
+    services._api = StubBoskoAPI(catalog, latency=args.upstream_latency)
+    services.get_products_at_shop.cache_clear()
+    prefetcher.__init__(PREFETCH_CONCURRENCY, per_minute, CACHE_TTL_SECONDS)
+
+    waiters: dict[int, tuple[asyncio.Future, str]] = {}
+
+    def on_send(chat_id: int, method: str, params: dict) -> None:
+        waiter = waiters.get(chat_id)
+        if waiter and params.get("text", "").startswith(waiter[1]):
+            del waiters[chat_id]
+            waiter[0].set_result(params["text"])
+
+    app = build_application(
+        token="123456:PREFETCH",
+        persistence=DictPersistence(),
+        request=FakeTelegramRequest(on_send=on_send),
+    )
+    updates = UpdateFactory(app.bot)
+    rng = random.Random(args.seed)
+
+    async def send(user_id: int, text: str, reply_prefix: str = "") -> float:
+        future = asyncio.get_running_loop().create_future()
+        waiters[user_id] = (future, reply_prefix)
+        started = time.perf_counter()
+        await app.update_queue.put(updates.text(user_id, text))
+        await asyncio.wait_for(future, REPLY_TIMEOUT)
+        return time.perf_counter() - started
+
+    async def user(user_id: int) -> float:
+        await asyncio.sleep((user_id - 100_000) / args.rate)
+        shop = catalog.shop_payload(rng.choice(catalog.shop_ids))
+        for text in (
+            "/add_favorite",
+            "🏪 Shops",
+            "🏙️ Browse by city",
+            shop["city"]["name"],
+            shop["name"],
+            "✅ Done selecting",
+        ):
+            await send(user_id, text)
+        await asyncio.sleep(args.think)
+        return await send(user_id, f"/products {shop['name']}", "🍨 *")
+
+    async with app:
+        await app.start()
+        services.get_cached_shops()
+        latencies = await asyncio.gather(
+            *(user(100_000 + i) for i in range(args.users))
+        )
+        await app.stop()
+    return list(latencies), prefetcher.stats()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=5.0, help="Users per second")
+    parser.add_argument("--think", type=float, default=2.0)
+    parser.add_argument("--upstream-latency", type=float, default=0.3)
+    parser.add_argument("--per-minute", type=float, default=PREFETCH_PER_MINUTE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(
+        f"{args.users} users at {args.rate:g}/s, {args.shops} shops, "
+        f"{args.think:g}s think time, "
+        f"{args.upstream_latency * 1000:.0f} ms upstream latency\n"
+    )
+    for label, per_minute in (("off", 0), ("on", args.per_minute)):
+        latencies, stats = asyncio.run(run(args, per_minute))
+        print(f"  prefetch {label:<3} /products {_percentiles(latencies)}")
+        if per_minute:
+            print(f"  {'':<12} {stats}")
+
+
+if __name__ == "__main__":
+    main()
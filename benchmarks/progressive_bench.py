@@ -0,0 +1,121 @@
+"""Progressive reply benchmark — time to first message vs. time to the full result.
+
+Drives the real bot ``Application`` (fake Bot API transport, stub Bosko API with
+simulated latency) with ``/search_available`` from ``--chats`` chats on cold caches,
+and reports per chat when the placeholder arrived, when the final result replaced it,
+and how many edits were made in between. A second round sends ``/shops`` right after
+``/search_available`` to check that the new command cancels the scan.
+
+Usage::
+
+    python -m benchmarks.progressive_bench --chats 20 --shops 200 --upstream-latency 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+
+from telegram.ext import DictPersistence
+
+from benchmarks.fake_telegram import FakeTelegramRequest, UpdateFactory
+from benchmarks.load_test import _percentiles
+from benchmarks.stub_api import StubBoskoAPI, StubCatalog
+from bot import progressive, services
+from bot.bosko_bot import build_application
+
+
+async def _wait_for(condition, timeout: float = 120.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def _finished(messages: list[tuple[float, str, str]]) -> bool:
+    """Whether the last message is a final result rather than a placeholder or progress."""
+    return bool(messages) and not (
+        messages[-1][2].endswith("…") or "(checked " in messages[-1][2]
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    catalog = StubCatalog(shops=args.shops)
+    services._api = StubBoskoAPI(catalog, latency=args.upstream_latency)
+    progressive.PROGRESS_EDIT_INTERVAL_SECONDS = args.edit_interval
+
+    sent: dict[int, list[tuple[float, str, str]]] = defaultdict(list)
+    request = FakeTelegramRequest(
+        on_send=lambda chat_id, method, params: sent[chat_id].append(
+            (time.perf_counter(), method, params.get("text", ""))
+        ),
+        latency=args.telegram_latency,
+    )
+    app = build_application(
+        token="123456:PROGRESSIVE", persistence=DictPersistence(), request=request
+    )
+    updates = UpdateFactory(app.bot)
+    rng = random.Random(args.seed)
+
+    async with app:
+        await app.start()
+        services.get_cached_shops()
+
+        started: dict[int, float] = {}
+        for chat_id in range(1, args.chats + 1):
+            flavor = rng.choice(catalog.flavors).split()[0]
+            started[chat_id] = time.perf_counter()
+            await app.update_queue.put(
+                updates.text(chat_id, f"/search_available {flavor}")
+            )
+        await _wait_for(lambda: all(_finished(sent[chat_id]) for chat_id in started))
+
+        first, final, edits = [], [], []
+        for chat_id, began in started.items():
+            messages = sent[chat_id]
+            first.append(messages[0][0] - began)
+            final.append(messages[-1][0] - began)
+            edits.append(sum(method == "editMessageText" for _, method, _ in messages))
+
+        # Placeholder, the /shops reply and the cancelled placeholder
+        services.get_products_at_shop.cache_clear()
+        chats = range(1_000, 1_000 + args.chats)
+        for chat_id in chats:
+            await app.update_queue.put(updates.text(chat_id, "/search_available a"))
+            await app.update_queue.put(updates.text(chat_id, "/shops"))
+        await _wait_for(lambda: all(len(sent[chat_id]) >= 3 for chat_id in chats))
+        cancelled = sum(
+            any("Cancelled" in text for _, _, text in sent[chat_id])
+            for chat_id in chats
+        )
+
+        await app.stop()
+
+    print(
+        f"{args.chats} chats, {args.shops} shops, "
+        f"{args.upstream_latency * 1000:.0f} ms upstream latency, "
+        f"edits every {args.edit_interval:g}s at most\n"
+    )
+    print(f"  first message  {_percentiles(first)}")
+    print(f"  final result   {_percentiles(final)}")
+    print(f"  edits per chat {sum(edits) / len(edits):.1f} (max {max(edits)})")
+    print(f"\n  scans cancelled by a new command: {cancelled}/{args.chats}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--upstream-latency", type=float, default=0.05)
+    parser.add_argument("--telegram-latency", type=float, default=0.02)
+    parser.add_argument("--edit-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Replay benchmark — run ``bot.services`` offline against recorded Bosko API traffic.
+
+Without ``--cassette``, a session against the stub catalog is first recorded through
+:class:`api.transport.RecordingTransport` (with simulated upstream latency); pass a
+cassette recorded in production with ``API_RECORD_PATH`` to replay real traffic
+instead. The identical exchanges are then replayed, at ``--time-scale`` times their
+recorded latency, under two cache-loading strategies:
+
+* ``sequential`` — a cold ``/search_available`` sweep, one product list at a time,
+* ``concurrent`` — ``bot.warmup.refresh_product_lists`` with ``--concurrency`` workers,
+
+each followed by the recorded flavor searches.
+
+Usage::
+
+    python -m benchmarks.replay_bench --shops 200 --upstream-latency 0.02
+    python -m benchmarks.replay_bench --cassette data/api.jsonl.gz --time-scale 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from api.client import BoskoAPI
+from api.transport import RecordingTransport, ReplayTransport
+from benchmarks.stub_api import StubCatalog, StubTransport
+from bot import services
+from bot.warmup import refresh_product_lists
+
+QUERIES = ("pis", "pistacja", "mascarpone", "karmel", "czekolada", "mango")
+
+
+def _reset(transport) -> BoskoAPI:
+    services.get_cached_shops.cache_clear()
+    services.get_products_at_shop.cache_clear()
+    services._search_cache.clear()
+    api = BoskoAPI(transport=transport)
+    api.login("bench@example.com", "bench-password")
+    services._api = api
+    return api
+
+
+def run_workload(strategy: str, concurrency: int) -> None:
+    shop_ids = [shop.id for shop in services.get_cached_shops()]
+    if strategy == "sequential":
+        for shop_id in shop_ids:
+            services.get_products_at_shop(shop_id)
+    else:
+        asyncio.run(refresh_product_lists(shop_ids, concurrency))
+    for query in QUERIES:
+        services.cached_api_search(query)
+
+
+def record(path: str, shops: int, latency: float) -> None:
+    recorder = RecordingTransport(
+        path, StubTransport(StubCatalog(shops=shops), latency)
+    )
+    _reset(recorder)
+    run_workload("sequential", 1)
+    recorder.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cassette", help="replay this cassette instead of recording")
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--upstream-latency", type=float, default=0.02)
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.cassette
+        if path is None:
+            path = os.path.join(tmp, "stub.jsonl.gz")
+            started = time.perf_counter()
+            record(path, args.shops, args.upstream_latency)
+            print(f"recorded in {time.perf_counter() - started:.2f}s")
+
+        exchanges = len(ReplayTransport(path, time_scale=0))
+        size = os.path.getsize(path)
+        print(f"cassette: {exchanges} exchanges, {size / 1024:.0f} KiB gzipped")
+        print(f"replaying at {args.time_scale:g}× recorded latency\n")
+
+        print(f"  {'strategy':<11} {'wall time':>10} {'product lists':>14}")
+        for strategy in ("sequential", "concurrent"):
+            _reset(ReplayTransport(path, time_scale=args.time_scale))
+            started = time.perf_counter()
+            run_workload(strategy, args.concurrency)
+            elapsed = time.perf_counter() - started
+            loaded = services.get_products_at_shop.cache_info().entries
+            print(f"  {strategy:<11} {elapsed:>9.2f}s {loaded:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Scratch-space benchmark — persisted ``user_data`` with and without conversation leftovers.
+
+Drives the real bot ``Application`` (fake Bot API transport, stub Bosko API) with
+``--users`` users who each add favorite flavors (flavor search) and shops (browsing a
+city or searching by name), some of whom then set up daily updates or walk away from
+a half-finished ``/add_favorite``. Runs it twice:
+
+* ``user_data`` — conversation state kept in ``user_data`` as before, never cleaned up,
+* ``scratch``    — conversation state in :mod:`bot.scratch` spaces, discarded when
+  each conversation ends or times out.
+
+Reports the size of the pickled ``user_data`` (what ``PicklePersistence`` writes on
+every flush), the time to pickle it, the memory it takes once loaded back (i.e. after
+a restart) and the scratch spaces still alive at the end.
+
+Usage::
+
+    CHAT_MESSAGES_PER_SECOND=1000 GLOBAL_MESSAGES_PER_SECOND=100000 \
+    CONVERSATION_TIMEOUT_SECONDS=10 python -m benchmarks.scratch_bench --users 1000
+
+(lifting the send limits, and timing abandoned conversations out quickly).
+"""
+
+import argparse
+import asyncio
+import logging
+import pickle
+import random
+import time
+import tracemalloc
+
+from telegram.ext import DictPersistence
+
+from benchmarks.fake_telegram import FakeTelegramRequest, UpdateFactory
+from benchmarks.stub_api import StubBoskoAPI, StubCatalog
+from bot import scratch, services
+from bot.bosko_bot import build_application
+from bot.constants import CONVERSATION_TIMEOUT_SECONDS
+from bot.formatting import format_flavor_name
+
+REPLY_TIMEOUT = 30.0
+
+
+class _UserDataSpaces(dict):
+    """Scratch spaces that are the users' ``user_data`` and are never discarded —
+    how conversation state used to be kept."""
+
+    def __init__(self, user_data):
+        super().__init__()
+        self._user_data = user_data
+
+    def setdefault(self, key, default=None):
+        return self._user_data[key[2]]
+
+    def pop(self, key, default=None):
+        return default
+
+
+async def run(args: argparse.Namespace, legacy: bool) -> dict:
+    catalog = StubCatalog(shops=args.shops, flavors=args.flavors)
+    services._api = StubBoskoAPI(catalog)
+    waiters: dict[int, asyncio.Future] = {}
+
+    def on_send(chat_id: int, method: str, params: dict) -> None:
+        waiter = waiters.pop(chat_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(params.get("text", ""))
+
+    app = build_application(
+        token="123456:SCRATCH",
+        persistence=DictPersistence(),
+        request=FakeTelegramRequest(on_send=on_send),
+    )
+    scratch._spaces = _UserDataSpaces(app.user_data) if legacy else {}
+    updates = UpdateFactory(app.bot)
+    rng = random.Random(args.seed)
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def send(user_id: int, text: str) -> str:
+        waiters[user_id] = asyncio.get_running_loop().create_future()
+        await app.update_queue.put(updates.text(user_id, text))
+        return await asyncio.wait_for(waiters[user_id], REPLY_TIMEOUT)
+
+    def browse_city() -> list[str]:
+        shop = catalog.shop_payload(rng.choice(catalog.shop_ids))
+        return ["/add_favorite", "🏪 Shops", "🏙️ Browse by city", shop["city"]["name"]]
+
+    async def user(user_id: int) -> None:
+        flavor = rng.choice(catalog.flavors)
+        shop = catalog.shop_payload(rng.choice(catalog.shop_ids))
+        steps = [
+            "/add_favorite",
+            "🍦 Flavors",
+            flavor.split()[0],
+            format_flavor_name(flavor),
+            "✅ Done selecting",
+            *browse_city()[:3],
+            shop["city"]["name"],
+            shop["name"],
+            "✅ Done selecting",
+        ]
+        if rng.random() < 0.3:
+            other = catalog.shop_payload(rng.choice(catalog.shop_ids))
+            steps += ["/add_favorite", "🏪 Shops", "🏪 Search by shop name"]
+            steps += [other["city"]["name"], other["name"]]
+            steps += ["✅ Done selecting"] if rng.random() < 0.5 else ["/cancel"]
+        if rng.random() < 0.4:
+            steps += ["/daily_updates", "⏰ Set Daily Updates", "08:30", "🗓️ All days"]
+        if rng.random() < 0.15:
+            steps += browse_city()  # walks away mid-conversation
+        async with limit:
+            for text in steps:
+                await send(user_id, text)
+
+    async with app:
+        await app.start()
+        services.get_cached_shops()
+        started = time.perf_counter()
+        await asyncio.gather(*(user(100_000 + i) for i in range(args.users)))
+        elapsed = time.perf_counter() - started
+        if CONVERSATION_TIMEOUT_SECONDS:
+            await asyncio.sleep(CONVERSATION_TIMEOUT_SECONDS + 1)
+        user_data = {user_id: dict(data) for user_id, data in app.user_data.items()}
+        live_spaces = len(scratch._spaces)
+        await app.stop()
+
+    started = time.perf_counter()
+    blob = pickle.dumps(user_data, protocol=pickle.HIGHEST_PROTOCOL)
+    pickled = time.perf_counter() - started
+    tracemalloc.start()
+    loaded = pickle.loads(blob)
+    loaded_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del loaded
+    return {
+        "elapsed": elapsed,
+        "bytes": len(blob),
+        "pickle": pickled,
+        "loaded": loaded_bytes,
+        "spaces": live_spaces,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--flavors", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(f"{args.users} users, {args.shops} shops, {args.flavors} flavors\n")
+    for label, legacy in (("user_data", True), ("scratch", False)):
+        result = asyncio.run(run(args, legacy))
+        print(
+            f"  {label:<9} pickled {result['bytes'] / 2**20:6.2f} MiB "
+            f"in {result['pickle'] * 1000:5.0f} ms, "
+            f"{result['loaded'] / 2**20:6.2f} MiB once loaded, "
+            f"{result['spaces']} scratch spaces left "
+            f"({result['elapsed']:.1f}s of conversations)"
+        )
+
+
+if __name__ == "__main__":
+    main()
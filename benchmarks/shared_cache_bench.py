@@ -0,0 +1,87 @@
+"""Shared cache benchmark — upstream calls of several bot processes with and without it.
+
+Starts ``--processes`` worker processes at once, each acting as a bot instance doing a
+cold ``/search_available`` sweep (log in, load the shop list, then every product list)
+against the stub API with simulated upstream latency. Run once with per-process caches
+only and once with ``SHARED_CACHE_PATH`` set, it reports the upstream requests made by
+all processes together and the slowest process's sweep time.
+
+Usage::
+
+    python -m benchmarks.shared_cache_bench --processes 4 --shops 200
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def child(shops: int, latency: float) -> None:
+    from api.client import BoskoAPI
+    from benchmarks.stub_api import StubCatalog, StubTransport
+    from bot import services
+
+    transport = StubTransport(StubCatalog(shops=shops), latency)
+    services._make_transport = lambda: transport
+
+    started = time.perf_counter()
+    for shop in services.get_cached_shops():
+        services.get_products_at_shop(shop.id)
+    elapsed = time.perf_counter() - started
+    assert isinstance(services.get_api(), BoskoAPI)
+    print(json.dumps({"calls": sum(transport.calls.values()), "elapsed": elapsed}))
+
+
+def _run(processes: int, shops: int, latency: float, env: dict) -> list[dict]:
+    args = [sys.executable, "-m", "benchmarks.shared_cache_bench"]
+    args += ["--child", "--shops", str(shops), "--upstream-latency", str(latency)]
+    workers = [
+        subprocess.Popen(args, env={**os.environ, **env}, stdout=subprocess.PIPE)
+        for _ in range(processes)
+    ]
+    results = []
+    for worker in workers:
+        out, _ = worker.communicate()
+        if worker.returncode:
+            raise RuntimeError(f"worker exited with {worker.returncode}")
+        results.append(json.loads(out.decode().strip().splitlines()[-1]))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--upstream-latency", type=float, default=0.01)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.shops, args.upstream_latency)
+        return
+
+    print(
+        f"{args.processes} processes, {args.shops} shops, "
+        f"{args.upstream_latency * 1000:.0f} ms upstream latency\n"
+    )
+    print(f"  {'cache':<12} {'upstream calls':>15} {'slowest sweep':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {"HISTORY_DB_PATH": os.path.join(tmp, "history.sqlite3")}
+        for label, extra in (
+            ("per-process", {}),
+            ("shared", {"SHARED_CACHE_PATH": os.path.join(tmp, "shared.sqlite3")}),
+        ):
+            results = _run(
+                args.processes, args.shops, args.upstream_latency, {**env, **extra}
+            )
+            calls = sum(result["calls"] for result in results)
+            slowest = max(result["elapsed"] for result in results)
+            print(f"  {label:<12} {calls:>15} {slowest:>13.2f}s")
+
+
+if __name__ == "__main__":
+    main()
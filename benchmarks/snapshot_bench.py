@@ -0,0 +1,125 @@
+"""Snapshot benchmark — a restarted bot process serving from the API vs. a catalog snapshot.
+
+Publishes a snapshot of a stub catalog (``--shops`` shops) with :func:`bot.ingest.ingest`,
+then starts fresh processes that each answer a ``/search_available``-style query over
+every shop:
+
+* ``api``      — fetching the shop list and every product list (JSON parsing, pydantic
+  validation) from the stub API, with ``--upstream-latency`` per request,
+* ``snapshot`` — reading them from the snapshot, in each of ``--readers`` processes.
+
+Reports the time from a process's first lookup to its answer, the snapshot size, and
+checks that an update pinned to a version keeps reading it after a newer one is
+published.
+
+Usage::
+
+    python -m benchmarks.snapshot_bench --shops 600 --readers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+QUERY = "pistacja"
+
+
+def _restart(mode: str, args: argparse.Namespace, path: str, results) -> None:
+    """A freshly started process: imports, then the first answer."""
+    os.environ["HISTORY_DB_PATH"] = os.path.join(os.path.dirname(path), f"{mode}.db")
+    if mode == "snapshot":
+        os.environ["CATALOG_SNAPSHOT_PATH"] = path
+    from concurrent.futures import ThreadPoolExecutor
+
+    from api.client import BoskoAPI
+    from benchmarks.stub_api import StubCatalog, StubTransport
+    from bot import services
+    from bot.constants import CACHE_REFRESH_CONCURRENCY
+
+    services._api = BoskoAPI(
+        token="bench",
+        transport=StubTransport(
+            StubCatalog(shops=args.shops, per_shop=args.per_shop),
+            args.upstream_latency,
+        ),
+    )
+
+    started = time.perf_counter()
+    services.check_snapshot()
+    shops = services.get_cached_shops()
+    if mode == "api":
+        with ThreadPoolExecutor(CACHE_REFRESH_CONCURRENCY) as pool:
+            list(pool.map(services.get_products_at_shop, [s.id for s in shops]))
+    answer = services.flavors_available_at(shops, QUERY)
+    elapsed = time.perf_counter() - started
+    results.put((mode, elapsed, len(answer)))
+
+
+def _check_pinning(path: str) -> str:
+    """Publish a version while one is pinned; the pinned context must not see it."""
+    import contextvars
+
+    from bot.snapshot import SnapshotStore, write_snapshot
+
+    store = SnapshotStore(path, max_age=3600)
+    snapshot = store.refresh()
+    pinned = contextvars.copy_context()
+    before = pinned.run(lambda: store.pin().version)
+    write_snapshot(path, snapshot.shops(), {}, [], str.lower)
+    after = store.refresh().version
+    still = pinned.run(lambda: store.pinned().version)
+    assert still == before < after, (before, still, after)
+    return f"pinned v{before} still read v{still} after v{after} was published"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shops", type=int, default=600)
+    parser.add_argument("--per-shop", type=int, default=80)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--upstream-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    from api.client import BoskoAPI
+    from benchmarks.stub_api import StubCatalog, StubTransport
+    from bot import services
+    from bot.ingest import ingest
+
+    directory = tempfile.mkdtemp(prefix="snapshot-bench-")
+    path = os.path.join(directory, "catalog.snapshot")
+    services.snapshots = None
+    services._api = BoskoAPI(
+        token="bench",
+        transport=StubTransport(StubCatalog(shops=args.shops, per_shop=args.per_shop)),
+    )
+    started = time.perf_counter()
+    version = ingest(path)
+    print(
+        f"{args.shops} shops × {args.per_shop} products: snapshot v{version} of "
+        f"{os.path.getsize(path) / 2**20:.2f} MiB published in "
+        f"{time.perf_counter() - started:.2f}s\n"
+    )
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    for mode, count in (("api", 1), ("snapshot", args.readers)):
+        samples = []
+        for _ in range(count):
+            # One after the other, so that they don't compete for CPU
+            process = context.Process(target=_restart, args=(mode, args, path, results))
+            process.start()
+            samples.append(results.get())
+            process.join()
+        times = ", ".join(f"{elapsed * 1000:.1f}" for _, elapsed, _ in samples)
+        print(
+            f"  {mode:<8} first answer after {times} ms "
+            f"({samples[0][2]} shop/flavor pairs)"
+        )
+
+    print(f"\n  {_check_pinning(path)}")
+
+
+if __name__ == "__main__":
+    main()
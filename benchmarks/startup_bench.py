@@ -0,0 +1,170 @@
+"""Cold-start benchmark — time to first reply against the number of persisted users.
+
+For each user count a pickle persistence file is written with that many users who have
+daily updates configured, and a fresh interpreter starts the bot on it (fake Bot API,
+no network). The child reports how long each start-up phase took, when the reply to a
+``/start`` sent right after start-up arrived, and when all daily jobs were scheduled.
+
+Usage::
+
+    python -m benchmarks.startup_bench --users 1000 10000 50000
+"""
+
+import argparse
+import json
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+CHILD_TIMEOUT = 600
+
+
+def write_persistence(path: str, users: int, seed: int = 0) -> None:
+    """Write a ``PicklePersistence`` file with *users* daily-update subscribers."""
+    from api.models.shop import Shop
+    from benchmarks.stub_api import StubCatalog
+
+    rng = random.Random(seed)
+    catalog = StubCatalog()
+    shops = [Shop(**catalog.shop_payload(shop_id)) for shop_id in catalog.shop_ids]
+    user_data = {}
+    for user_id in range(1, users + 1):
+        favorite_flavors = rng.sample(catalog.flavors, 5)
+        favorite_shops = rng.sample(shops, 3)
+        config = {
+            "update_time": f"{rng.randrange(6, 22):02d}:{rng.randrange(60):02d}",
+            "days": (1, 2, 3, 4, 5),
+            "timezone": "Europe/Warsaw",
+            "favorite_flavors": favorite_flavors,
+            "favorite_shops": favorite_shops,
+            "user_id": user_id,
+            "chat_id": user_id,
+        }
+        user_data[user_id] = {
+            "favorite_flavors": favorite_flavors,
+            "favorite_shops": favorite_shops,
+            "daily_updates_config": config,
+        }
+
+    data = {
+        "conversations": {},
+        "user_data": user_data,
+        "chat_data": {},
+        "bot_data": {},
+        "callback_data": None,
+    }
+    with open(path, "wb") as file:
+        pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+# ── Child process ───────────────────────────────────────────────────
+
+
+def child(path: str, users: int) -> None:
+    started = time.perf_counter()
+    phases: dict[str, float] = {}
+
+    def mark(phase: str) -> None:
+        phases[phase] = round((time.perf_counter() - started) * 1000, 1)
+
+    import asyncio
+
+    from telegram.ext import PicklePersistence
+
+    from benchmarks.fake_telegram import FakeTelegramRequest, UpdateFactory
+    from bot.bosko_bot import build_application
+    from bot.constants import DAILY_JOB_PREFIX
+
+    mark("imports")
+
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        replied = loop.create_future()
+
+        def on_send(chat_id: int, method: str, params: dict) -> None:
+            if chat_id == 0 and not replied.done():
+                replied.set_result(None)
+
+        app = build_application(
+            token="123456:STARTUP-BENCH",
+            persistence=PicklePersistence(filepath=path, update_interval=3600),
+            request=FakeTelegramRequest(on_send=on_send),
+        )
+        mark("build")
+        async with app:
+            mark("initialize")
+            await app.post_init(app)
+            mark("post_init")
+            await app.start()
+            await app.update_queue.put(UpdateFactory(app.bot).text(0, "/start"))
+            await replied
+            mark("first_reply")
+            while (
+                sum(
+                    job.name.startswith(DAILY_JOB_PREFIX)
+                    for job in app.job_queue.scheduler.get_jobs()
+                )
+                < users
+            ):
+                await asyncio.sleep(0.1)
+            mark("jobs_restored")
+            await app.stop()
+
+    asyncio.run(run())
+    print(json.dumps(phases))
+
+
+# ── Driver ──────────────────────────────────────────────────────────
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument(
+        "--child", nargs=2, metavar=("PATH", "USERS"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]))
+        return
+
+    columns = [
+        "imports",
+        "build",
+        "initialize",
+        "post_init",
+        "first_reply",
+        "jobs_restored",
+    ]
+    print(
+        f"{'users':>7} " + " ".join(f"{c:>13}" for c in columns) + "   (ms since start)"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for users in args.users:
+            path = os.path.join(tmp, f"bot_data_{users}")
+            write_persistence(path, users)
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.startup_bench",
+                    "--child",
+                    path,
+                    str(users),
+                ],
+                capture_output=True,
+                text=True,
+                timeout=CHILD_TIMEOUT,
+                check=True,
+            )
+            phases = json.loads(result.stdout.strip().splitlines()[-1])
+            print(f"{users:>7} " + " ".join(f"{phases[c]:>13.1f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""Offline Bosko API stub — a deterministic synthetic catalog served through ``BoskoAPI``.
+
+The stub only replaces ``_make_request`` (or, as :class:`StubTransport`, the transport
+beneath it), so endpoint parsing, pydantic validation and the bot's caching layers run
+exactly as they do against the real API.
+"""
+
+import io
+import json
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import parse_qsl, urlparse
+
+import requests
+from unidecode import unidecode
+
+from api.client import BoskoAPI
+from api.transport import Transport
+
+BASE_FLAVORS = (
+    "Pistacja",
+    "Mascarpone",
+    "Śmietanka",
+    "Czekolada",
+    "Truskawka",
+    "Wanilia",
+    "Malina",
+    "Mango",
+    "Słony karmel",
+    "Orzech laskowy",
+    "Cytryna",
+    "Kokos",
+    "Jagoda",
+    "Tiramisu",
+    "Stracciatella",
+    "Marakuja",
+    "Wiśnia",
+    "Sernik",
+    "Kawa",
+    "Żurawina",
+)
+MODIFIERS = ("", "z solą", "wegańska", "bez cukru", "z białą czekoladą", "sycylijska")
+CITIES = ("Warszawa", "Kraków", "Łódź", "Wrocław", "Poznań", "Gdańsk", "Szczecin")
+
+
+def _norm(text: str) -> str:
+    return unidecode(text.strip().lower())
+
+
+def flavor_names(count: int) -> list[str]:
+    """Return *count* distinct, realistic-looking flavor names."""
+    names = []
+    for i in range(count):
+        base = BASE_FLAVORS[i % len(BASE_FLAVORS)]
+        modifier = MODIFIERS[(i // len(BASE_FLAVORS)) % len(MODIFIERS)]
+        suffix = i // (len(BASE_FLAVORS) * len(MODIFIERS))
+        name = f"{base} {modifier}".strip()
+        names.append(f"{name} {suffix + 1}" if suffix else name)
+    return names
+
+
+class StubCatalog:
+    """Synthetic catalog: *shops* shops, *flavors* flavors, *per_shop* products per shop."""
+
+    def __init__(
+        self, shops: int = 200, flavors: int = 500, per_shop: int = 30, seed: int = 0
+    ):
+        self.flavors = flavor_names(flavors)
+        self.shop_ids = list(range(1, shops + 1))
+        self.per_shop = min(per_shop, flavors)
+        self.seed = seed
+        self.favourite_products: set[int] = set()
+        self.favourite_shops: set[int] = set()
+
+    # ── Payload builders ────────────────────────────────────────────
+
+    def product_payload(self, product_id: int, full: bool = True) -> dict:
+        name = self.flavors[product_id - 1]
+        item = {
+            "id": product_id,
+            "name": name,
+            "isFavourite": product_id in self.favourite_products,
+        }
+        if full:
+            item.update(
+                {
+                    "description": f"{name} — lody rzemieślnicze",
+                    "price": 900 + (product_id % 7) * 50,
+                    "qrCode": {"url": f"https://cdn.example.com/qr/{product_id}.png"},
+                    "photo": {
+                        "url": f"https://cdn.example.com/photo/{product_id}.jpg",
+                        "fileId": 10_000 + product_id,
+                    },
+                    "isAvailableInShop": True,
+                    "isAvailableInGarden": product_id % 3 == 0,
+                }
+            )
+        return item
+
+    def shop_product_ids(self, shop_id: int) -> list[int]:
+        rng = random.Random(self.seed * 1_000_003 + shop_id)
+        return sorted(rng.sample(range(1, len(self.flavors) + 1), self.per_shop))
+
+    def shop_payload(self, shop_id: int) -> dict:
+        city = CITIES[shop_id % len(CITIES)]
+        named = lambda i, n: {"id": i, "name": n}  # noqa: E731
+        hours = {"openingHours": "10:00", "closingHours": "21:00"}
+        return {
+            "id": shop_id,
+            "name": f"Bosko {city} {shop_id}",
+            "description": None,
+            "rating": 4.5,
+            "telephone": "+48 600 000 000",
+            "address": f"ul. Lodowa {shop_id}, {city}",
+            "longitude": 21.0 + shop_id / 1000,
+            "latitude": 52.2 + shop_id / 1000,
+            "checkInsCount": shop_id * 3,
+            "photo": {
+                "url": f"https://cdn.example.com/shop/{shop_id}.jpg",
+                "fileId": shop_id,
+            },
+            "businessHours": {
+                "isOpen": True,
+                **{
+                    day: hours
+                    for day in (
+                        "monday",
+                        "tuesday",
+                        "wednesday",
+                        "thursday",
+                        "friday",
+                        "saturday",
+                        "sunday",
+                    )
+                },
+            },
+            "country": named(1, "Polska"),
+            "region": named(2, "Mazowieckie"),
+            "city": named(CITIES.index(city) + 1, city),
+            "company": {
+                "id": 1,
+                "industry": named(1, "Lodziarnia"),
+                "logo": {"url": "https://cdn.example.com/logo.png", "fileId": 1},
+                "cover": None,
+                "name": "Bosko",
+                "subdomain": "bosko",
+                "description": None,
+                "address": "ul. Lodowa 1, Warszawa",
+                "longitude": 21.0,
+                "latitude": 52.2,
+                "isTapOnPaymentEnabled": False,
+                "isTapOnPaymentViaMobileDeviceEnabled": False,
+                "isCorrectionEnabled": False,
+                "isCorrectionAvailableInAnyOfShops": False,
+                "gracePeriodInHours": 24,
+                "country": named(1, "Polska"),
+                "region": named(2, "Mazowieckie"),
+                "city": named(1, "Warszawa"),
+                "currency": {"code": "PLN", "symbol": "zł", "numberToBasic": 100},
+                "loyaltyProgram": {
+                    "description": None,
+                    "isBasedOnPoints": True,
+                    "isBasedOnRebate": False,
+                    "isBasedOnProduct": False,
+                    "type": "points",
+                    "isReceiptsScannerEnabled": False,
+                    "hasJoinForm": False,
+                    "isJoined": True,
+                    "hasFilledJoinForm": False,
+                    "points": 0,
+                    "pointsInPending": 0,
+                    "pointsForCheckIn": None,
+                    "prizesCount": 0,
+                    "prizesCountWhichUserCanAfford": 0,
+                },
+                "spentMoney": 0,
+                "spentMoneyInPending": 0,
+                "deposit": 0,
+            },
+            "social": {
+                "facebook": None,
+                "isCheckInPossible": False,
+                "pointsCollectedInLastHour": None,
+            },
+            "hasGarden": shop_id % 4 == 0,
+            "garden": None,
+            "availableFavouriteProducts": [
+                self.product_payload(pid, full=False)
+                for pid in self.shop_product_ids(shop_id)
+                if pid in self.favourite_products
+            ],
+            "isFavourite": shop_id in self.favourite_shops,
+        }
+
+    # ── Endpoint emulation ──────────────────────────────────────────
+
+    @staticmethod
+    def _page(items: list, params: dict) -> list:
+        limit = params.get("limit")
+        page = params.get("currentPage") or 1
+        if not limit:
+            return items
+        start = (int(page) - 1) * int(limit)
+        return items[start : start + int(limit)]
+
+    def respond(self, method: str, path: str, params: dict) -> dict:
+        if path == "/JSON/Authorization/login":
+            return {"result": True, "data": "stub-session"}
+        if path == "/JSON/Shops/getAll":
+            return {
+                "result": True,
+                "data": [
+                    self.shop_payload(i) for i in self._page(self.shop_ids, params)
+                ],
+            }
+        if path == "/JSON/Products/getAll":
+            ids = self.shop_product_ids(int(params["shopId"]))
+            return {
+                "result": True,
+                "data": [self.product_payload(i) for i in self._page(ids, params)],
+            }
+        if path == "/JSON/Products/search":
+            phrase = _norm(params.get("phrase") or "")
+            ids = [i for i, name in enumerate(self.flavors, 1) if phrase in _norm(name)]
+            return {
+                "result": True,
+                "data": [
+                    self.product_payload(i, full=False) for i in self._page(ids, params)
+                ],
+            }
+        if path in ("/JSON/Product/markAsFavourite", "/JSON/Shop/markAsFavourite"):
+            target = (
+                self.favourite_products if "Product" in path else self.favourite_shops
+            )
+            state = str(params.get("state")).lower() in ("true", "1")
+            (target.add if state else target.discard)(int(params["id"]))
+            return {"result": True, "data": None}
+        raise ValueError(f"Stub API has no route for {method.upper()} {path}")
+
+
+class StubBoskoAPI(BoskoAPI):
+    """``BoskoAPI`` answering from a :class:`StubCatalog` with simulated upstream latency."""
+
+    def __init__(self, catalog: StubCatalog | None = None, latency: float = 0.0):
+        super().__init__(token="stub-session", base_url="https://stub.invalid")
+        self.catalog = catalog or StubCatalog()
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _make_request(self, method: str, path: str, headers=None, auth=True, **kwargs):
+        params = {
+            k: v for k, v in (kwargs.get("params") or {}).items() if v is not None
+        }
+        with self._lock:
+            self.calls[urlparse(path).path] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        return _json_response(
+            self.catalog.respond(method, path, params), f"{self.base_url}{path}"
+        )
+
+
+class StubTransport(Transport):
+    """Transport answering from a :class:`StubCatalog` with simulated upstream latency."""
+
+    def __init__(self, catalog: StubCatalog | None = None, latency: float = 0.0):
+        self.catalog = catalog or StubCatalog()
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def send(self, session, request, stream=False):
+        url = urlparse(request.url)
+        params = dict(parse_qsl(url.query))
+        with self._lock:
+            self.calls[url.path] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        payload = self.catalog.respond(request.method.lower(), url.path, params)
+        return _json_response(payload, request.url)
+
+
+def _json_response(payload: dict, url: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["content-type"] = "application/json; charset=utf-8"
+    response.raw = io.BytesIO(json.dumps(payload).encode())
+    response.url = url
+    return response
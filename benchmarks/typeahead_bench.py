@@ -0,0 +1,102 @@
+"""Typeahead benchmark — answering inline-query keystrokes from the prefix index.
+
+Loads a stub catalog (``--flavors`` flavors, ``--shops`` shops, with the product lists
+of every shop) and types ``--names`` random flavor and shop names one keystroke at a
+time, answering each keystroke with:
+
+* ``search + scan`` — ``cached_api_search`` for flavors plus a scan of
+  ``get_cached_shops()`` for shops, ranked the same way,
+* ``prefix index`` — :class:`bot.typeahead.PrefixIndex`.
+
+Reports the index build time, the time per keystroke and the upstream requests made
+while typing.
+
+Usage::
+
+    python -m benchmarks.typeahead_bench --flavors 1500 --shops 600
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+
+from api.client import BoskoAPI
+from benchmarks.load_test import _percentiles
+from benchmarks.stub_api import StubCatalog, StubTransport
+from bot import services
+from bot.typeahead import PrefixIndex, build_suggestions
+
+LIMIT = 20
+
+
+def search_and_scan(prefix: str, stocking: Counter) -> list[str]:
+    """The suggestions without an index: the API search and a scan of every shop."""
+    flavors = [
+        (stocking[services.catalog.intern(product.name)], product.name)
+        for product in services.cached_api_search(prefix)
+    ]
+    shops = [
+        (shop.checkInsCount, shop.name)
+        for shop in services.get_cached_shops()
+        if prefix in services.normalize(shop.name)
+    ]
+    return [name for _, name in sorted(flavors + shops, reverse=True)[:LIMIT]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flavors", type=int, default=1500)
+    parser.add_argument("--shops", type=int, default=600)
+    parser.add_argument("--names", type=int, default=300)
+    parser.add_argument("--upstream-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    catalog = StubCatalog(shops=args.shops, flavors=args.flavors)
+    transport = StubTransport(catalog)
+    services._api = BoskoAPI(token="bench", transport=transport)
+    for shop in services.get_cached_shops():
+        services.get_products_at_shop(shop.id)
+    transport.latency = args.upstream_latency
+    stocking = Counter(
+        flavor_id
+        for flavor_ids in services.catalog.stock().values()
+        for flavor_id in flavor_ids
+    )
+
+    started = time.perf_counter()
+    index = PrefixIndex(build_suggestions(Counter(), Counter()))
+    built = time.perf_counter() - started
+
+    rng = random.Random(0)
+    names = rng.choices(catalog.flavors, k=args.names // 2) + [
+        catalog.shop_payload(shop_id)["name"]
+        for shop_id in rng.choices(catalog.shop_ids, k=args.names // 2)
+    ]
+    keystrokes = [
+        services.normalize(name)[:length]
+        for name in names
+        for length in range(1, len(name) + 1)
+    ]
+    print(
+        f"{args.flavors} flavors, {args.shops} shops, {len(keystrokes)} keystrokes, "
+        f"{args.upstream_latency * 1000:.0f} ms upstream latency\n"
+    )
+    print(f"  index of {len(index)} suggestions built in {built * 1000:.0f} ms\n")
+
+    for path in ("search + scan", "prefix index"):
+        calls = sum(transport.calls.values())
+        samples = []
+        for prefix in keystrokes:
+            started = time.perf_counter()
+            if path == "prefix index":
+                index.lookup(prefix, LIMIT)
+            else:
+                search_and_scan(prefix, stocking)
+            samples.append(time.perf_counter() - started)
+        print(f"  {path:<13} {_percentiles(samples)}")
+        print(f"  {'':<13} upstream requests: {sum(transport.calls.values()) - calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Account favorites — mirror users' favorite flavors onto the bot's Bosko account.
+
+With ``FAVORITES_MODE=account``, every product any user has a favorite flavor for is
+marked as favourite on the bot's account. The shop list then reports, per shop, which
+of them are in stock (``availableFavouriteProducts``), so the daily checks of all users
+are answered by one shop-list request instead of a product-list request per shop.
+"""
+
+import asyncio
+import logging
+
+from telegram.ext import Application
+
+from bot.constants import FAVORITES_SYNC_CONCURRENCY, SEARCH_RESULTS_LIMIT
+from bot.services import favorite_product_ids, get_api, get_favorite_availability
+
+logger = logging.getLogger(__name__)
+
+
+class AccountFavorites:
+    """The products marked as favourite on the account, synced with bounded concurrency.
+
+    Args:
+        concurrency: ``markAsFavourite`` requests in flight at once.
+    """
+
+    def __init__(self, concurrency: int):
+        self._concurrency = concurrency
+        self._marked: set[int] | None = None
+        self._lock = asyncio.Lock()
+
+    async def _load_marked(self) -> set[int]:
+        if self._marked is None:
+            products = await asyncio.to_thread(
+                get_api().products.search, None, limit=SEARCH_RESULTS_LIMIT
+            )
+            self._marked = {product.id for product in products if product.isFavourite}
+        return self._marked
+
+    async def _mark_all(self, product_ids, state: bool) -> set[int]:
+        """Mark (or unmark) *product_ids* concurrently; returns those that succeeded."""
+        slots = asyncio.Semaphore(self._concurrency)
+        mark = get_api().products.mark_as_favourite
+
+        async def _mark(product_id: int) -> int | None:
+            async with slots:
+                try:
+                    await asyncio.to_thread(mark, product_id, state)
+                except Exception:
+                    logger.warning(
+                        "Error marking product %s as favourite=%s",
+                        product_id,
+                        state,
+                        exc_info=True,
+                    )
+                    return None
+            return product_id
+
+        done = await asyncio.gather(*(_mark(pid) for pid in sorted(product_ids)))
+        return {product_id for product_id in done if product_id is not None}
+
+    async def ensure(self, product_ids) -> bool:
+        """Mark any of *product_ids* that aren't favourites yet.
+
+        Returns:
+            Whether anything was newly marked.
+        """
+        async with self._lock:
+            marked = await self._load_marked()
+            missing = set(product_ids) - marked
+            if not missing:
+                return False
+            marked |= await self._mark_all(missing, True)
+            return True
+
+    async def sync(self, product_ids) -> tuple[int, int]:
+        """Make *product_ids* exactly the account's favourites.
+
+        Returns:
+            The number of products marked and unmarked.
+        """
+        async with self._lock:
+            marked = await self._load_marked()
+            wanted = set(product_ids)
+            added = await self._mark_all(wanted - marked, True)
+            removed = await self._mark_all(marked - wanted, False)
+            marked |= added
+            marked -= removed
+            return len(added), len(removed)
+
+
+account_favorites = AccountFavorites(FAVORITES_SYNC_CONCURRENCY)
+
+
+async def sync_account_favorites(application: Application) -> None:
+    """Mirror the favorite flavors of every user onto the account (at start-up)."""
+    names = {
+        name
+        for user_data in application.user_data.values()
+        for name in user_data.get("favorite_flavors", [])
+    }
+    try:
+        product_ids = await asyncio.to_thread(favorite_product_ids, names)
+        added, removed = await account_favorites.sync(product_ids)
+    except Exception:
+        logger.warning("Account favorites sync failed", exc_info=True)
+        return
+    if added or removed:
+        get_favorite_availability.cache.invalidate(())
+    logger.info(
+        "Synced %d account favorites (%d marked, %d unmarked)",
+        len(product_ids),
+        added,
+        removed,
+    )
+
+
+async def find_available(
+    flavor_names, flavor_ids: frozenset[int], shop_ids
+) -> list[tuple[int, int]]:
+    """Favorite flavors in stock at favorite shops, from the account's favourites.
+
+    Args:
+        flavor_names: The user's favorite flavor display names (marked if needed).
+        flavor_ids: Their catalog flavor IDs.
+        shop_ids: The user's favorite shops.
+
+    Returns:
+        ``(shop_id, flavor_id)`` pairs, like ``AvailabilityMatrix.match``.
+    """
+    product_ids = await asyncio.to_thread(favorite_product_ids, flavor_names)
+    if await account_favorites.ensure(product_ids):
+        # Fetched before these were favourites, so it can't report them
+        get_favorite_availability.cache.invalidate(())
+    available = await asyncio.to_thread(get_favorite_availability)
+    return [
+        (shop_id, flavor_id)
+        for shop_id in shop_ids
+        for flavor_id in sorted(available.get(shop_id, frozenset()) & flavor_ids)
+    ]
@@ -0,0 +1,186 @@
+"""Bit-packed shop × flavor availability matrix for vectorized favorites matching.
+
+NumPy is imported on first use rather than with the module, which every handler
+imports through ``bot.services``: it would add ~75 ms to start-up.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Iterable, NamedTuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_WORD_BITS = 64
+
+
+def _words_for(flavor_count: int) -> int:
+    return max(1, -(-flavor_count // _WORD_BITS))
+
+
+def pack_flavors(flavor_ids: Iterable[int], words: int) -> np.ndarray:
+    """Bitmask (``uint64[words]``) with the bit of every flavor ID set."""
+    import numpy as np
+
+    ids = np.fromiter(flavor_ids, dtype=np.int64)
+    mask = np.zeros(words, dtype=np.uint64)
+    if ids.size:
+        np.bitwise_or.at(
+            mask,
+            ids // _WORD_BITS,
+            np.left_shift(np.uint64(1), (ids % _WORD_BITS).astype(np.uint64)),
+        )
+    return mask
+
+
+def unpack_flavors(masks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """``(row, flavor_id)`` index pairs of every set bit in a 2-D ``uint64`` mask array."""
+    import numpy as np
+
+    bits = np.unpackbits(
+        np.ascontiguousarray(masks).view(np.uint8), axis=1, bitorder="little"
+    )
+    return np.nonzero(bits)
+
+
+class Subscribers(NamedTuple):
+    """Favorites of many users in matrix form.
+
+    ``flavor_masks[u]`` is user *u*'s flavor bitmask and ``shop_mask[u, r]`` is set when
+    the shop in matrix row *r* is one of their favorite shops.
+    """
+
+    flavor_masks: np.ndarray  # uint64[users, words]
+    shop_mask: np.ndarray  # bool[users, shop rows]
+
+
+class AvailabilityMatrix:
+    """Which flavors are stocked where, as one bit per (shop, canonical flavor).
+
+    Rows are shops and bit columns are the flavor IDs of :class:`bot.catalog.FlavorCatalog`.
+    A shop's row is rewritten in place when its product list changes, so the matrix is
+    maintained incrementally rather than rebuilt per check.
+    """
+
+    def __init__(self, shops: int = 64, flavors: int = 512):
+        self._rows: dict[int, int] = {}
+        self._shop_ids: list[int] = []
+        self._shape = (shops, _words_for(flavors))
+        self._bits: np.ndarray | None = None  # allocated on first use
+        self._lock = threading.Lock()
+
+    @property
+    def words(self) -> int:
+        return self._shape[1] if self._bits is None else self._bits.shape[1]
+
+    def _matrix(self) -> np.ndarray:
+        # Call with the lock held
+        if self._bits is None:
+            import numpy as np
+
+            self._bits = np.zeros(self._shape, dtype=np.uint64)
+        return self._bits
+
+    @property
+    def shop_ids(self) -> list[int]:
+        """Shop ID of every matrix row, in row order."""
+        return list(self._shop_ids)
+
+    def row_of(self, shop_id: int) -> int | None:
+        return self._rows.get(shop_id)
+
+    def set_shop(self, shop_id: int, flavor_ids: Iterable[int]) -> None:
+        """Replace the availability row of *shop_id*."""
+        import numpy as np
+
+        flavor_ids = list(flavor_ids)
+        with self._lock:
+            self._matrix()
+            needed_words = _words_for(max(flavor_ids, default=0) + 1)
+            if needed_words > self.words:
+                self._bits = np.pad(
+                    self._bits,
+                    ((0, 0), (0, max(needed_words, 2 * self.words) - self.words)),
+                )
+
+            row = self._rows.get(shop_id)
+            if row is None:
+                row = self._rows[shop_id] = len(self._shop_ids)
+                self._shop_ids.append(shop_id)
+                if row >= self._bits.shape[0]:
+                    self._bits = np.pad(self._bits, ((0, self._bits.shape[0]), (0, 0)))
+
+            self._bits[row] = pack_flavors(flavor_ids, self.words)
+
+    def subscribers(
+        self, favorites: Iterable[tuple[Iterable[int], Iterable[int]]]
+    ) -> Subscribers:
+        """Build matrix-form favorites from ``(flavor_ids, shop_ids)`` per user."""
+        import numpy as np
+
+        user_flavors: list[int] = []
+        flavor_ids: list[int] = []
+        user_shops: list[int] = []
+        shop_rows: list[int] = []
+        users = 0
+        with self._lock:
+            words, rows = self.words, len(self._shop_ids)
+            for user, (flavors, shops) in enumerate(favorites):
+                users += 1
+                for flavor_id in flavors:
+                    user_flavors.append(user)
+                    flavor_ids.append(flavor_id)
+                for shop_id in shops:
+                    row = self._rows.get(shop_id)
+                    if row is not None:
+                        user_shops.append(user)
+                        shop_rows.append(row)
+
+        flavor_masks = np.zeros((users, words), dtype=np.uint64)
+        flavors = np.asarray(flavor_ids, dtype=np.int64)
+        known = flavors < words * _WORD_BITS
+        np.bitwise_or.at(
+            flavor_masks,
+            (
+                np.asarray(user_flavors, dtype=np.int64)[known],
+                flavors[known] // _WORD_BITS,
+            ),
+            np.left_shift(
+                np.uint64(1), (flavors[known] % _WORD_BITS).astype(np.uint64)
+            ),
+        )
+        shop_mask = np.zeros((users, rows), dtype=bool)
+        shop_mask[user_shops, shop_rows] = True
+        return Subscribers(flavor_masks, shop_mask)
+
+    def match_all(self, subscribers: Subscribers) -> list[list[tuple[int, int]]]:
+        """For every user, the ``(shop_id, flavor_id)`` pairs of favorite flavors in stock
+        at favorite shops — computed for all users with a few vectorized operations."""
+        import numpy as np
+
+        with self._lock:
+            bits = self._matrix()[
+                : subscribers.shop_mask.shape[1], : subscribers.flavor_masks.shape[1]
+            ]
+            users, rows = np.nonzero(subscribers.shop_mask)
+            hits = bits[rows] & subscribers.flavor_masks[users]
+            hit_pairs = np.flatnonzero(hits.any(axis=1))
+            pair_index, flavor_ids = unpack_flavors(hits[hit_pairs])
+            shop_ids = np.asarray(self._shop_ids, dtype=np.int64)
+
+        results: list[list[tuple[int, int]]] = [
+            [] for _ in range(subscribers.shop_mask.shape[0])
+        ]
+        pairs = hit_pairs[pair_index]
+        for user, shop_id, flavor_id in zip(
+            users[pairs].tolist(), shop_ids[rows[pairs]].tolist(), flavor_ids.tolist()
+        ):
+            results[user].append((shop_id, flavor_id))
+        return results
+
+    def match(
+        self, flavor_ids: Iterable[int], shop_ids: Iterable[int]
+    ) -> list[tuple[int, int]]:
+        """``(shop_id, flavor_id)`` pairs for a single user's favorites."""
+        return self.match_all(self.subscribers([(flavor_ids, shop_ids)]))[0]
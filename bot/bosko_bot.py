@@ -1,29 +1,74 @@
 """Bosko Ice Cream Bot — application entry point and wiring."""
 
+import asyncio
 import logging
 import os
 
+from bot.startup import startup  # starts the start-up clock before heavy imports
+
 from dotenv import load_dotenv
 from telegram import Update, BotCommand
 from telegram.ext import (
     ApplicationBuilder,
+    BasePersistence,
     CommandHandler,
+    ContextTypes,
     Application,
+    CallbackQueryHandler,
+    InlineQueryHandler,
+    MessageHandler,
     PicklePersistence,
+    TypeHandler,
+    filters,
 )
+from telegram.request import BaseRequest
 
+from bot.constants import (
+    CACHE_REFRESH_INTERVAL_SECONDS,
+    CATALOG_SNAPSHOT_PATH,
+    CHAT_MESSAGES_PER_SECOND,
+    CONCURRENT_UPDATES,
+    FAVORITES_MODE,
+    GLOBAL_MESSAGES_PER_SECOND,
+    GROUP_MESSAGES_PER_MINUTE,
+    NOTIFICATION_SPREAD_SECONDS,
+    SEND_MAX_RETRIES,
+    SNAPSHOT_CHECK_INTERVAL_SECONDS,
+    WEBHOOK_LISTEN,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET_TOKEN,
+    WEBHOOK_URL,
+)
+from bot.account_favorites import sync_account_favorites
 from bot.handlers.commands import (
     start,
     products,
+    product_photos,
     shops_command,
     search_flavor,
     search_available,
+    flavor_history,
     show_favorites,
     remove_favorite,
     stop_daily_updates,
 )
 from bot.handlers.favorites import build_favorites_handler
 from bot.handlers.daily_updates import build_daily_updates_handler, restore_daily_jobs
+from bot.outbound import PriorityRateLimiter
+from bot.pagination import CALLBACK_PREFIX, flip_page
+from bot.progressive import cancel_scan_on_command
+from bot.scratch import purge_legacy_scratch
+from bot.services import pin_snapshot
+from bot.typeahead import inline_suggestions, refresh_typeahead
+from bot.update_processor import PerChatUpdateProcessor
+from bot.warmup import (
+    check_snapshot_job,
+    refresh_caches_job,
+    warm_up_caches,
+    warm_up_shops,
+)
+from bot import workers
 
 load_dotenv()
 
@@ -31,10 +76,21 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
 )
 logging.getLogger("httpx").setLevel(logging.WARNING)
+# APScheduler logs every job added and run, i.e. one line per subscriber at start-up
+logging.getLogger("apscheduler").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 
+# Runs after every other handler group, i.e. once an update has been answered
+_AFTER_HANDLERS_GROUP = 100
+# Runs before every other handler group
+_BEFORE_HANDLERS_GROUP = -1
+# Runs first of all
+_PIN_GROUP = -2
+
+startup.mark("imports")
+
 
 # ── Bot commands shown in Telegram menu ─────────────────────────────
 
@@ -42,8 +98,10 @@ BOT_COMMANDS = [
     BotCommand("start", "Welcome message"),
     BotCommand("shops", "List all shops or search by name"),
     BotCommand("products", "Show products at a shop (e.g., /products Ursynów)"),
+    BotCommand("photos", "Show product photos at a shop (e.g., /photos Ursynów)"),
     BotCommand("search", "Search for flavors using API (e.g., /search mascarpone)"),
     BotCommand("search_available", "Search for flavors currently available at shops"),
+    BotCommand("history", "When and where a flavor was last available"),
     BotCommand("add_favorite", "Add favorite flavors or shops"),
     BotCommand("favorites", "Show your favorite flavors and shops"),
     BotCommand("remove_favorite", "Remove favorite flavors or shops"),
@@ -52,29 +110,122 @@ BOT_COMMANDS = [
 ]
 
 
-# ── Post-init hook ──────────────────────────────────────────────────
+# ── Start-up hooks ──────────────────────────────────────────────────
 
 
 async def post_init(application: Application) -> None:
-    """Register bot commands and restore persisted daily-update jobs."""
+    """Register bot commands and defer everything not needed for the first reply."""
+    startup.mark("initialize")
+    # Worker threads (WORKER_THREADS) for everything run off the event loop
+    workers.install(asyncio.get_running_loop())
     await application.bot.set_my_commands(BOT_COMMANDS)
-    await restore_daily_jobs(application)
+    # Nearly every command needs the shop list; product lists load in the background
+    await warm_up_shops()
+    # Runs as soon as the application has started, alongside the first updates
+    application.job_queue.run_once(deferred_startup, when=0, name="deferred_startup")
+    application.job_queue.run_repeating(
+        refresh_caches_job,
+        interval=CACHE_REFRESH_INTERVAL_SECONDS,
+        first=CACHE_REFRESH_INTERVAL_SECONDS,
+        name="refresh_caches",
+    )
+    if CATALOG_SNAPSHOT_PATH:
+        application.job_queue.run_repeating(
+            check_snapshot_job,
+            interval=SNAPSHOT_CHECK_INTERVAL_SECONDS,
+            first=SNAPSHOT_CHECK_INTERVAL_SECONDS,
+            name="check_snapshot",
+        )
+    startup.mark("post_init")
+
+
+async def post_shutdown(application: Application) -> None:
+    """Stop the CPU worker processes, if any were started."""
+    workers.shutdown()
+
+
+def _favorite_shop_ids(application: Application) -> set[int]:
+    """Shops whose product lists local-mode daily checks will need."""
+    if FAVORITES_MODE == "account":
+        return set()
+    return {
+        shop.id
+        for user_data in application.user_data.values()
+        for shop in user_data.get("favorite_shops", [])
+    }
+
+
+async def deferred_startup(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Restore persisted daily-update jobs, load the catalog and the product lists of
+    favorite shops in the background (and, in account favorites mode, sync the
+    account's favourites), then build the inline typeahead index."""
+    application = context.application
+    purge_legacy_scratch(application)
+    tasks = [
+        restore_daily_jobs(application),
+        warm_up_caches(_favorite_shop_ids(application)),
+    ]
+    if FAVORITES_MODE == "account":
+        tasks.append(sync_account_favorites(application))
+    await asyncio.gather(*tasks)
+    await refresh_typeahead(application)
+
+
+async def _pin_snapshot(update: object, context: ContextTypes.DEFAULT_TYPE):
+    pin_snapshot()
+
+
+async def _record_first_reply(update: object, context: ContextTypes.DEFAULT_TYPE):
+    startup.reply_sent()
 
 
 # ── Application factory ─────────────────────────────────────────────
 
 
-def main() -> None:
-    """Build, wire, and run the bot."""
-    data_file_path = os.getenv("DATA_FILE_PATH", "./data/bot_data")
-    persistence = PicklePersistence(filepath=data_file_path)
+def build_application(
+    token: str | None = None,
+    persistence: BasePersistence | None = None,
+    request: BaseRequest | None = None,
+) -> Application:
+    """Build the application and register every handler.
+
+    Args:
+        token: Telegram bot token (defaults to ``BOT_TOKEN``).
+        persistence: Persistence backend (defaults to ``PicklePersistence`` at
+            ``DATA_FILE_PATH``).
+        request: Optional custom Bot API transport, used for both regular calls and
+            ``getUpdates`` (e.g. a fake transport for load testing).
+    """
+    if persistence is None:
+        data_file_path = os.getenv("DATA_FILE_PATH", "./data/bot_data")
+        persistence = PicklePersistence(filepath=data_file_path)
 
-    app = (
+    builder = (
         ApplicationBuilder()
-        .token(BOT_TOKEN)
+        .token(token or BOT_TOKEN)
         .persistence(persistence)
         .post_init(post_init)
-        .build()
+        .post_shutdown(post_shutdown)
+        .concurrent_updates(PerChatUpdateProcessor(max(1, CONCURRENT_UPDATES)))
+        .rate_limiter(
+            PriorityRateLimiter(
+                overall_rate=GLOBAL_MESSAGES_PER_SECOND,
+                chat_rate=CHAT_MESSAGES_PER_SECOND,
+                group_rate=GROUP_MESSAGES_PER_MINUTE / 60,
+                spread_window=NOTIFICATION_SPREAD_SECONDS,
+                max_retries=SEND_MAX_RETRIES,
+            )
+        )
+    )
+    if request is not None:
+        builder = builder.request(request).get_updates_request(request)
+    app = builder.build()
+
+    # Every handler of an update reads the catalog snapshot current when it arrived
+    app.add_handler(TypeHandler(Update, _pin_snapshot), _PIN_GROUP)
+    # A new command cancels the chat's in-flight /search_available or /products scan
+    app.add_handler(
+        MessageHandler(filters.COMMAND, cancel_scan_on_command), _BEFORE_HANDLERS_GROUP
     )
 
     # Conversation handlers (must be registered before simple command handlers)
@@ -84,13 +235,48 @@ def main() -> None:
     # Simple command handlers
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("products", products))
+    app.add_handler(CommandHandler("photos", product_photos))
     app.add_handler(CommandHandler("shops", shops_command))
     app.add_handler(CommandHandler("search", search_flavor))
     app.add_handler(CommandHandler("search_available", search_available))
+    app.add_handler(CommandHandler("history", flavor_history))
     app.add_handler(CommandHandler("favorites", show_favorites))
     app.add_handler(CommandHandler("remove_favorite", remove_favorite))
     app.add_handler(CommandHandler("stop_daily_updates", stop_daily_updates))
 
+    # Prev/next buttons of paginated results
+    app.add_handler(CallbackQueryHandler(flip_page, pattern=f"^{CALLBACK_PREFIX}"))
+    # Inline typeahead (@bot pista…)
+    app.add_handler(InlineQueryHandler(inline_suggestions))
+
+    app.add_handler(TypeHandler(Update, _record_first_reply), _AFTER_HANDLERS_GROUP)
+
+    return app
+
+
+def main() -> None:
+    """Build, wire, and run the bot."""
+    app = build_application()
+    startup.mark("build")
+
+    if WEBHOOK_URL:
+        # Local listener behind the reverse proxy; Telegram posts to WEBHOOK_URL/WEBHOOK_PATH
+        logger.info(
+            "Bot is running (webhook on %s:%d/%s)...",
+            WEBHOOK_LISTEN,
+            WEBHOOK_PORT,
+            WEBHOOK_PATH,
+        )
+        app.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET_TOKEN,
+            allowed_updates=Update.ALL_TYPES,
+        )
+        return
+
     logger.info("Bot is running...")
     app.run_polling(allowed_updates=Update.ALL_TYPES)
 
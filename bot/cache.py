@@ -0,0 +1,591 @@
+"""Memory-bounded, scan-resistant caching for catalog data (W-TinyLFU with per-entry TTL)."""
+
+import functools
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+_ATOMIC = (str, bytes, int, float, bool, type(None))
+_SAMPLE = 8
+
+
+def approx_sizeof(obj: Any, _seen: set[int] | None = None) -> int:
+    """Approximate deep size of *obj* in bytes (containers, pydantic models, plain objects)."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _ATOMIC):
+        return size
+    if isinstance(obj, dict):
+        size += sum(
+            approx_sizeof(k, _seen) + approx_sizeof(v, _seen) for k, v in obj.items()
+        )
+    elif isinstance(obj, (list, tuple)) and len(obj) > _SAMPLE:
+        # Homogeneous API lists: extrapolate from a sample instead of walking everything
+        sample = sum(approx_sizeof(item, _seen) for item in obj[:_SAMPLE])
+        size += sample * len(obj) // _SAMPLE
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_sizeof(item, _seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += approx_sizeof(vars(obj), _seen)
+    return size
+
+
+class CountMinSketch:
+    """Approximate access-frequency counter with periodic aging (the "TinyLFU" part).
+
+    Counters saturate at 15 and are halved every ``sample_size`` increments, so the
+    sketch reflects recent popularity rather than all-time counts.
+    """
+
+    MAX_COUNT = 15
+    # Odd 64-bit multipliers, one per row (multiplicative hashing keeps the top bits)
+    SEEDS = (
+        0x9E3779B97F4A7C15,
+        0xC2B2AE3D27D4EB4F,
+        0x165667B19E3779F9,
+        0xD6E8FEB86659FD93,
+    )
+
+    def __init__(self, width: int = 1024):
+        self._bits = max(4, (width - 1).bit_length())
+        self._width = 1 << self._bits
+        self._rows = [bytearray(self._width) for _ in self.SEEDS]
+        self._sample_size = 10 * self._width
+        self._additions = 0
+
+    def _indexes(self, key: Hashable):
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        shift = 64 - self._bits
+        for row, seed in enumerate(self.SEEDS):
+            yield row, ((h * seed) & 0xFFFFFFFFFFFFFFFF) >> shift
+
+    def increment(self, key: Hashable) -> None:
+        for row, index in self._indexes(key):
+            if self._rows[row][index] < self.MAX_COUNT:
+                self._rows[row][index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            for row in self._rows:
+                for index in range(self._width):
+                    row[index] >>= 1
+            self._additions //= 2
+
+    def frequency(self, key: Hashable) -> int:
+        return min(self._rows[row][index] for row, index in self._indexes(key))
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires")
+
+    def __init__(self, value: Any, size: int, expires: float):
+        self.value = value
+        self.size = size
+        self.expires = expires
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+    evictions: int
+    rejections: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TinyLFUCache:
+    """A cache bounded by approximate memory footprint, using the W-TinyLFU policy.
+
+    New entries land in a small LRU *window*. Entries leaving the window compete for a
+    place in the segmented-LRU *main* area against its least valuable entry, and are
+    only admitted when the frequency sketch says they are accessed more often. A sweep
+    over more keys than fit therefore cannot flush the frequently used entries, which is
+    exactly where plain LRU degrades to a 0% hit rate.
+
+    Args:
+        max_bytes: Upper bound on the summed ``sizeof`` of cached values.
+        sizeof: Function returning the approximate size of a value in bytes.
+        window_ratio: Share of ``max_bytes`` given to the admission window.
+        protected_ratio: Share of the main area reserved for entries hit at least twice.
+        name: What the cache holds, for log messages.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        sizeof: Callable[[Any], int] = approx_sizeof,
+        window_ratio: float = 0.01,
+        protected_ratio: float = 0.8,
+        name: str = "cache",
+    ):
+        self.max_bytes = max_bytes
+        self.name = name
+        self._sizeof = sizeof
+        self._window_max = max(1, int(max_bytes * window_ratio))
+        self._main_max = max_bytes - self._window_max
+        self._protected_max = int(self._main_max * protected_ratio)
+
+        self._window: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._probation: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._protected: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._window_bytes = self._probation_bytes = self._protected_bytes = 0
+
+        self._sketch = CountMinSketch()
+        self._lock = threading.RLock()
+        self._hits = self._misses = self._evictions = self._rejections = 0
+
+    # ── Public API ──────────────────────────────────────────────────
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Return ``(True, value)`` on a fresh hit, ``(False, None)`` otherwise."""
+        with self._lock:
+            self._sketch.increment(key)
+            entry = self._lookup(key)
+            if entry is None:
+                self._misses += 1
+                return False, None
+            self._hits += 1
+            return True, entry.value
+
+    def put(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Insert or replace *key*; values larger than the whole cache are not stored.
+
+        A key that is already cached is replaced in place, keeping its segment, so a
+        refreshed entry doesn't have to win admission again.
+        """
+        size = self._sizeof(value)
+        expires = time.monotonic() + ttl
+        with self._lock:
+            if size > self.max_bytes:
+                self._remove(key)
+                self._rejections += 1
+                logger.warning(
+                    "Not caching %s%r: %.1f MiB exceeds its %.1f MiB budget",
+                    self.name,
+                    key,
+                    size / 2**20,
+                    self.max_bytes / 2**20,
+                )
+                return
+            for segment, attr in self._segments():
+                entry = segment.get(key)
+                if entry is not None:
+                    setattr(self, attr, getattr(self, attr) + size - entry.size)
+                    entry.value, entry.size, entry.expires = value, size, expires
+                    self._evict_window()
+                    self._shrink_main(keep=key)
+                    return
+            self._window[key] = _Entry(value, size, expires)
+            self._window_bytes += size
+            self._evict_window()
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for segment in (self._window, self._probation, self._protected):
+                segment.clear()
+            self._window_bytes = self._probation_bytes = self._protected_bytes = 0
+
+    def frequency(self, key: Hashable) -> int:
+        """Recent access frequency of *key* as estimated by the sketch (0–15)."""
+        with self._lock:
+            return self._sketch.frequency(key)
+
+    def expires_in(self, key: Hashable) -> float | None:
+        """Seconds until *key* expires, or ``None`` if it isn't cached.
+
+        Unlike :meth:`get` this is not an access: it affects neither recency,
+        frequency nor the hit statistics.
+        """
+        with self._lock:
+            for segment, _ in self._segments():
+                entry = segment.get(key)
+                if entry is not None:
+                    return max(0.0, entry.expires - time.monotonic())
+            return None
+
+    def keys(self) -> list[Hashable]:
+        with self._lock:
+            return [*self._window, *self._probation, *self._protected]
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                entries=len(self._window) + len(self._probation) + len(self._protected),
+                size_bytes=self._window_bytes
+                + self._probation_bytes
+                + self._protected_bytes,
+                max_bytes=self.max_bytes,
+                evictions=self._evictions,
+                rejections=self._rejections,
+            )
+
+    # ── Internals ───────────────────────────────────────────────────
+
+    def _lookup(self, key: Hashable) -> _Entry | None:
+        if key in self._window:
+            entry = self._window[key]
+            self._window.move_to_end(key)
+        elif key in self._protected:
+            entry = self._protected[key]
+            self._protected.move_to_end(key)
+        elif key in self._probation:
+            entry = self._probation.pop(key)
+            self._probation_bytes -= entry.size
+            self._protected[key] = entry
+            self._protected_bytes += entry.size
+            self._demote_protected()
+        else:
+            return None
+
+        if entry.expires <= time.monotonic():
+            self._remove(key)
+            return None
+        return entry
+
+    def _segments(self):
+        return (
+            (self._window, "_window_bytes"),
+            (self._probation, "_probation_bytes"),
+            (self._protected, "_protected_bytes"),
+        )
+
+    def _remove(self, key: Hashable) -> None:
+        for segment, attr in self._segments():
+            entry = segment.pop(key, None)
+            if entry is not None:
+                setattr(self, attr, getattr(self, attr) - entry.size)
+                return
+
+    def _demote_protected(self) -> None:
+        while self._protected_bytes > self._protected_max and len(self._protected) > 1:
+            key, entry = self._protected.popitem(last=False)
+            self._protected_bytes -= entry.size
+            self._probation[key] = entry
+            self._probation_bytes += entry.size
+
+    def _evict_window(self) -> None:
+        while self._window_bytes > self._window_max and len(self._window) > 1:
+            key, candidate = self._window.popitem(last=False)
+            self._window_bytes -= candidate.size
+            self._admit(key, candidate)
+
+    def _shrink_main(self, keep: Hashable) -> None:
+        """Evict least recently used entries other than *keep* while the main area is
+        over budget (after an entry in it grew)."""
+        self._demote_protected()
+        for segment in (self._probation, self._protected):
+            for victim_key in list(segment):
+                if self._probation_bytes + self._protected_bytes <= self._main_max:
+                    return
+                if victim_key != keep:
+                    self._remove(victim_key)
+                    self._evictions += 1
+
+    def _admit(self, key: Hashable, candidate: _Entry) -> None:
+        """Move *candidate* into the main area if it beats the entries it would evict.
+
+        Victims are picked (least recently used first) and compared before any is
+        evicted, so a rejected candidate leaves the main area as it was.
+        """
+        if candidate.size > self._main_max:
+            self._rejections += 1
+            return
+        candidate_freq = self._sketch.frequency(key)
+        now = time.monotonic()
+        excess = (
+            self._probation_bytes
+            + self._protected_bytes
+            + candidate.size
+            - self._main_max
+        )
+        victims = []
+        for segment in (self._probation, self._protected):
+            for victim_key, victim in segment.items():
+                if excess <= 0:
+                    break
+                if (
+                    victim.expires > now
+                    and self._sketch.frequency(victim_key) >= candidate_freq
+                ):
+                    self._rejections += 1
+                    return
+                victims.append(victim_key)
+                excess -= victim.size
+        for victim_key in victims:
+            self._remove(victim_key)
+            self._evictions += 1
+        self._probation[key] = candidate
+        self._probation_bytes += candidate.size
+
+
+class SizedLRUCache:
+    """A cache bounded by approximate memory footprint that evicts least recently used
+    entries, with no admission filter: what was stored last is always kept.
+
+    For values that are usually read right after being stored, and rarely again (e.g.
+    rendered result pages), where :class:`TinyLFUCache` would reject the new entry for
+    lack of frequency.
+
+    Args:
+        max_bytes: Upper bound on the summed ``sizeof`` of cached values.
+        sizeof: Function returning the approximate size of a value in bytes.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = approx_sizeof):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._rejections = 0
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Return ``(True, value)`` on a fresh hit, ``(False, None)`` otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, entry.value
+
+    def put(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Insert or replace *key*, evicting the least recently used entries to make
+        room; values larger than the whole cache are not stored."""
+        size = self._sizeof(value)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                self._rejections += 1
+                return
+            self._entries[key] = _Entry(value, size, time.monotonic() + ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                entries=len(self._entries),
+                size_bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                evictions=self._evictions,
+                rejections=self._rejections,
+            )
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+class Expiring(NamedTuple):
+    """A result for :func:`sized_ttl_cache` to keep for *ttl* seconds, not ``max_age``."""
+
+    value: Any
+    ttl: float
+
+
+def sized_ttl_cache(max_age: float, max_bytes: int, sizeof=approx_sizeof):
+    """Memoize a function in a :class:`TinyLFUCache` bounded by *max_bytes*.
+
+    Entries expire *max_age* seconds after they were computed (or after the ``ttl`` of
+    an :class:`Expiring` result, which is unwrapped), and concurrent misses on one key
+    (from several threads) compute it only once. The wrapper exposes
+    ``cache_info()``, ``cache_clear()``, the underlying ``cache``, and ``refresh()``,
+    which recomputes and stores a result without counting as an access — for loading
+    entries ahead of time.
+
+    Args:
+        max_age: Time to live for cached results (in seconds).
+        max_bytes: Approximate memory budget for all cached results.
+        sizeof: Function returning the approximate size of a result in bytes.
+    """
+
+    def _decorator(fn):
+        cache = TinyLFUCache(max_bytes, sizeof=sizeof, name=fn.__qualname__)
+        in_flight: dict[Hashable, Future] = {}
+        in_flight_lock = threading.Lock()
+
+        def _load(key, args, kwargs):
+            # Single flight: concurrent loads of one key share the first caller's result
+            with in_flight_lock:
+                future = in_flight.get(key)
+                leader = future is None
+                if leader:
+                    future = in_flight[key] = Future()
+            if not leader:
+                return future.result()
+
+            try:
+                value, ttl = fn(*args, **kwargs), max_age
+                if isinstance(value, Expiring):
+                    value, ttl = value
+                cache.put(key, value, ttl)
+                future.set_result(value)
+                return value
+            except BaseException as exc:
+                future.set_exception(exc)
+                raise
+            finally:
+                with in_flight_lock:
+                    del in_flight[key]
+
+        @functools.wraps(fn)
+        def _wrapped(*args, **kwargs):
+            key = args + tuple(sorted(kwargs.items())) if kwargs else args
+            found, value = cache.get(key)
+            if found:
+                return value
+            return _load(key, args, kwargs)
+
+        def _refresh(*args, **kwargs):
+            key = args + tuple(sorted(kwargs.items())) if kwargs else args
+            return _load(key, args, kwargs)
+
+        _wrapped.cache = cache
+        _wrapped.refresh = _refresh
+        _wrapped.cache_info = cache.info
+        _wrapped.cache_clear = cache.clear
+        return _wrapped
+
+    return _decorator
+
+
+class PrefixSearchCache:
+    """Search-result cache keyed on normalized queries that reuses shorter queries.
+
+    A result set is *complete* when upstream returned every match (it wasn't cut off by
+    the page limit). Any refinement of a complete query — a longer query it is a prefix
+    of — is answered by filtering the cached results locally, since every name that
+    contains the longer query also contains its prefix.
+
+    Args:
+        max_age: Time to live for cached results (in seconds).
+        normalize: The normalization applied to queries and to item names when filtering.
+        text_of: Returns the searchable text of a result item.
+        max_entries: Maximum number of cached queries (least recently used go first).
+    """
+
+    def __init__(
+        self,
+        max_age: float,
+        normalize: Callable[[str], str],
+        text_of: Callable[[Any], str],
+        max_entries: int = 1024,
+    ):
+        self._max_age = max_age
+        self._normalize = normalize
+        self._text_of = text_of
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[list, bool, float]] = OrderedDict()
+        self._lock = threading.RLock()
+        self.upstream = self.seeded = self.exact_hits = self.prefix_hits = 0
+
+    def lookup(self, query_norm: str) -> list | None:
+        """Return cached results for *query_norm*, or ``None`` if upstream must be asked."""
+        with self._lock:
+            now = time.monotonic()
+            entry = self._fresh(query_norm, now)
+            if entry is not None:
+                self.exact_hits += 1
+                return entry[0]
+
+            for end in range(len(query_norm) - 1, -1, -1):
+                prefix = self._fresh(query_norm[:end], now)
+                if prefix is None or not prefix[1]:
+                    continue
+                items = [
+                    item
+                    for item in prefix[0]
+                    if query_norm in self._normalize(self._text_of(item))
+                ]
+                # Keep the prefix's expiry: the derived set is only as fresh as its source
+                self._store(query_norm, items, True, prefix[2])
+                self.prefix_hits += 1
+                return items
+            return None
+
+    def store(self, query_norm: str, items: list, complete: bool) -> None:
+        """Cache an upstream result; *complete* marks it usable for refinements."""
+        with self._lock:
+            self.upstream += 1
+            self._store(query_norm, items, complete, time.monotonic() + self._max_age)
+
+    def seed(self, query_norm: str, items: list) -> None:
+        """Cache a complete result obtained other than by searching (e.g. the whole
+        catalog as the result of the empty query); not counted as an upstream call."""
+        with self._lock:
+            self.seeded += 1
+            self._store(query_norm, items, True, time.monotonic() + self._max_age)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Upstream calls made and avoided (exact and prefix-derived hits)."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "upstream": self.upstream,
+                "seeded": self.seeded,
+                "exact_hits": self.exact_hits,
+                "prefix_hits": self.prefix_hits,
+                "avoided": self.exact_hits + self.prefix_hits,
+            }
+
+    def _fresh(self, key: str, now: float) -> tuple[list, bool, float] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, items: list, complete: bool, expires: float) -> None:
+        self._entries[key] = (items, complete, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
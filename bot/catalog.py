@@ -0,0 +1,93 @@
+"""Interned flavor catalog — canonical integer IDs for flavors across all shops."""
+
+import copy
+import threading
+from collections import ChainMap
+from typing import Callable, Iterable
+
+
+class FlavorCatalog:
+    """Maps every distinct normalized flavor name to a small integer ID.
+
+    Each shop's product list is mapped onto those IDs when it is fetched, so "which of
+    these flavors does this shop have" is a set intersection rather than a nested loop
+    of string normalization and containment checks.
+
+    Args:
+        normalize: The normalization that decides when two names are the same flavor.
+    """
+
+    def __init__(self, normalize: Callable[[str], str]):
+        self._normalize = normalize
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+        self._shop_flavors: dict[int, frozenset[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, name: str, key: str | None = None) -> int:
+        """Return the ID of *name*, assigning the next free one on first sight.
+
+        *key* is the normalized name, if already known.
+        """
+        if key is None:
+            key = self._normalize(name)
+        flavor_id = self._ids.get(key)
+        if flavor_id is None:
+            with self._lock:
+                flavor_id = self._ids.get(key)
+                if flavor_id is None:
+                    flavor_id = self._ids[key] = len(self._names)
+                    self._names.append(name)
+        return flavor_id
+
+    def intern_all(
+        self, names: Iterable[str], keys: Iterable[str] | None = None
+    ) -> frozenset[int]:
+        """IDs of *names* (normalized as *keys*, if already known)."""
+        if keys is None:
+            return frozenset(self.intern(name) for name in names)
+        return frozenset(self.intern(name, key) for name, key in zip(names, keys))
+
+    def names(self) -> list[str]:
+        """Display names of all known flavors, indexed by flavor ID."""
+        return list(self._names)
+
+    def name_of(self, flavor_id: int) -> str:
+        """Display name of a flavor (as first seen in the API)."""
+        return self._names[flavor_id]
+
+    def update_shop(self, shop_id: int, products) -> frozenset[int]:
+        """Record the flavors currently stocked at *shop_id*."""
+        flavors = self.intern_all(product.name for product in products)
+        self.set_shop(shop_id, flavors)
+        return flavors
+
+    def set_shop(self, shop_id: int, flavors: frozenset[int]) -> None:
+        """Record the flavor IDs currently stocked at *shop_id*."""
+        self._shop_flavors[shop_id] = flavors
+
+    def flavors_at(self, shop_id: int) -> frozenset[int]:
+        """Flavor IDs stocked at *shop_id* as of its last refresh (empty if unknown)."""
+        return self._shop_flavors.get(shop_id, frozenset())
+
+    def stock(self) -> dict[int, frozenset[int]]:
+        """Flavor IDs stocked at every shop whose product list has been fetched."""
+        return dict(self._shop_flavors)
+
+    def with_stock(self, stock: dict[int, frozenset[int]]) -> "FlavorCatalog":
+        """A view of this catalog with the shops in *stock* frozen as given, e.g. one
+        snapshot version. Flavor IDs are shared (so they stay comparable); the stock of
+        other shops is read from this catalog. Not to be updated."""
+        view = copy.copy(self)
+        view._shop_flavors = ChainMap(stock, self._shop_flavors)
+        return view
+
+    def matching(self, query: str) -> frozenset[int]:
+        """IDs of all known flavors whose normalized name contains *query*."""
+        query_norm = self._normalize(query)
+        return frozenset(
+            flavor_id for key, flavor_id in list(self._ids.items()) if query_norm in key
+        )
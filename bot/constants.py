@@ -12,10 +12,107 @@ SETUP_DAILY_UPDATES, SELECTING_TIME, SELECTING_DAYS = range(7, 10)
 
 # ── Environment-driven settings (with sensible defaults) ────────────
 CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "21600"))  # default: 6 hours
+# Memory budget for cached per-shop product lists (bounded by size, not entry count)
+PRODUCT_CACHE_MAX_BYTES = int(os.getenv("PRODUCT_CACHE_MAX_MB", "64")) * 2**20
+# Memory budget of each whole-catalog cache (shop list, product catalog, favourite
+# availability): a full shop list (ALL_SHOPS_LIMIT shops) measures about 8.3 MiB
+SHOPS_CACHE_MAX_BYTES = int(os.getenv("SHOPS_CACHE_MAX_MB", "32")) * 2**20
+# Cached shops and product lists expiring within two intervals are re-fetched ahead of time
+CACHE_REFRESH_INTERVAL_SECONDS = int(os.getenv("CACHE_REFRESH_INTERVAL_SECONDS", "600"))
+CACHE_REFRESH_AHEAD_SECONDS = 2 * CACHE_REFRESH_INTERVAL_SECONDS
+# Upstream fetches in flight at once during warm-up and refresh
+CACHE_REFRESH_CONCURRENCY = int(os.getenv("CACHE_REFRESH_CONCURRENCY", "8"))
 DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "Europe/Warsaw")
+# SQLite file with the availability history of every flavor at every shop
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "./data/history.sqlite3")
+# Window of the "how often is it in stock" figure in /history
+HISTORY_WINDOW_DAYS = int(os.getenv("HISTORY_WINDOW_DAYS", "30"))
+
+# SQLite file shared by all bot processes on the host: one of them fetches the catalog
+# (and logs in), the others read it from there. Unset = per-process caches only
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH")
+# Lifetime of a shared API session token
+SESSION_TTL_SECONDS = 12 * 3600
+# Catalog snapshot file published by ``python -m bot.ingest``; while it is fresh, bot
+# processes read shops and product lists from it instead of the API. Unset = off. It
+# holds pickled objects, so it must not be writable by anyone but the ingest process
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH")
+# How often bot processes check for a newly published snapshot
+SNAPSHOT_CHECK_INTERVAL_SECONDS = float(
+    os.getenv("SNAPSHOT_CHECK_INTERVAL_SECONDS", "5")
+)
+# Record every Bosko API exchange to this cassette (gzip JSON Lines), or answer from one
+# offline instead, with recorded latencies multiplied by API_REPLAY_TIME_SCALE
+API_RECORD_PATH = os.getenv("API_RECORD_PATH")
+API_REPLAY_PATH = os.getenv("API_REPLAY_PATH")
+API_REPLAY_TIME_SCALE = float(os.getenv("API_REPLAY_TIME_SCALE", "1"))
+
+# "local": match favorites against each favorite shop's product list. "account": mirror
+# every user's favorite flavors onto the bot's Bosko account, so that one shop-list
+# request reports which of them each shop has in stock
+FAVORITES_MODE = os.getenv("FAVORITES_MODE", "local")
+# How long that shop list is reused by daily checks
+FAVORITES_AVAILABILITY_TTL_SECONDS = int(
+    os.getenv("FAVORITES_AVAILABILITY_TTL_SECONDS", "300")
+)
+# markAsFavourite requests in flight at once when syncing account favorites
+FAVORITES_SYNC_CONCURRENCY = int(os.getenv("FAVORITES_SYNC_CONCURRENCY", "8"))
+
+# ── Update processing ───────────────────────────────────────────────
+# Updates from different chats are processed concurrently (1 = one at a time)
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "32"))
+
+# Webhook mode is enabled when WEBHOOK_URL (the public URL of the reverse proxy) is set
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN")
+
+# Slow multi-shop commands edit their placeholder reply at most this often
+PROGRESS_EDIT_INTERVAL_SECONDS = float(os.getenv("PROGRESS_EDIT_INTERVAL_SECONDS", "2"))
+# Product lists a command fetches at once
+SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", "8"))
+# Shops picked while adding favorites get their product lists loaded ahead of use:
+# this many at once, and at most PREFETCH_PER_MINUTE loads a minute (0 = off)
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "2"))
+PREFETCH_PER_MINUTE = float(os.getenv("PREFETCH_PER_MINUTE", "60"))
+# Shops prefetched when a city is picked (the most visited) or a name search matches
+PREFETCH_SHOPS_PER_CITY = int(os.getenv("PREFETCH_SHOPS_PER_CITY", "3"))
+# Long result lists are split into pages of this many lines, flipped with inline buttons
+RESULTS_PAGE_SIZE = int(os.getenv("RESULTS_PAGE_SIZE", "25"))
+# Memory budget for rendered result pages
+PAGE_CACHE_MAX_BYTES = 8 * 2**20
+# Suggestions per inline query, and how long Telegram may reuse an answer for everyone
+INLINE_RESULTS_LIMIT = int(os.getenv("INLINE_RESULTS_LIMIT", "20"))
+INLINE_CACHE_TIME_SECONDS = int(os.getenv("INLINE_CACHE_TIME_SECONDS", "300"))
+# Conversations (/add_favorite, /daily_updates) left idle this long end (0 = never)
+CONVERSATION_TIMEOUT_SECONDS = int(os.getenv("CONVERSATION_TIMEOUT_SECONDS", "900"))
+
+# ── Worker pools ────────────────────────────────────────────────────
+# Threads for blocking and GIL-releasing work off the event loop: upstream fetches,
+# response parsing, vectorized favorites matching (``asyncio.to_thread`` runs there)
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "8"))
+# Processes for pure-Python CPU sweeps, e.g. normalizing every name when (re)building
+# the flavor catalog or the typeahead index. 0 = run them in the worker threads
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", "0"))
+
+# ── Outbound rate limiting (Telegram flood limits) ──────────────────
+GLOBAL_MESSAGES_PER_SECOND = float(os.getenv("GLOBAL_MESSAGES_PER_SECOND", "25"))
+CHAT_MESSAGES_PER_SECOND = float(os.getenv("CHAT_MESSAGES_PER_SECOND", "1"))
+GROUP_MESSAGES_PER_MINUTE = float(os.getenv("GROUP_MESSAGES_PER_MINUTE", "20"))
+# Daily notifications are spread over this many seconds after their scheduled time
+NOTIFICATION_SPREAD_SECONDS = float(os.getenv("NOTIFICATION_SPREAD_SECONDS", "60"))
+SEND_MAX_RETRIES = 3
+# Media groups with photos Telegram hasn't seen yet that may be uploading at once
+PHOTO_UPLOAD_CONCURRENCY = int(os.getenv("PHOTO_UPLOAD_CONCURRENCY", "4"))
 
 # ── API defaults ────────────────────────────────────────────────────
 ALL_SHOPS_LIMIT = 999
+# Search page size; a search returning fewer results than this is known to be complete
+SEARCH_RESULTS_LIMIT = 999
+# Pages the whole-catalog sweep reads at most (a safety stop, far above the catalog)
+SEARCH_ALL_MAX_PAGES = 50
 
 # ── Day helpers ─────────────────────────────────────────────────────
 DAY_NAMES = (
@@ -32,6 +32,11 @@ def format_flavor_name(name: str) -> str:
     return name.capitalize()
 
 
+def format_price(price: int) -> str:
+    """Format an API price (in grosze) for display, e.g. ``1250`` → ``12.50 zł``."""
+    return f"{price / 100:.2f} zł"
+
+
 async def reply_cancelled(update: Update) -> None:
     """Send the standard "Cancelled." reply and remove the custom keyboard."""
     await update.message.reply_text("Cancelled.", reply_markup=ReplyKeyboardRemove())
@@ -1,18 +1,39 @@
 """Simple one-shot command handlers (no conversation state)."""
 
+import asyncio
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from bot.constants import DAILY_JOB_PREFIX
+from bot.constants import (
+    DAILY_JOB_PREFIX,
+    DEFAULT_TIMEZONE,
+    HISTORY_WINDOW_DAYS,
+    RESULTS_PAGE_SIZE,
+    SCAN_CONCURRENCY,
+)
 from bot.services import (
     cached_api_search,
-    cached_flavor_search,
+    data_version,
     find_shop_by_name,
+    flavors_available_at,
     get_cached_shops,
+    get_products_at_shop,
+    history,
+    load_products,
     normalize,
-    get_api,
+    products_loaded,
 )
-from bot.formatting import format_flavor_name
+from bot.formatting import format_flavor_name, format_price
+from bot.media import FILE_IDS_KEY, send_product_photos
+from bot.pagination import Pages, get_pages, reply_pages
+from bot.prefetch import prefetcher
+from bot.progressive import ProgressiveReply, start_scan
+
+logger = logging.getLogger(__name__)
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -22,8 +43,10 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         "Commands:\n"
         "/shops [query] - List all shops or search by name\n"
         "/products <shop name> - Show products at a shop\n"
+        "/photos <shop name> - Show product photos at a shop\n"
         "/search <flavor> - Search for flavors using API\n"
         "/search_available <flavor> - Search for flavors currently available at shops\n"
+        "/history <flavor> - When and where a flavor was last available\n"
         "/add_favorite - Add favorite flavors or shops\n"
         "/favorites - Show your favorite flavors and shops\n"
         "/remove_favorite - Remove favorite flavors or shops\n"
@@ -47,32 +70,71 @@ async def products(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await update.effective_message.reply_text(f"Shop '{shop_name}' not found.")
         return
 
-    shop_products = get_api().products.get_at_shop(shop.id)
-    if not shop_products:
-        await update.effective_message.reply_text(f"No products found at {shop.name}.")
+    prefetcher.record_use([shop.id])
+    if products_loaded(shop.id):
+        await reply_pages(update, _products_pages(shop, get_products_at_shop(shop.id)))
         return
 
-    reply = f"🍨 *{shop.name}*:\n"
-    reply += "\n".join([f"- {format_flavor_name(p.name)}" for p in shop_products])
-    await update.effective_message.reply_text(reply, parse_mode="Markdown")
+    async def scan(reply: ProgressiveReply) -> None:
+        pages = _products_pages(shop, await load_products(shop.id))
+        await reply.finish(pages.text(), pages.markup())
 
+    await start_scan(update, context, f"🍨 Loading products at *{shop.name}*…", scan)
 
-async def shops_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """``/shops [query]`` — list all shops or filter by name."""
-    if context.args:
-        query_norm = normalize(" ".join(context.args))
-        filtered = [
-            shop for shop in get_cached_shops() if query_norm in normalize(shop.name)
+
+def _products_pages(shop, shop_products) -> Pages:
+    def render():
+        if not shop_products:
+            return f"No products found at {shop.name}.", []
+        return f"🍨 *{shop.name}*:\n", [
+            f"- {format_flavor_name(p.name)}" for p in shop_products
         ]
-    else:
-        filtered = get_cached_shops()
 
-    if not filtered:
-        await update.effective_message.reply_text("No shops found matching your query.")
+    return get_pages("products", str(shop.id), data_version(), render)
+
+
+async def product_photos(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """``/photos <shop name>`` — show product photos at a shop as media groups."""
+    if not context.args:
+        await update.effective_message.reply_text(
+            "Please provide a shop name, e.g., /photos Ursynów"
+        )
+        return
+
+    shop_name = " ".join(context.args)
+    shop = find_shop_by_name(shop_name)
+
+    if not shop:
+        await update.effective_message.reply_text(f"Shop '{shop_name}' not found.")
+        return
+
+    prefetcher.record_use([shop.id])
+    shop_products = await load_products(shop.id)
+    if not shop_products:
+        await update.effective_message.reply_text(f"No products found at {shop.name}.")
         return
 
-    reply = "🏪 Shops:\n" + "\n".join([f"- {shop.name}" for shop in filtered])
-    await update.effective_message.reply_text(reply)
+    file_ids = context.bot_data.setdefault(FILE_IDS_KEY, {})
+    await send_product_photos(
+        context.bot, update.effective_chat.id, shop_products, file_ids
+    )
+
+
+async def shops_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """``/shops [query]`` — list all shops or filter by name."""
+    query_norm = normalize(" ".join(context.args)) if context.args else ""
+    shops = get_cached_shops()
+
+    def render():
+        filtered = [shop for shop in shops if query_norm in normalize(shop.name)]
+        if not filtered:
+            return "No shops found matching your query.", []
+        return "🏪 Shops:\n", [f"- {shop.name}" for shop in filtered]
+
+    await reply_pages(
+        update,
+        get_pages("shops", query_norm, data_version(), render, parse_mode=None),
+    )
 
 
 async def search_flavor(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -86,15 +148,15 @@ async def search_flavor(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     query = " ".join(context.args)
     results = cached_api_search(query)
 
-    if not results:
-        await update.effective_message.reply_text(f"No matches found for '{query}'.")
-        return
-
-    reply = f"🔍 Search results for *{query}*:\n"
-    for product in results:
-        reply += f"- {format_flavor_name(product.name)}\n"
+    def render():
+        if not results:
+            return f"No matches found for '{query}'.", []
+        return f"🔍 Search results for *{query}*:\n", [
+            f"- {format_flavor_name(product.name)}" for product in results
+        ]
 
-    await update.effective_message.reply_text(reply, parse_mode="Markdown")
+    # Keyed by the query as typed, since the header quotes it
+    await reply_pages(update, get_pages("search", query, data_version(), render))
 
 
 async def search_available(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -106,15 +168,119 @@ async def search_available(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         return
 
     query = " ".join(context.args)
-    results = cached_flavor_search(query)
+    shops = get_cached_shops()
+    if all(products_loaded(shop.id) for shop in shops):
+        await reply_pages(update, _available_pages(query, shops))
+        return
+
+    async def scan(reply: ProgressiveReply) -> None:
+        slots = asyncio.Semaphore(SCAN_CONCURRENCY)
+
+        async def fetch(shop):
+            async with slots:
+                try:
+                    await load_products(shop.id)
+                except Exception:
+                    logger.warning(
+                        "Error fetching products for %s", shop.name, exc_info=True
+                    )
+                    return None
+            return shop
+
+        tasks = [asyncio.ensure_future(fetch(shop)) for shop in shops]
+        scanned = []
+        try:
+            for checked, done in enumerate(asyncio.as_completed(tasks), 1):
+                shop = await done
+                if shop is not None:
+                    scanned.append(shop)
+                if reply.due:
+                    await reply.update(
+                        _available_progress(query, scanned, checked, len(shops))
+                    )
+        finally:
+            for task in tasks:
+                task.cancel()
+        checked_ids = {shop.id for shop in scanned}
+        missing = tuple(sorted(s.id for s in shops if s.id not in checked_ids))
+        pages = _available_pages(query, scanned, missing)
+        await reply.finish(pages.text(), pages.markup())
+
+    await start_scan(
+        update, context, f"🔍 Searching {len(shops)} shops for *{query}*…", scan
+    )
+
+
+def _available_lines(results) -> list[str]:
+    return [f"- {product_name} at *{shop_name}*" for shop_name, product_name in results]
+
 
-    if not results:
-        await update.effective_message.reply_text(f"No matches found for '{query}'.")
+def _available_pages(query: str, shops, missing: tuple[int, ...] = ()) -> Pages:
+    """Pages of the flavors matching *query* at *shops*. *missing* are the IDs of
+    shops that couldn't be checked: a partial result is cached apart from the complete
+    one."""
+
+    def render():
+        results = flavors_available_at(shops, query)
+        if not results:
+            return f"No matches found for '{query}'.", []
+        return f"🔍 Search results for *{query}*:\n", _available_lines(results)
+
+    key = query  # as typed, since the header quotes it
+    if missing:
+        key += "\0without " + ",".join(map(str, missing))
+    return get_pages("search_available", key, data_version(), render)
+
+
+def _available_progress(query: str, shops, checked: int, total: int) -> str:
+    """The matches found so far — as much of them as the first page holds."""
+    lines = _available_lines(flavors_available_at(shops, query))
+    reply = f"🔍 Search results for *{query}* (checked {checked}/{total} shops):\n"
+    reply += "\n".join(lines[:RESULTS_PAGE_SIZE])
+    if len(lines) > RESULTS_PAGE_SIZE:
+        reply += f"\n…and {len(lines) - RESULTS_PAGE_SIZE} more"
+    return reply
+
+
+async def flavor_history(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """``/history <flavor>`` — last seen, how often in stock, and prices per shop."""
+    if not context.args:
+        await update.effective_message.reply_text(
+            "Please provide a flavor, e.g., /history pistacja"
+        )
+        return
+
+    query = " ".join(context.args)
+    flavor = history.find_flavor(query)
+    if flavor is None:
+        await update.effective_message.reply_text(f"No history found for '{query}'.")
         return
 
-    reply = f"🔍 Search results for *{query}*:\n"
-    for shop_name, product_name in results:
-        reply += f"- {product_name} at *{shop_name}*\n"
+    flavor_id, flavor_name = flavor
+    window_days = HISTORY_WINDOW_DAYS
+    shops = history.flavor_history(flavor_id, window=window_days * 86400)
+    prices: dict[int, list[int]] = {}
+    for point in history.price_history(flavor_id):
+        shop_prices = prices.setdefault(point.shop_id, [])
+        if not shop_prices or shop_prices[-1] != point.price:
+            shop_prices.append(point.price)
+
+    shop_names = {shop.id: shop.name for shop in get_cached_shops()}
+    timezone = ZoneInfo(DEFAULT_TIMEZONE)
+
+    reply = f"📈 *{format_flavor_name(flavor_name)}* (last {window_days} days):\n"
+    for entry in shops:
+        if entry.in_stock:
+            seen = "in stock now"
+        else:
+            last = datetime.fromtimestamp(entry.last_seen, timezone)
+            seen = f"last seen {last:%Y-%m-%d %H:%M}"
+        price = " → ".join(format_price(p) for p in prices[entry.shop_id][-3:])
+        name = shop_names.get(entry.shop_id, f"Shop #{entry.shop_id}")
+        reply += (
+            f"- *{name}*: {seen}, in stock {entry.stocked_fraction:.0%} "
+            f"of the time, {price}\n"
+        )
 
     await update.effective_message.reply_text(reply, parse_mode="Markdown")
 
@@ -1,38 +1,62 @@
 """Daily-updates ConversationHandler — scheduling, job callbacks, and persistence restoration."""
 
+import asyncio
+import functools
 import logging
 import re
 
 from zoneinfo import ZoneInfo
-from datetime import time
+from datetime import datetime
+from time import perf_counter
 
+from apscheduler.triggers.cron import CronTrigger
 from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove
 from telegram.ext import (
     Application,
     CommandHandler,
     ContextTypes,
     ConversationHandler,
+    JobQueue,
     MessageHandler,
     filters,
 )
 
+from bot.account_favorites import find_available
 from bot.constants import (
     ALL_DAYS,
     DAILY_JOB_PREFIX,
     DAY_NAMES,
     DEFAULT_TIMEZONE,
+    FAVORITES_MODE,
     SELECTING_DAYS,
     SELECTING_TIME,
     SETUP_DAILY_UPDATES,
     WEEKDAYS,
 )
 from bot.formatting import build_keyboard, reply_cancelled, format_flavor_name
-from bot.services import get_products_at_shop, normalize
+from bot.outbound import Priority
+from bot.prefetch import prefetcher
+from bot.scratch import scoped_conversation, scratch
+from bot.services import (
+    catalog,
+    favorite_flavor_ids,
+    load_products,
+    match_favorites,
+    pin_snapshot,
+)
 
 logger = logging.getLogger(__name__)
 
+CONVERSATION = "daily_updates_conversation"
+
 TIME_PATTERN = re.compile(r"^([01]?[0-9]|2[0-3]):([0-5][0-9])$")
 
+# Daily jobs restored between two yields to the event loop
+RESTORE_BATCH_SIZE = 500
+
+# Cron names of the days in ``DAY_NAMES`` order
+_CRON_DAYS = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+
 
 # ── Job callback ────────────────────────────────────────────────────
 
@@ -41,9 +65,13 @@ async def check_favorites_availability(context: ContextTypes.DEFAULT_TYPE) -> No
     """Scheduled job callback — check favorite flavors at favorite shops and notify."""
     job_data = context.job.data
     chat_id = context.job.chat_id
+    # Like an update (each job run is its own task): load and match one catalog version
+    pin_snapshot()
 
     favorite_flavors = job_data.get("favorite_flavors", [])
     favorite_shops = job_data.get("favorite_shops", [])
+    # Process-local, so derived on every run rather than kept in the persisted data
+    flavor_ids = favorite_flavor_ids(favorite_flavors)
 
     logger.info(
         "Checking favorites for chat %s: %d flavors, %d shops",
@@ -58,27 +86,82 @@ async def check_favorites_availability(context: ContextTypes.DEFAULT_TYPE) -> No
 
     found_items: list[str] = []
 
-    for shop in favorite_shops:
+    if FAVORITES_MODE == "account":
+        shop_names = {shop.id: shop.name for shop in favorite_shops}
         try:
-            for product in get_products_at_shop(shop.id):
-                for flavor in favorite_flavors:
-                    if normalize(flavor) in normalize(product.name):
-                        found_items.append(
-                            f"🍦 {format_flavor_name(product.name)} at *{shop.name}*"
-                        )
+            matches = await find_available(favorite_flavors, flavor_ids, shop_names)
         except Exception:
-            logger.warning("Error checking shop %s", shop.name, exc_info=True)
+            logger.warning(
+                "Error checking favorites of chat %s", chat_id, exc_info=True
+            )
+            return
+    else:
+        prefetcher.record_use(shop.id for shop in favorite_shops)
+        loaded = await asyncio.gather(
+            *(load_products(shop.id) for shop in favorite_shops),
+            return_exceptions=True,
+        )
+        shop_names = {}
+        for shop, products in zip(favorite_shops, loaded):
+            if isinstance(products, Exception):
+                logger.warning("Error checking shop %s", shop.name, exc_info=products)
+            else:
+                shop_names[shop.id] = shop.name
+        matches = await match_favorites(flavor_ids, shop_names)
+
+    for shop_id, flavor_id in matches:
+        found_items.append(
+            f"🍦 {format_flavor_name(catalog.name_of(flavor_id))} at *{shop_names[shop_id]}*"
+        )
 
     if found_items:
         message = "📅 *Daily Favorites Update*\n\n" + "\n".join(found_items)
         await context.bot.send_message(
-            chat_id=chat_id, text=message, parse_mode="Markdown"
+            chat_id=chat_id,
+            text=message,
+            parse_mode="Markdown",
+            rate_limit_args={"priority": Priority.NOTIFICATION},
         )
         logger.info("Sent update to chat %s: %d items found", chat_id, len(found_items))
     else:
         logger.info("No matching items found for chat %s", chat_id)
 
 
+# ── Scheduling ──────────────────────────────────────────────────────
+
+
+@functools.lru_cache(maxsize=4096)
+def _daily_trigger(
+    update_time: str, days: tuple[int, ...], timezone: str
+) -> CronTrigger:
+    """Cron trigger of a daily-updates schedule, shared by every job on that schedule.
+
+    Triggers are stateless, and building one per job dominated restoring many jobs.
+    """
+    hour, minute = map(int, update_time.split(":"))
+    return CronTrigger(
+        day_of_week=",".join(_CRON_DAYS[d] for d in days),
+        hour=hour,
+        minute=minute,
+        second=0,
+        timezone=ZoneInfo(timezone),
+    )
+
+
+def _schedule_daily_job(job_queue: JobQueue, job_data: dict) -> None:
+    """Schedule the daily favorites check described by *job_data*."""
+    trigger = _daily_trigger(
+        job_data["update_time"], tuple(job_data["days"]), job_data["timezone"]
+    )
+    job_queue.run_custom(
+        callback=check_favorites_availability,
+        job_kwargs={"trigger": trigger},
+        data=job_data,
+        chat_id=job_data["chat_id"],
+        name=f"{DAILY_JOB_PREFIX}{job_data['chat_id']}",
+    )
+
+
 # ── Conversation entry ──────────────────────────────────────────────
 
 
@@ -181,8 +264,10 @@ async def select_update_time(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         return SELECTING_TIME
 
-    context.user_data["update_time"] = time_text
-    context.user_data["timezone"] = DEFAULT_TIMEZONE
+    state = scratch(update, CONVERSATION)
+    state["update_time"] = time_text
+    state["timezone"] = DEFAULT_TIMEZONE
+    state["selected_days"] = []
 
     day_labels = list(DAY_NAMES)
     keyboard = build_keyboard(day_labels)
@@ -195,8 +280,6 @@ async def select_update_time(update: Update, context: ContextTypes.DEFAULT_TYPE)
         f"📅 Now select the days you want to receive updates (you can select multiple):",
         reply_markup=markup,
     )
-
-    context.user_data["selected_days"] = []
     return SELECTING_DAYS
 
 
@@ -208,28 +291,28 @@ async def select_update_days(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await reply_cancelled(update)
         return ConversationHandler.END
 
+    state = scratch(update, CONVERSATION)
     if text == "✅ Done selecting":
-        selected_days = context.user_data.get("selected_days", [])
+        selected_days = state.get("selected_days", [])
         if not selected_days:
             await update.message.reply_text("Please select at least one day.")
             return SELECTING_DAYS
         return await _finalize_daily_updates(update, context)
 
     if text == "🗓️ All days":
-        context.user_data["selected_days"] = list(ALL_DAYS)
+        state["selected_days"] = list(ALL_DAYS)
         return await _finalize_daily_updates(update, context)
 
     if text == "💼 Weekdays only":
-        context.user_data["selected_days"] = list(WEEKDAYS)
+        state["selected_days"] = list(WEEKDAYS)
         return await _finalize_daily_updates(update, context)
 
     if text in DAY_NAMES:
         day_index = DAY_NAMES.index(text)
-        selected_days = context.user_data.get("selected_days", [])
+        selected_days = state.setdefault("selected_days", [])
 
         if day_index not in selected_days:
             selected_days.append(day_index)
-            context.user_data["selected_days"] = selected_days
             selected_names = [DAY_NAMES[d] for d in sorted(selected_days)]
             await update.message.reply_text(
                 f"Added {text}. Selected days: {', '.join(selected_names)}"
@@ -247,13 +330,17 @@ async def _finalize_daily_updates(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> int:
     """Schedule the daily job and persist the configuration."""
-    update_time = context.user_data.get("update_time")
-    selected_days = context.user_data.get("selected_days", [])
-    timezone = context.user_data.get("timezone", DEFAULT_TIMEZONE)
-
-    hour, minute = map(int, update_time.split(":"))
-    tz = ZoneInfo(timezone)
-    update_time_obj = time(hour, minute, tzinfo=tz)
+    state = scratch(update, CONVERSATION)
+    update_time = state.get("update_time")
+    selected_days = state.get("selected_days", [])
+    timezone = state.get("timezone", DEFAULT_TIMEZONE)
+    if update_time is None:
+        # The conversation outlived its state (restart)
+        await update.message.reply_text(
+            "This setup has expired, please start again with /daily_updates.",
+            reply_markup=ReplyKeyboardRemove(),
+        )
+        return ConversationHandler.END
 
     # Remove any existing job for this chat
     job_name = f"{DAILY_JOB_PREFIX}{update.effective_chat.id}"
@@ -270,14 +357,7 @@ async def _finalize_daily_updates(
         "chat_id": update.effective_chat.id,
     }
 
-    context.job_queue.run_daily(
-        callback=check_favorites_availability,
-        time=update_time_obj,
-        days=tuple(selected_days),
-        data=job_data,
-        chat_id=update.effective_chat.id,
-        name=job_name,
-    )
+    _schedule_daily_job(context.job_queue, job_data)
 
     context.user_data["daily_updates_config"] = job_data
 
@@ -313,61 +393,98 @@ async def cancel_conversation(
 # ── Persistence restoration ─────────────────────────────────────────
 
 
+def _minutes_until(config: dict, now_by_timezone: dict[str, int]) -> int:
+    """Minutes until the next daily firing time of *config* (ignoring weekdays).
+
+    Args:
+        config: A persisted ``daily_updates_config``.
+        now_by_timezone: Memo of the current minute of the day per timezone name.
+    """
+    timezone = config.get("timezone", DEFAULT_TIMEZONE)
+    now = now_by_timezone.get(timezone)
+    if now is None:
+        local = datetime.now(ZoneInfo(timezone))
+        now = now_by_timezone[timezone] = local.hour * 60 + local.minute
+    hour, minute = map(int, config["update_time"].split(":"))
+    return (hour * 60 + minute - now) % (24 * 60)
+
+
+def _restore_job(application: Application, user_id: int, data: dict) -> None:
+    config = data["daily_updates_config"]
+    # Flavor IDs are process-local: drop any an earlier version persisted here
+    config.pop("favorite_flavor_ids", None)
+    job_data = {
+        "update_time": config["update_time"],
+        "days": tuple(config["days"]),
+        "timezone": config.get("timezone", DEFAULT_TIMEZONE),
+        "favorite_flavors": data.get("favorite_flavors", []),
+        "favorite_shops": data.get("favorite_shops", []),
+        "user_id": user_id,
+        "chat_id": config["chat_id"],
+    }
+    _schedule_daily_job(application.job_queue, job_data)
+    logger.debug(
+        "Restored daily updates for chat %s at %s (%s)",
+        job_data["chat_id"],
+        job_data["update_time"],
+        job_data["timezone"],
+    )
+
+
 async def restore_daily_jobs(application: Application) -> None:
-    """Re-schedule daily update jobs from persisted user data (called in ``post_init``)."""
-    restored = 0
+    """Re-schedule daily update jobs from persisted user data.
+
+    Runs in the background after start-up: jobs are restored soonest-due first, in
+    batches of ``RESTORE_BATCH_SIZE``, yielding to the event loop between batches so the
+    bot keeps answering updates however many users there are.
+    """
+    started = perf_counter()
+    pending = []
+    now_by_timezone: dict[str, int] = {}
     for user_id, data in application.user_data.items():
         config = data.get("daily_updates_config")
-        if not config:
+        if (
+            not config
+            or not config.get("update_time")
+            or not config.get("days")
+            or not config.get("chat_id")
+        ):
             continue
-
         try:
-            update_time_str = config.get("update_time")
-            days = config.get("days", ())
-            timezone = config.get("timezone", DEFAULT_TIMEZONE)
-            chat_id = config.get("chat_id")
-
-            if not update_time_str or not days or not chat_id:
-                continue
-
-            hour, minute = map(int, update_time_str.split(":"))
-            tz = ZoneInfo(timezone)
-            update_time_obj = time(hour, minute, tzinfo=tz)
-
-            job_data = {
-                "update_time": update_time_str,
-                "days": days,
-                "timezone": timezone,
-                "favorite_flavors": data.get("favorite_flavors", []),
-                "favorite_shops": data.get("favorite_shops", []),
-                "user_id": user_id,
-                "chat_id": chat_id,
-            }
-
-            application.job_queue.run_daily(
-                callback=check_favorites_availability,
-                time=update_time_obj,
-                days=tuple(days),
-                data=job_data,
-                chat_id=chat_id,
-                name=f"{DAILY_JOB_PREFIX}{chat_id}",
-            )
-            restored += 1
-            logger.info(
-                "Restored daily updates for chat %s at %s (%s)",
-                chat_id,
-                update_time_str,
-                timezone,
-            )
+            pending.append((_minutes_until(config, now_by_timezone), user_id, data))
         except Exception:
             logger.error(
-                "Failed to restore daily updates for user %s",
-                user_id,
-                exc_info=True,
+                "Failed to restore daily updates for user %s", user_id, exc_info=True
             )
+    pending.sort(key=lambda item: item[0])
+
+    restored = 0
+    for start in range(0, len(pending), RESTORE_BATCH_SIZE):
+        # Users who set up daily updates while restoration was running keep their job
+        scheduled = {job.name for job in application.job_queue.scheduler.get_jobs()}
+        for _, user_id, data in pending[start : start + RESTORE_BATCH_SIZE]:
+            if (
+                f"{DAILY_JOB_PREFIX}{data['daily_updates_config']['chat_id']}"
+                in scheduled
+            ):
+                continue
+            try:
+                _restore_job(application, user_id, data)
+                restored += 1
+            except Exception:
+                logger.error(
+                    "Failed to restore daily updates for user %s",
+                    user_id,
+                    exc_info=True,
+                )
+        await asyncio.sleep(0)
 
     if restored:
-        logger.info("Restored %d daily update job(s) from persistence", restored)
+        logger.info(
+            "Restored %d daily update job(s) from persistence in %.0f ms",
+            restored,
+            (perf_counter() - started) * 1000,
+        )
 
 
 # ── Handler factory ─────────────────────────────────────────────────
@@ -375,7 +492,8 @@ async def restore_daily_jobs(application: Application) -> None:
 
 def build_daily_updates_handler() -> ConversationHandler:
     """Construct and return the daily-updates ``ConversationHandler``."""
-    return ConversationHandler(
+    return scoped_conversation(
+        CONVERSATION,
         entry_points=[CommandHandler("daily_updates", setup_daily_updates)],
         states={
             SETUP_DAILY_UPDATES: [
@@ -395,6 +513,4 @@ def build_daily_updates_handler() -> ConversationHandler:
             MessageHandler(filters.Regex("^❌ Cancel$"), cancel_conversation),
             CommandHandler("cancel", cancel_conversation),
         ],
-        name="daily_updates_conversation",
-        persistent=True,
     )
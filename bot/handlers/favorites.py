@@ -17,8 +17,11 @@ from bot.constants import (
     SELECTING_FLAVORS,
     SELECTING_SHOP,
     SELECTING_SHOP_FROM_CITY,
+    PREFETCH_SHOPS_PER_CITY,
 )
 from bot.formatting import build_keyboard, reply_cancelled, format_flavor_name
+from bot.prefetch import prefetcher
+from bot.scratch import scoped_conversation, scratch
 from bot.services import (
     cached_api_search,
     get_cached_shops,
@@ -27,6 +30,8 @@ from bot.services import (
     normalize,
 )
 
+CONVERSATION = "favorites_conversation"
+
 
 # ── Entry point ─────────────────────────────────────────────────────
 
@@ -85,7 +90,6 @@ async def search_flavor_for_favorite(
         )
         return SEARCHING_FLAVOR
 
-    context.user_data["flavor_search_results"] = results
     flavor_names = [format_flavor_name(product.name) for product in results]
 
     keyboard = build_keyboard(flavor_names, footer=["✅ Done selecting", "❌ Cancel"])
@@ -96,7 +100,7 @@ async def search_flavor_for_favorite(
         "Select the flavors you want to add to favorites (you can select multiple):",
         reply_markup=markup,
     )
-    context.user_data["selected_flavors"] = []
+    scratch(update, CONVERSATION)["selected_flavors"] = []
     return SELECTING_FLAVORS
 
 
@@ -105,7 +109,7 @@ async def select_flavors(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     text = update.message.text.strip()
 
     if text == "✅ Done selecting":
-        selected = context.user_data.get("selected_flavors", [])
+        selected = scratch(update, CONVERSATION).get("selected_flavors", [])
         if not selected:
             await update.message.reply_text(
                 "No flavors selected. Please select at least one flavor."
@@ -129,10 +133,9 @@ async def select_flavors(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return ConversationHandler.END
 
     # Toggle individual flavor
-    selected = context.user_data.get("selected_flavors", [])
+    selected = scratch(update, CONVERSATION).setdefault("selected_flavors", [])
     if text not in selected:
         selected.append(text)
-        context.user_data["selected_flavors"] = selected
         await update.message.reply_text(
             f"Added '{text}' to selection. Current selection: {', '.join(selected)}"
         )
@@ -196,8 +199,15 @@ async def choose_city(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
     await update.message.reply_text(
         f"Select shops from {city} (you can select multiple):", reply_markup=markup
     )
-    context.user_data["city_shops"] = {shop.name: shop for shop in shops}
-    context.user_data["selected_shops"] = []
+    state = scratch(update, CONVERSATION)
+    state["city_shops"] = {shop.name: shop for shop in shops}
+    state["selected_shops"] = []
+    # The shops about to be picked will be looked at (/products, /daily_updates) next;
+    # the most visited ones are the likeliest picks
+    popular = sorted(shops, key=lambda shop: -shop.checkInsCount)
+    prefetcher.prefetch(
+        context.application, [shop.id for shop in popular[:PREFETCH_SHOPS_PER_CITY]]
+    )
     return SELECTING_SHOP_FROM_CITY
 
 
@@ -211,8 +221,9 @@ async def select_shop_from_city(
         await reply_cancelled(update)
         return ConversationHandler.END
 
+    state = scratch(update, CONVERSATION)
     if shop_name == "✅ Done selecting":
-        selected = context.user_data.get("selected_shops", [])
+        selected = state.get("selected_shops", [])
         if not selected:
             await update.message.reply_text(
                 "No shops selected. Please select at least one shop."
@@ -234,20 +245,25 @@ async def select_shop_from_city(
         return ConversationHandler.END
 
     # Lookup from either city browse or name search results
-    city_shops = context.user_data.get("city_shops", {})
-    search_shops = context.user_data.get("search_shops", {})
-    all_shops = {**city_shops, **search_shops}
+    all_shops = {**state.get("city_shops", {}), **state.get("search_shops", {})}
+    if not all_shops:
+        # The conversation outlived its state (restart)
+        await update.message.reply_text(
+            "This list has expired, please start again with /add_favorite.",
+            reply_markup=ReplyKeyboardRemove(),
+        )
+        return ConversationHandler.END
 
     if shop_name not in all_shops:
         await update.message.reply_text("Please select a shop from the list.")
         return SELECTING_SHOP_FROM_CITY
 
     shop = all_shops[shop_name]
-    selected = context.user_data.get("selected_shops", [])
+    prefetcher.prefetch(context.application, [shop.id], picked=True)
+    selected = state.setdefault("selected_shops", [])
 
     if shop not in selected:
         selected.append(shop)
-        context.user_data["selected_shops"] = selected
         await update.message.reply_text(
             f"Added '{shop.name}' to selection. "
             f"Current selection: {', '.join([s.name for s in selected])}"
@@ -279,6 +295,12 @@ async def select_shop_by_name(
         )
         return SELECTING_SHOP
 
+    prefetcher.prefetch(
+        context.application,
+        [shop.id for shop in matching_shops[:PREFETCH_SHOPS_PER_CITY]],
+        picked=len(matching_shops) == 1,
+    )
+
     # Single match → add immediately
     if len(matching_shops) == 1:
         shop = matching_shops[0]
@@ -307,8 +329,9 @@ async def select_shop_by_name(
         "Select shops (you can select multiple):",
         reply_markup=markup,
     )
-    context.user_data["search_shops"] = {shop.name: shop for shop in matching_shops}
-    context.user_data["selected_shops"] = []
+    state = scratch(update, CONVERSATION)
+    state["search_shops"] = {shop.name: shop for shop in matching_shops}
+    state["selected_shops"] = []
     return SELECTING_SHOP_FROM_CITY
 
 
@@ -328,7 +351,8 @@ async def cancel_conversation(
 
 def build_favorites_handler() -> ConversationHandler:
     """Construct and return the add-favorite ``ConversationHandler``."""
-    return ConversationHandler(
+    return scoped_conversation(
+        CONVERSATION,
         entry_points=[CommandHandler("add_favorite", add_favorite)],
         states={
             CHOOSING_FAVORITE_TYPE: [
@@ -363,6 +387,4 @@ def build_favorites_handler() -> ConversationHandler:
             MessageHandler(filters.Regex("^❌ Cancel$"), cancel_conversation),
             CommandHandler("cancel", cancel_conversation),
         ],
-        name="favorites_conversation",
-        persistent=True,
     )
@@ -0,0 +1,211 @@
+"""Availability history — per-shop inventory snapshots stored as intervals in SQLite."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, NamedTuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS flavors (
+    id   INTEGER PRIMARY KEY,
+    key  TEXT NOT NULL UNIQUE,  -- normalized name
+    name TEXT NOT NULL          -- display name as first seen
+);
+
+-- One row per uninterrupted run of a flavor at a shop at one price.
+-- ``until_ts`` is NULL while the run is still open (the flavor is in stock).
+CREATE TABLE IF NOT EXISTS stints (
+    flavor_id INTEGER NOT NULL REFERENCES flavors (id),
+    shop_id   INTEGER NOT NULL,
+    price     INTEGER NOT NULL,
+    since_ts  INTEGER NOT NULL,
+    until_ts  INTEGER
+);
+CREATE INDEX IF NOT EXISTS stints_by_flavor ON stints (flavor_id, shop_id, until_ts);
+CREATE INDEX IF NOT EXISTS stints_open ON stints (shop_id) WHERE until_ts IS NULL;
+
+-- Digest of each shop's last recorded snapshot, to skip unchanged ones
+CREATE TABLE IF NOT EXISTS snapshots (
+    shop_id INTEGER PRIMARY KEY,
+    digest  BLOB NOT NULL,
+    taken_ts INTEGER NOT NULL
+);
+"""
+
+# Per shop: currently open?, last seen, seconds stocked within [start, now], latest price
+_FLAVOR_HISTORY = """
+SELECT shop_id,
+       MAX(until_ts IS NULL),
+       MAX(COALESCE(until_ts, :now)),
+       SUM(MAX(0, COALESCE(until_ts, :now) - MAX(since_ts, :start))),
+       (SELECT price FROM stints AS latest
+        WHERE latest.flavor_id = stints.flavor_id AND latest.shop_id = stints.shop_id
+        ORDER BY since_ts DESC LIMIT 1)
+FROM stints
+WHERE flavor_id = :flavor
+GROUP BY shop_id
+ORDER BY 3 DESC
+"""
+
+
+class ShopHistory(NamedTuple):
+    """Availability of one flavor at one shop."""
+
+    shop_id: int
+    in_stock: bool
+    last_seen: int  # unix time; "now" while in stock
+    stocked_fraction: float  # share of the queried window the flavor was in stock
+    price: int  # latest known price
+
+
+class PricePoint(NamedTuple):
+    shop_id: int
+    price: int
+    since: int
+    until: int | None
+
+
+class HistoryStore:
+    """Append-only availability history of every flavor at every shop.
+
+    A snapshot is not stored as a list of products: each (flavor, shop, price) run is a
+    single row that is opened when the flavor appears and closed when it disappears or
+    its price changes. Re-recording an identical snapshot is detected by its digest and
+    writes nothing, so storage grows with the number of *changes*, not of refreshes.
+
+    Args:
+        path: SQLite database file (created on first use).
+        normalize: The normalization that decides when two names are the same flavor.
+    """
+
+    def __init__(self, path: str, normalize: Callable[[str], str]):
+        self._path = path
+        self._normalize = normalize
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+            db = sqlite3.connect(self._path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _flavor_ids(self, db: sqlite3.Connection, names: dict[str, str]) -> dict:
+        db.executemany(
+            "INSERT OR IGNORE INTO flavors (key, name) VALUES (?, ?)", names.items()
+        )
+        ids = {}
+        for key in names:
+            row = db.execute("SELECT id FROM flavors WHERE key = ?", (key,)).fetchone()
+            ids[key] = row[0]
+        return ids
+
+    def record(self, shop_id: int, products, now: float | None = None) -> bool:
+        """Record the current product list of *shop_id*.
+
+        Returns:
+            ``True`` if anything changed since the previous snapshot of this shop.
+        """
+        prices: dict[str, int] = {}
+        names: dict[str, str] = {}
+        for product in products:
+            key = self._normalize(product.name)
+            names.setdefault(key, product.name)
+            prices[key] = product.price
+        digest = hashlib.blake2b(
+            repr(sorted(prices.items())).encode(), digest_size=16
+        ).digest()
+        now = int(time.time() if now is None else now)
+
+        with self._lock:
+            db = self._connect()
+            with db:
+                # Other processes write to the same file: take the write lock before
+                # comparing, so the digest read is the one this write replaces
+                db.execute("BEGIN IMMEDIATE")
+                row = db.execute(
+                    "SELECT digest FROM snapshots WHERE shop_id = ?", (shop_id,)
+                ).fetchone()
+                if row is not None and row[0] == digest:
+                    return False
+
+                ids = self._flavor_ids(db, names)
+                current = {(ids[key], price) for key, price in prices.items()}
+                open_runs = set(
+                    db.execute(
+                        "SELECT flavor_id, price FROM stints "
+                        "WHERE shop_id = ? AND until_ts IS NULL",
+                        (shop_id,),
+                    )
+                )
+                db.executemany(
+                    "UPDATE stints SET until_ts = ? WHERE shop_id = ? "
+                    "AND flavor_id = ? AND price = ? AND until_ts IS NULL",
+                    [(now, shop_id, f, p) for f, p in open_runs - current],
+                )
+                db.executemany(
+                    "INSERT INTO stints (flavor_id, shop_id, price, since_ts) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(f, shop_id, p, now) for f, p in current - open_runs],
+                )
+                db.execute(
+                    "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                    (shop_id, digest, now),
+                )
+            return True
+
+    def find_flavor(self, query: str) -> tuple[int, str] | None:
+        """``(flavor_id, display name)`` of the flavor best matching *query*.
+
+        An exact normalized match wins; otherwise the shortest name containing it.
+        """
+        query_norm = self._normalize(query)
+        with self._lock:
+            db = self._connect()
+            row = db.execute(
+                "SELECT id, name FROM flavors WHERE key = ?", (query_norm,)
+            ).fetchone()
+            if row is None:
+                row = db.execute(
+                    "SELECT id, name FROM flavors WHERE instr(key, ?) > 0 "
+                    "ORDER BY length(key) LIMIT 1",
+                    (query_norm,),
+                ).fetchone()
+        return row
+
+    def flavor_history(
+        self, flavor_id: int, window: float, now: float | None = None
+    ) -> list[ShopHistory]:
+        """Last-seen time, stocked fraction over the last *window* seconds, and latest
+        price of a flavor at every shop that ever had it — most recently seen first."""
+        now = int(time.time() if now is None else now)
+        start = now - int(window)
+        with self._lock:
+            params = {"flavor": flavor_id, "now": now, "start": start}
+            rows = self._connect().execute(_FLAVOR_HISTORY, params).fetchall()
+        return [
+            ShopHistory(shop_id, bool(open_), last, min(1.0, stocked / window), price)
+            for shop_id, open_, last, stocked, price in rows
+        ]
+
+    def price_history(self, flavor_id: int) -> list[PricePoint]:
+        """Every recorded price run of a flavor, per shop, oldest first."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT shop_id, price, since_ts, until_ts FROM stints "
+                "WHERE flavor_id = ? ORDER BY shop_id, since_ts",
+                (flavor_id,),
+            )
+            return [PricePoint(*row) for row in rows]
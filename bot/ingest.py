@@ -0,0 +1,113 @@
+"""Catalog ingestion — fetch the catalog and publish it as a snapshot for bot processes.
+
+Usage::
+
+    python -m bot.ingest [--path ./data/catalog.snapshot] [--interval 600]
+
+Bot processes with ``CATALOG_SNAPSHOT_PATH`` pointing at the same file then serve
+shops and product lists from it, without fetching or parsing anything themselves.
+"""
+
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from bot import services
+from bot.constants import (
+    CACHE_REFRESH_CONCURRENCY,
+    CACHE_REFRESH_INTERVAL_SECONDS,
+    CATALOG_SNAPSHOT_PATH,
+)
+from bot.services import (
+    get_cached_shops,
+    get_catalog_products,
+    get_products_at_shop,
+    normalize,
+)
+from bot.snapshot import write_snapshot
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def _fetch_products(shop_id: int) -> list | None:
+    """The shop's current product list; the last one fetched if this fetch fails."""
+    try:
+        return get_products_at_shop.refresh(shop_id)
+    except Exception:
+        logger.warning("Error fetching products of shop %s", shop_id, exc_info=True)
+        found, products = get_products_at_shop.cache.get((shop_id,))
+        return products if found else None
+
+
+def ingest(path: str, concurrency: int = CACHE_REFRESH_CONCURRENCY) -> int:
+    """Fetch the shops, the product catalog and every shop's product list, and publish
+    them as a new snapshot version at *path*.
+
+    Returns:
+        The version published.
+    """
+    started = time.perf_counter()
+    shops = get_cached_shops.refresh()
+    try:
+        catalog_products = get_catalog_products.refresh()
+    except Exception:
+        logger.warning("Error fetching the product catalog", exc_info=True)
+        catalog_products = []
+    with ThreadPoolExecutor(concurrency) as pool:
+        fetched = pool.map(_fetch_products, [shop.id for shop in shops])
+        products = {
+            shop.id: shop_products
+            for shop, shop_products in zip(shops, fetched)
+            if shop_products is not None
+        }
+    version = write_snapshot(path, shops, products, catalog_products, normalize)
+    logger.info(
+        "Published catalog snapshot v%d (%d shops, %d product lists) in %.1fs",
+        version,
+        len(shops),
+        len(products),
+        time.perf_counter() - started,
+    )
+    return version
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--path", default=CATALOG_SNAPSHOT_PATH or "./data/catalog.snapshot"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=CACHE_REFRESH_INTERVAL_SECONDS,
+        help="seconds between snapshots (0: publish one and exit)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        level=logging.INFO,
+    )
+    # This process writes the snapshot; it must never read its data back from it
+    services.snapshots = None
+
+    while True:
+        started = time.monotonic()
+        try:
+            ingest(args.path)
+        except Exception:
+            if not args.interval:
+                raise
+            logger.warning("Catalog ingestion failed", exc_info=True)
+        if not args.interval:
+            return
+        time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    main()
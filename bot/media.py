@@ -0,0 +1,85 @@
+"""Product photo rendering — media groups that reuse Telegram ``file_id``s."""
+
+import asyncio
+import logging
+
+from telegram import Bot, InputMediaPhoto
+from telegram.error import BadRequest
+
+from bot.constants import PHOTO_UPLOAD_CONCURRENCY
+from bot.formatting import format_flavor_name
+
+logger = logging.getLogger(__name__)
+
+# Telegram accepts 2–10 items per media group
+MEDIA_GROUP_SIZE = 10
+
+# ``bot_data`` key of the persistent Bosko ``Photo.fileId`` → Telegram ``file_id`` map
+FILE_IDS_KEY = "photo_file_ids"
+
+# Limits how many media groups with not-yet-uploaded photos are in flight at once
+_upload_slots = asyncio.Semaphore(PHOTO_UPLOAD_CONCURRENCY)
+
+
+def _media_for(products, file_ids: dict[int, str]) -> list[InputMediaPhoto]:
+    return [
+        InputMediaPhoto(
+            media=file_ids.get(p.photo.fileId) or str(p.photo.url),
+            caption=format_flavor_name(p.name),
+        )
+        for p in products
+    ]
+
+
+async def _send(bot: Bot, chat_id: int, group, file_ids: dict[int, str]) -> list:
+    media = _media_for(group, file_ids)
+    if len(media) == 1:  # a media group needs at least two items
+        return [await bot.send_photo(chat_id, media[0].media, caption=media[0].caption)]
+    return list(await bot.send_media_group(chat_id, media))
+
+
+async def _send_group(bot: Bot, chat_id: int, group, file_ids: dict[int, str]) -> None:
+    """Send one media group, then remember the ``file_id`` Telegram assigned to each photo."""
+    uploads = [p for p in group if p.photo.fileId not in file_ids]
+
+    try:
+        if uploads:
+            async with _upload_slots:
+                messages = await _send(bot, chat_id, group, file_ids)
+        else:
+            messages = await _send(bot, chat_id, group, file_ids)
+    except BadRequest:
+        if len(uploads) == len(group):
+            raise
+        # A stored file_id was rejected (e.g. the bot token changed) — re-upload by URL
+        logger.warning("Stale photo file_id for chat %s, re-uploading", chat_id)
+        for p in group:
+            file_ids.pop(p.photo.fileId, None)
+        async with _upload_slots:
+            messages = await _send(bot, chat_id, group, file_ids)
+
+    for product, message in zip(group, messages):
+        if message.photo:
+            file_ids[product.photo.fileId] = message.photo[-1].file_id
+
+
+async def send_product_photos(
+    bot: Bot, chat_id: int, products, file_ids: dict[int, str]
+) -> None:
+    """Send *products* as media groups of up to ten photos.
+
+    Photos already in *file_ids* are sent by ``file_id`` and cost no upload; the rest are
+    sent by URL (Telegram fetches them once) and their new ``file_id`` is recorded.
+
+    Args:
+        bot: The bot to send with.
+        chat_id: Target chat.
+        products: ``Product`` objects with a ``photo``.
+        file_ids: Persistent map of Bosko ``Photo.fileId`` to Telegram ``file_id``,
+            updated in place.
+    """
+    products = [p for p in products if p.photo]
+    for start in range(0, len(products), MEDIA_GROUP_SIZE):
+        await _send_group(
+            bot, chat_id, products[start : start + MEDIA_GROUP_SIZE], file_ids
+        )
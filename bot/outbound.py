@@ -0,0 +1,204 @@
+"""Outbound Bot API rate limiting — interactive replies jump ahead of bulk notifications."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import Any, Callable, Coroutine
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Send priority, passed as ``rate_limit_args={"priority": ...}`` (lower goes first)."""
+
+    INTERACTIVE = 0
+    NOTIFICATION = 1
+
+
+class TokenBucket:
+    """Classic token bucket: *rate* tokens per second, at most *capacity* banked."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    def consume(self) -> None:
+        self._refill()
+        self._tokens -= 1
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity
+
+
+class PriorityRateLimiter(BaseRateLimiter[dict]):
+    """Rate limiter with a global priority queue and per-chat token buckets.
+
+    * Every request first waits for its chat's bucket (``chat_rate`` per second for
+      private chats, ``group_rate`` for groups), then queues for the global bucket.
+    * The global bucket is served strictly by priority, so interactive replies overtake
+      any backlog of :attr:`Priority.NOTIFICATION` sends.
+    * Notifications are spread over ``spread_window`` seconds by a stable per-chat offset,
+      so a wave of jobs scheduled for the same minute doesn't hit the API at once.
+    * :exc:`~telegram.error.RetryAfter` pauses all sends for the requested time (until
+      the latest deadline, when several arrive) and the request is retried up to
+      ``max_retries`` times.
+    """
+
+    def __init__(
+        self,
+        overall_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        spread_window: float = 0.0,
+        max_retries: int = 3,
+    ):
+        self._overall = TokenBucket(overall_rate, max(1.0, overall_rate))
+        self._chat_rate = chat_rate
+        self._group_rate = group_rate
+        self.spread_window = spread_window
+        self._max_retries = max_retries
+
+        self._chat_buckets: dict[int, TokenBucket] = {}
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        # No request is released before this time (monotonic), set by flood control
+        self._paused_until = 0.0
+        self._dispatcher: asyncio.Task | None = None
+
+    async def initialize(self) -> None:
+        """Start the dispatcher that releases queued requests by priority."""
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def shutdown(self) -> None:
+        """Stop the dispatcher."""
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+
+    @property
+    def queued(self) -> int:
+        """Number of requests currently waiting for the global bucket."""
+        return len(self._queue)
+
+    # ── Internals ───────────────────────────────────────────────────
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue  # the pause may have been extended meanwhile
+            delay = self._overall.delay()
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.done():  # the sender was cancelled while queued
+                continue
+            self._overall.consume()
+            waiter.set_result(None)
+
+    async def _acquire_global(self, priority: int) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        self._wakeup.set()
+        await waiter
+
+    async def _acquire_chat(self, chat_id: Any) -> None:
+        try:
+            chat_id = int(chat_id)
+        except (TypeError, ValueError):  # e.g. "@channelusername"
+            return
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            rate = self._group_rate if chat_id < 0 else self._chat_rate
+            bucket = self._chat_buckets[chat_id] = TokenBucket(rate, 3)
+        while delay := bucket.delay():
+            await asyncio.sleep(delay)
+        bucket.consume()
+
+        # Drop idle buckets so memory stays proportional to active chats
+        if len(self._chat_buckets) > 10_000:
+            self._chat_buckets = {
+                key: value
+                for key, value in self._chat_buckets.items()
+                if not value.full
+            }
+
+    def _spread_delay(self, chat_id: Any) -> float:
+        """Stable offset in ``[0, spread_window)`` derived from the chat id."""
+        try:
+            key = int(chat_id)
+        except (TypeError, ValueError):
+            return 0.0
+        return (key * 2654435761 % 2**32) / 2**32 * self.spread_window
+
+    # ── BaseRateLimiter API ─────────────────────────────────────────
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, bool | dict | list[dict]]],
+        args: Any,
+        kwargs: dict[str, Any],
+        endpoint: str,
+        data: dict[str, Any],
+        rate_limit_args: dict | None,
+    ) -> bool | dict | list[dict]:
+        """Wait for the chat and global buckets, then call the Bot API."""
+        priority = (rate_limit_args or {}).get("priority", Priority.INTERACTIVE)
+        chat_id = data.get("chat_id")
+
+        if priority >= Priority.NOTIFICATION and self.spread_window and chat_id:
+            await asyncio.sleep(self._spread_delay(chat_id))
+
+        retries = 0
+        while True:
+            if chat_id is not None:
+                await self._acquire_chat(chat_id)
+            await self._acquire_global(priority)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as exc:
+                retries += 1
+                if retries > self._max_retries:
+                    raise
+                retry_after = exc.retry_after
+                if not isinstance(retry_after, (int, float)):
+                    retry_after = retry_after.total_seconds()
+                logger.warning(
+                    "Flood control on %s (chat %s), pausing sends for %.1fs",
+                    endpoint,
+                    chat_id,
+                    retry_after,
+                )
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + retry_after + 0.1
+                )
@@ -0,0 +1,132 @@
+"""Paginated replies — long result lists rendered once into pages, flipped with inline buttons."""
+
+import hashlib
+from typing import Callable
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.constants import MessageLimit
+from telegram.ext import ContextTypes
+
+from bot.cache import SizedLRUCache
+from bot.constants import CACHE_TTL_SECONDS, PAGE_CACHE_MAX_BYTES, RESULTS_PAGE_SIZE
+
+CALLBACK_PREFIX = "page:"
+
+# Rendered pages by token; a token stands for (command, normalized query, data version).
+# Plain LRU: a page set just rendered is about to be flipped through, however rarely
+# its query comes up
+_pages = SizedLRUCache(PAGE_CACHE_MAX_BYTES)
+
+
+def _paginate(header: str, lines: list[str], page_size: int) -> tuple[str, ...]:
+    # Room for the header and the page footer in every message
+    budget = MessageLimit.MAX_TEXT_LENGTH - len(header) - len("\n\nPage 9999/9999")
+    pages, current, size = [], [], 0
+    for line in lines:
+        if current and (len(current) == page_size or size + len(line) >= budget):
+            pages.append(current)
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    pages.append(current)
+    if len(pages) == 1:
+        return (header + "\n".join(pages[0]),)
+    return tuple(
+        header + "\n".join(page) + f"\n\nPage {number}/{len(pages)}"
+        for number, page in enumerate(pages, 1)
+    )
+
+
+def _token(command: str, query_key: str, version: int) -> str:
+    # Callback data is limited to 64 bytes, so the key goes in as a short digest
+    key = f"{command}\0{query_key}\0{version}".encode()
+    return hashlib.blake2b(key, digest_size=8).hexdigest()
+
+
+def _markup(token: str, page: int, count: int) -> InlineKeyboardMarkup | None:
+    if count == 1:
+        return None
+    buttons = []
+    if page > 0:
+        buttons.append(
+            InlineKeyboardButton(
+                "◀ Prev", callback_data=f"{CALLBACK_PREFIX}{token}:{page - 1}"
+            )
+        )
+    if page < count - 1:
+        buttons.append(
+            InlineKeyboardButton(
+                "Next ▶", callback_data=f"{CALLBACK_PREFIX}{token}:{page + 1}"
+            )
+        )
+    return InlineKeyboardMarkup([buttons])
+
+
+class Pages:
+    """The rendered pages of one result list, and the keyboard to flip through them."""
+
+    def __init__(self, token: str, pages: tuple[str, ...], parse_mode: str | None):
+        self.token = token
+        self.pages = pages
+        self.parse_mode = parse_mode
+
+    def text(self, page: int = 0) -> str:
+        return self.pages[page]
+
+    def markup(self, page: int = 0) -> InlineKeyboardMarkup | None:
+        return _markup(self.token, page, len(self.pages))
+
+
+def get_pages(
+    command: str,
+    query_key: str,
+    version: int,
+    render: Callable[[], tuple[str, list[str]]],
+    parse_mode: str | None = "Markdown",
+) -> Pages:
+    """The pages of a result list, rendered on the first request for it.
+
+    Args:
+        command: The command the results belong to.
+        query_key: Its argument — normalized, unless the rendered text quotes it as
+            typed (the shop ID for ``/products``).
+        version: Version of the data the results are computed from; a refresh bumps
+            it, so pages rendered from older data are never shown for a new request.
+        render: Returns the header and the result lines, one per result.
+        parse_mode: Parse mode of the rendered text.
+    """
+    token = _token(command, query_key, version)
+    found, value = _pages.get(token)
+    if found:
+        return Pages(token, *value)
+    header, lines = render()
+    pages = _paginate(header, lines, RESULTS_PAGE_SIZE)
+    _pages.put(token, (pages, parse_mode), CACHE_TTL_SECONDS)
+    return Pages(token, pages, parse_mode)
+
+
+async def reply_pages(update: Update, pages: Pages) -> None:
+    """Reply with the first page and, if there are more, the buttons to reach them."""
+    await update.effective_message.reply_text(
+        pages.text(), parse_mode=pages.parse_mode, reply_markup=pages.markup()
+    )
+
+
+async def flip_page(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle a prev/next button: show the requested page from the page cache."""
+    query = update.callback_query
+    token, _, page = query.data.removeprefix(CALLBACK_PREFIX).partition(":")
+    found, value = _pages.get(token)
+    if not found:
+        await query.answer(
+            "These results have expired, please run the command again.",
+            show_alert=True,
+        )
+        return
+
+    pages = Pages(token, *value)
+    page = min(max(int(page), 0), len(pages.pages) - 1)
+    await query.answer()
+    await query.edit_message_text(
+        pages.text(page), parse_mode=pages.parse_mode, reply_markup=pages.markup(page)
+    )
@@ -0,0 +1,145 @@
+"""Speculative prefetch — load the product lists of shops a conversation is about to need."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Iterable
+
+from telegram.ext import Application
+
+from bot.constants import (
+    CACHE_TTL_SECONDS,
+    PREFETCH_CONCURRENCY,
+    PREFETCH_PER_MINUTE,
+)
+from bot.outbound import TokenBucket
+from bot.services import get_products_at_shop, products_loaded
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculativePrefetcher:
+    """Background loads of product lists a user will probably ask for next.
+
+    A shop picked while adding favorites is likely to be looked at with ``/products``
+    or checked by ``/daily_updates`` soon after, so its product list is loaded ahead
+    of time:
+
+    * at low priority — at most *concurrency* loads run at once, so speculation never
+      holds more than a few of the worker threads user requests need. Queued loads
+      of shops the user actually picked go first, then the most recently requested,
+      whose users are the likeliest to still be on their way to a command,
+    * at most once per *window* per shop, and only if the list isn't cached (or in
+      the catalog snapshot),
+    * within a global budget of *per_minute* loads; the rest are dropped.
+
+    Each load is a *hit* if the list is then requested (:meth:`record_use`) before the
+    window is over, and *wasted* otherwise.
+
+    Args:
+        concurrency: Speculative loads in flight at once.
+        per_minute: Speculative loads started per minute (burst: the same number);
+            0 disables prefetching.
+        window: Seconds before a shop may be prefetched again (the cache TTL).
+    """
+
+    def __init__(self, concurrency: int, per_minute: float, window: float):
+        self._concurrency = concurrency
+        self._queue: list[tuple[int, int, int]] = []  # (rank, -sequence, shop ID)
+        self._sequence = itertools.count()
+        self._running = 0
+        self._enabled = per_minute > 0
+        self._budget = TokenBucket(per_minute / 60, per_minute)
+        self._window = window
+        self._started: dict[int, float] = {}  # shop ID -> last prefetch
+        self._unused: dict[int, float] = {}  # prefetched, not requested since
+        self._loaded = self._hits = self._wasted = self._over_budget = 0
+
+    def prefetch(
+        self, application: Application, shop_ids: Iterable[int], picked: bool = False
+    ) -> int:
+        """Queue background loads of *shop_ids*, most popular first.
+
+        Args:
+            application: Runs the loads.
+            shop_ids: Shops whose product lists may be needed soon.
+            picked: Whether the user chose these shops (rather than a city or search
+                they are among), which puts them ahead of the queue.
+
+        Returns:
+            The number of loads queued.
+        """
+        if not self._enabled:
+            return 0
+        cache = get_products_at_shop.cache
+        now = time.monotonic()
+        started = 0
+        for shop_id in sorted(shop_ids, key=lambda i: -cache.frequency((i,))):
+            if now - self._started.get(shop_id, -self._window) < self._window:
+                continue
+            if products_loaded(shop_id):
+                continue
+            if self._budget.delay() > 0:
+                self._over_budget += 1
+                continue
+            self._budget.consume()
+            self._started[shop_id] = now
+            rank = 0 if picked else 1
+            heapq.heappush(self._queue, (rank, -next(self._sequence), shop_id))
+            started += 1
+        while self._queue and self._running < self._concurrency:
+            self._running += 1
+            application.create_task(self._drain())
+        return started
+
+    async def _drain(self) -> None:
+        try:
+            while self._queue:
+                _, _, shop_id = heapq.heappop(self._queue)
+                await self._load(shop_id)
+        finally:
+            self._running -= 1
+
+    async def _load(self, shop_id: int) -> None:
+        if products_loaded(shop_id):
+            return  # requested by a user while queued
+        try:
+            # Loaded without counting as an access, which would skew the cache policy
+            # towards speculation
+            await asyncio.to_thread(get_products_at_shop.refresh, shop_id)
+        except Exception:
+            logger.warning("Error prefetching shop %s", shop_id, exc_info=True)
+            return
+        self._loaded += 1
+        self._unused[shop_id] = time.monotonic()
+
+    def record_use(self, shop_ids: Iterable[int]) -> None:
+        """Note that a user request needed the product lists of *shop_ids*."""
+        for shop_id in shop_ids:
+            if self._unused.pop(shop_id, None) is not None:
+                self._hits += 1
+
+    def stats(self) -> dict[str, float]:
+        """Loads, hits, wasted loads and the hit rate since start-up."""
+        deadline = time.monotonic() - self._window
+        for shop_id, loaded in list(self._unused.items()):
+            if loaded < deadline:
+                del self._unused[shop_id]
+                self._wasted += 1
+        for shop_id, started in list(self._started.items()):
+            if started < deadline:
+                del self._started[shop_id]
+        return {
+            "loaded": self._loaded,
+            "hits": self._hits,
+            "wasted": self._wasted,
+            "over_budget": self._over_budget,
+            "hit_rate": round(self._hits / self._loaded, 3) if self._loaded else 0.0,
+        }
+
+
+prefetcher = SpeculativePrefetcher(
+    PREFETCH_CONCURRENCY, PREFETCH_PER_MINUTE, CACHE_TTL_SECONDS
+)
@@ -0,0 +1,167 @@
+"""Progressive replies — a placeholder message edited in place while a slow scan runs."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from telegram import InlineKeyboardMarkup, Message, Update
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest
+from telegram.ext import ContextTypes
+
+from bot.constants import PROGRESS_EDIT_INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def split_message(text: str, limit: int = MessageLimit.MAX_TEXT_LENGTH) -> list[str]:
+    """Split *text* at line breaks into chunks Telegram accepts as one message each."""
+    chunks, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if len(current) + len(line) > limit:
+            chunks.append(current)
+            current = ""
+        current += line
+    if current or not chunks:
+        chunks.append(current)
+    return chunks
+
+
+class ProgressiveReply:
+    """A sent message whose text is replaced as results come in.
+
+    Intermediate edits are throttled to one per *interval* seconds (the latest text wins),
+    keeping well inside Telegram's limits on edits per chat; :meth:`finish` always
+    writes the final text.
+
+    Args:
+        message: The sent placeholder.
+        interval: Minimum seconds between progress edits.
+        parse_mode: Parse mode of every text sent.
+        text: The text *message* was sent with (``message.text`` has its markup
+            stripped by Telegram).
+    """
+
+    def __init__(
+        self,
+        message: Message,
+        interval: float,
+        parse_mode: str | None,
+        text: str | None = None,
+    ):
+        self.message = message
+        self._interval = interval
+        self._parse_mode = parse_mode
+        self._sent_text = message.text if text is None else text
+        self._last_edit = time.monotonic()
+
+    @property
+    def text(self) -> str:
+        """The text last sent, as written (with its markup), so it can be sent again."""
+        return self._sent_text
+
+    @property
+    def due(self) -> bool:
+        """Whether an :meth:`update` now would be shown (so the text is worth building)."""
+        return time.monotonic() - self._last_edit >= self._interval
+
+    async def _edit(
+        self, text: str, reply_markup: InlineKeyboardMarkup | None = None
+    ) -> None:
+        if text == self._sent_text and reply_markup is None:
+            return
+        try:
+            await self.message.edit_text(
+                text, parse_mode=self._parse_mode, reply_markup=reply_markup
+            )
+        except BadRequest as exc:
+            if "not modified" not in str(exc).lower():
+                raise
+        self._sent_text = text
+        self._last_edit = time.monotonic()
+
+    async def update(self, text: str) -> None:
+        """Show *text* as progress, unless the last edit was too recent."""
+        if self.due:
+            await self._edit(split_message(text)[0])
+
+    async def finish(
+        self, text: str, reply_markup: InlineKeyboardMarkup | None = None
+    ) -> None:
+        """Replace the placeholder with the final *text* (continued in new messages if
+        it is longer than one message allows)."""
+        first, *rest = split_message(text)
+        await self._edit(first, reply_markup)
+        for chunk in rest:
+            await self.message.reply_text(chunk, parse_mode=self._parse_mode)
+
+
+# ── Per-chat scans ──────────────────────────────────────────────────
+# The scan running in each chat; a new command in that chat cancels it
+_scans: dict[int, asyncio.Task] = {}
+
+Scan = Callable[[ProgressiveReply], Awaitable[None]]
+
+
+def cancel_scan(chat_id: int) -> bool:
+    """Cancel the scan running in *chat_id*, if any."""
+    task = _scans.pop(chat_id, None)
+    if task is None or task.done():
+        return False
+    task.cancel()
+    return True
+
+
+async def cancel_scan_on_command(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Handler for every command (in a group before the others): a new command
+    supersedes the chat's running scan."""
+    if update.effective_chat and cancel_scan(update.effective_chat.id):
+        logger.info("Cancelled the scan in chat %s", update.effective_chat.id)
+
+
+async def _run(chat_id: int, reply: ProgressiveReply, scan: Scan) -> None:
+    try:
+        await scan(reply)
+    except asyncio.CancelledError:
+        await reply.finish(f"{reply.text}\n\n⏹ Cancelled.")
+    except Exception:
+        logger.warning("Scan failed in chat %s", chat_id, exc_info=True)
+        await reply.finish("Something went wrong, please try again later.")
+    finally:
+        if _scans.get(chat_id) is asyncio.current_task():
+            del _scans[chat_id]
+
+
+async def start_scan(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    placeholder: str,
+    scan: Scan,
+    parse_mode: str | None = "Markdown",
+) -> None:
+    """Reply with *placeholder* right away, then run *scan* in the background.
+
+    The scan receives the :class:`ProgressiveReply` to report progress to and to
+    finish with its result. The handler returns immediately, so the chat's next update
+    — which cancels the scan if it is a command — isn't queued behind it.
+    """
+    chat_id = update.effective_chat.id
+    cancel_scan(chat_id)
+    message = await update.effective_message.reply_text(
+        placeholder, parse_mode=parse_mode
+    )
+    reply = ProgressiveReply(
+        message, PROGRESS_EDIT_INTERVAL_SECONDS, parse_mode, text=placeholder
+    )
+    _scans[chat_id] = context.application.create_task(
+        _run(chat_id, reply, scan), update=update
+    )
@@ -0,0 +1,110 @@
+"""Conversation scratch space — per-user state that lives only as long as a conversation."""
+
+import functools
+import logging
+
+from telegram import ReplyKeyboardRemove, Update
+from telegram.ext import Application, ConversationHandler, ContextTypes, TypeHandler
+
+from bot.constants import CONVERSATION_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Scratch keys conversations used to keep in user_data, where they were pickled forever
+LEGACY_SCRATCH_KEYS = (
+    "flavor_search_results",
+    "selected_flavors",
+    "city_shops",
+    "search_shops",
+    "selected_shops",
+    "update_time",
+    "timezone",
+    "selected_days",
+    # Not scratch, but process-local all the same: flavor IDs of the favorites
+    "favorite_flavor_ids",
+)
+
+# (conversation name, chat ID, user ID) -> scratch space, like ConversationHandler keys
+_spaces: dict[tuple[str, int, int], dict] = {}
+
+
+def _key(conversation: str, update: Update) -> tuple[str, int, int]:
+    return conversation, update.effective_chat.id, update.effective_user.id
+
+
+def scratch(update: Update, conversation: str) -> dict:
+    """The scratch space of the user of *update* in *conversation*.
+
+    Kept in memory only (never in ``user_data``, so never persisted) and discarded
+    when a conversation built with :func:`scoped_conversation` ends, times out or is
+    cancelled. Handlers must cope with an empty one, e.g. after a restart.
+    """
+    return _spaces.setdefault(_key(conversation, update), {})
+
+
+def discard(update: Update, conversation: str) -> None:
+    """Drop the scratch space of the user of *update* in *conversation*."""
+    _spaces.pop(_key(conversation, update), None)
+
+
+def _scoped(conversation: str, callback, entry: bool = False):
+    """Wrap a conversation *callback* to discard the scratch space when it returns
+    ``END`` (and, for an entry point, before it starts over)."""
+
+    @functools.wraps(callback)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        if entry:
+            discard(update, conversation)
+        state = await callback(update, context)
+        if state == ConversationHandler.END:
+            discard(update, conversation)
+        return state
+
+    return wrapper
+
+
+def scoped_conversation(
+    name: str, entry_points: list, states: dict, fallbacks: list
+) -> ConversationHandler:
+    """A persistent ``ConversationHandler`` whose :func:`scratch` space is discarded
+    when it ends, whether finished, cancelled or timed out after
+    ``CONVERSATION_TIMEOUT_SECONDS`` of silence."""
+    for handler in entry_points:
+        handler.callback = _scoped(name, handler.callback, entry=True)
+    for handler in [*fallbacks, *(h for hs in states.values() for h in hs)]:
+        handler.callback = _scoped(name, handler.callback)
+
+    async def timed_out(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        discard(update, name)
+        await update.effective_chat.send_message(
+            "⌛ Timed out — nothing was changed.", reply_markup=ReplyKeyboardRemove()
+        )
+
+    return ConversationHandler(
+        entry_points=entry_points,
+        states={
+            **states,
+            ConversationHandler.TIMEOUT: [TypeHandler(Update, timed_out)],
+        },
+        fallbacks=fallbacks,
+        conversation_timeout=CONVERSATION_TIMEOUT_SECONDS or None,
+        name=name,
+        persistent=True,
+    )
+
+
+def purge_legacy_scratch(application: Application) -> int:
+    """Remove scratch keys older versions left in persisted ``user_data``.
+
+    Returns:
+        The number of users whose data shrank.
+    """
+    user_ids = [
+        user_id
+        for user_id, data in application.user_data.items()
+        if any([data.pop(key, None) is not None for key in LEGACY_SCRATCH_KEYS])
+    ]
+    if user_ids:
+        application.mark_data_for_update_persistence(user_ids=user_ids)
+        logger.info("Removed leftover conversation state of %d users", len(user_ids))
+    return len(user_ids)
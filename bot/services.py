@@ -1,82 +1,556 @@
 """Data-access layer — cached API calls, normalization, and shop/flavor lookups."""
 
+import asyncio
+import functools
+import itertools
 import logging
 import os
+import threading
+from typing import TYPE_CHECKING
 
 from dotenv import load_dotenv
-from unidecode import unidecode
 
-from api.client import BoskoAPI
-from bot.constants import CACHE_TTL_SECONDS, ALL_SHOPS_LIMIT
+from bot.availability import AvailabilityMatrix
+from bot.cache import Expiring, PrefixSearchCache, sized_ttl_cache
+from bot.catalog import FlavorCatalog
+from bot.constants import (
+    ALL_SHOPS_LIMIT,
+    API_RECORD_PATH,
+    API_REPLAY_PATH,
+    API_REPLAY_TIME_SCALE,
+    CACHE_REFRESH_AHEAD_SECONDS,
+    CATALOG_SNAPSHOT_PATH,
+    CACHE_TTL_SECONDS,
+    FAVORITES_AVAILABILITY_TTL_SECONDS,
+    HISTORY_DB_PATH,
+    PRODUCT_CACHE_MAX_BYTES,
+    SEARCH_ALL_MAX_PAGES,
+    SEARCH_RESULTS_LIMIT,
+    SESSION_TTL_SECONDS,
+    SHARED_CACHE_PATH,
+    SHOPS_CACHE_MAX_BYTES,
+)
 from bot.formatting import format_flavor_name
-from bot.utils import ttl_cache
+from bot.history import HistoryStore
+from bot.shared_cache import SharedCache
+from bot.snapshot import CatalogSnapshot, SnapshotStore
+from bot.text import normalize_text
+from bot.workers import cpu_map
+
+if TYPE_CHECKING:
+    from api.client import BoskoAPI
+    from api.transport import Transport
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# ── Shared cache tier ───────────────────────────────────────────────
+# Catalog data (and the API session) shared with other bot processes on the host,
+# beneath each process's in-memory caches
+shared = SharedCache(SHARED_CACHE_PATH) if SHARED_CACHE_PATH else None
+
+
+def _fetch_shared(key: str, fetch) -> Expiring:
+    """Call *fetch*, or read its result from the shared tier where another process
+    stored it; the in-memory copy then expires together with the shared one."""
+    if shared is None:
+        return Expiring(fetch(), CACHE_TTL_SECONDS)
+    return Expiring(
+        *shared.get_or_load(
+            key, fetch, CACHE_TTL_SECONDS, min_ttl=CACHE_REFRESH_AHEAD_SECONDS
+        )
+    )
+
+
+# ── Data version ────────────────────────────────────────────────────
+# Bumped whenever the fetched shops or a shop's stock change, so results rendered
+# from them can be cached per version
+_versions = itertools.count(1)
+_data_version = 0
+
+
+def _data_changed() -> None:
+    global _data_version
+    _data_version = next(_versions)
+
+
+def data_version() -> int:
+    return _data_version
+
+
+# ── Catalog snapshot ────────────────────────────────────────────────
+# Published by a separate ingest process (``python -m bot.ingest``); while a fresh
+# one exists, shops and product lists are read from it instead of the API
+
+
+def _snapshot_swapped(snapshot: CatalogSnapshot) -> None:
+    """Derive the flavor catalog, availability matrix and search cache of a new
+    snapshot version. They are attached to it rather than written into the shared
+    ones, so that updates pinned to the previous version keep reading that."""
+    names = snapshot.flavor_names()
+    flavor_ids = [
+        catalog.intern(name, key) for name, key in zip(names, normalize_all(names))
+    ]
+    stock = {
+        shop_id: frozenset(flavor_ids[i] for i in snapshot.flavor_ids_at(shop_id))
+        for shop_id in snapshot.shop_ids()
+        if snapshot.has_products(shop_id)
+    }
+    snapshot.catalog = catalog.with_stock(stock)
+    snapshot.availability = AvailabilityMatrix(len(stock), len(catalog))
+    for shop_id, flavors in stock.items():
+        snapshot.availability.set_shop(shop_id, flavors)
+    if snapshot.catalog_products():
+        snapshot.search = _new_search_cache()
+        snapshot.search.seed("", snapshot.catalog_products())
+    snapshot.shops()  # decoded here rather than by the first handler to need them
+    _data_changed()
+
+
+snapshots = (
+    SnapshotStore(CATALOG_SNAPSHOT_PATH, CACHE_TTL_SECONDS, _snapshot_swapped)
+    if CATALOG_SNAPSHOT_PATH
+    else None
+)
+
+
+def check_snapshot() -> CatalogSnapshot | None:
+    """Open the snapshot file if a new version was published (file I/O and decoding:
+    call from a worker thread), and return the newest."""
+    return snapshots.refresh() if snapshots is not None else None
+
+
+def current_snapshot() -> CatalogSnapshot | None:
+    """The snapshot the current update was pinned to (else the newest), if any."""
+    return snapshots.pinned() if snapshots is not None else None
+
+
+def current_catalog() -> FlavorCatalog:
+    """The flavor catalog of the current snapshot, else the one fetches update."""
+    snapshot = current_snapshot()
+    return snapshot.catalog if snapshot is not None else catalog
+
+
+def pin_snapshot() -> None:
+    """Pin the newest snapshot for the rest of the current update, so that every
+    handler and task working on it reads one consistent catalog version."""
+    if snapshots is not None:
+        snapshots.pin()
+
+
+def _from_snapshot(read):
+    """Serve a cached loader from the current snapshot when it has the data (*read*
+    returns ``None`` when it doesn't); the loader and its cache stay in place."""
+
+    def decorator(cached):
+        @functools.wraps(cached)
+        def wrapper(*args):
+            snapshot = current_snapshot()
+            if snapshot is not None:
+                value = read(snapshot, *args)
+                if value is not None:
+                    return value
+            return cached(*args)
+
+        return wrapper
+
+    return decorator
+
+
 # ── API singleton ───────────────────────────────────────────────────
-_api: BoskoAPI | None = None
+_api: "BoskoAPI | None" = None
+_api_lock = threading.Lock()
+
+
+def _make_transport() -> "Transport | None":
+    """Replay from / record to a cassette when configured, else the live API."""
+    from api.transport import RecordingTransport, ReplayTransport
+
+    if API_REPLAY_PATH:
+        logger.info("Replaying Bosko API responses from %s", API_REPLAY_PATH)
+        return ReplayTransport(API_REPLAY_PATH, time_scale=API_REPLAY_TIME_SCALE)
+    if API_RECORD_PATH:
+        logger.info("Recording Bosko API exchanges to %s", API_RECORD_PATH)
+        return RecordingTransport(API_RECORD_PATH)
+    return None
+
+
+def _login(api: "BoskoAPI") -> str:
+    api.login(os.getenv("EMAIL"), os.getenv("PASSWORD"))
+    return api.token
 
 
-def get_api() -> BoskoAPI:
+def get_api() -> "BoskoAPI":
     """Return the shared API client, creating & authenticating on first call."""
     global _api
     if _api is None:
-        _api = BoskoAPI()
-        _api.login(os.getenv("EMAIL"), os.getenv("PASSWORD"))
+        with _api_lock:  # cache refreshes call in from worker threads
+            if _api is None:
+                from api.client import BoskoAPI
+
+                api = BoskoAPI(transport=_make_transport())
+                if shared is None:
+                    api.login(os.getenv("EMAIL"), os.getenv("PASSWORD"))
+                else:
+                    token, _ = shared.get_or_load(
+                        "session", lambda: _login(api), SESSION_TTL_SECONDS
+                    )
+                    api.set_token(token)
+                _api = api
     return _api
 
 
 # ── Text helpers ────────────────────────────────────────────────────
 
 
+@functools.lru_cache(maxsize=8192)
 def normalize(text: str) -> str:
     """Lowercase, strip, and transliterate to ASCII for fuzzy matching."""
-    return unidecode(text.strip().lower())
+    return normalize_text(text)
+
+
+def normalize_all(texts: list[str]) -> list[str]:
+    """:func:`normalize` every one of *texts* — a sweep over a whole catalog, run in
+    the CPU worker processes if there are any (call from a worker thread)."""
+    return cpu_map(normalize_text, texts, inline=normalize)
+
+
+# ── Flavor catalog ──────────────────────────────────────────────────
+# Shared across shops; refreshed whenever a shop's product list is fetched
+catalog = FlavorCatalog(normalize)
+# Bit-packed shops × flavor IDs, rewritten per shop when its product list is fetched
+availability = AvailabilityMatrix()
+
+
+# Persistent record of every inventory change, keyed on normalized flavor names
+history = HistoryStore(HISTORY_DB_PATH, normalize)
+
+
+def favorite_flavor_ids(flavor_names) -> frozenset[int]:
+    """Canonical flavor IDs for a list of favorite flavor display names."""
+    return catalog.intern_all(flavor_names)
+
+
+# Normalized flavor name → IDs of the products with that name, once found by a search
+_product_ids: dict[str, frozenset[int]] = {}
+
+
+def favorite_product_ids(flavor_names) -> frozenset[int]:
+    """API product IDs of a list of favorite flavor display names, resolved by search.
+
+    Names no search result matches (yet) are skipped.
+    """
+    ids = set()
+    for name in flavor_names:
+        key = normalize(name)
+        if key not in _product_ids:
+            found = frozenset(
+                product.id
+                for product in cached_api_search(name)
+                if normalize(product.name) == key
+            )
+            if not found:
+                continue
+            _product_ids[key] = found
+        ids |= _product_ids[key]
+    return frozenset(ids)
 
 
 # ── Cached data access ──────────────────────────────────────────────
 
 
-@ttl_cache(max_age=CACHE_TTL_SECONDS)
+@_from_snapshot(CatalogSnapshot.shops)
+@sized_ttl_cache(max_age=CACHE_TTL_SECONDS, max_bytes=SHOPS_CACHE_MAX_BYTES)
 def get_cached_shops():
     """Fetch all shops (cached for ``CACHE_TTL_SECONDS``)."""
-    return get_api().shops.get_all(limit=ALL_SHOPS_LIMIT)
+    shops = _fetch_shared(
+        "shops", lambda: list(get_api().shops.iter_all(limit=ALL_SHOPS_LIMIT))
+    )
+    _data_changed()
+    return shops
 
 
-@ttl_cache(max_age=CACHE_TTL_SECONDS)
+@_from_snapshot(CatalogSnapshot.products)
+@sized_ttl_cache(max_age=CACHE_TTL_SECONDS, max_bytes=PRODUCT_CACHE_MAX_BYTES)
 def get_products_at_shop(shop_id: int):
-    """Fetch products at a specific shop (cached)."""
-    return get_api().products.get_at_shop(shop_id)
+    """Fetch products at a specific shop (cached), map them onto catalog IDs and record
+    the snapshot in the availability history."""
+    products, ttl = _fetch_shared(
+        f"products:{shop_id}", lambda: get_api().products.get_at_shop(shop_id)
+    )
+    stocked = catalog.flavors_at(shop_id)
+    availability.set_shop(shop_id, catalog.update_shop(shop_id, products))
+    if catalog.flavors_at(shop_id) != stocked:
+        _data_changed()
+    try:
+        history.record(shop_id, products)
+    except Exception:
+        logger.warning("Error recording history for shop %s", shop_id, exc_info=True)
+    return Expiring(products, ttl)
+
+
+def products_loaded(shop_id: int) -> bool:
+    """Whether the product list of *shop_id* can be had without an upstream request."""
+    snapshot = current_snapshot()
+    if snapshot is not None and snapshot.has_products(shop_id):
+        return True
+    # An expired list is still stored (0 seconds left) until replaced, but reading it
+    # would fetch upstream
+    expires_in = get_products_at_shop.cache.expires_in((shop_id,))
+    return expires_in is not None and expires_in > 0
+
+
+def _search_all() -> list:
+    """Every product in the catalog, read from the search endpoint a page at a time.
+
+    Stops at the first short page, or at a page with no product not seen before (as a
+    backend ignoring the page parameter would return), and at ``SEARCH_ALL_MAX_PAGES``.
+    """
+    products: dict[int, object] = {}
+    for page in range(1, SEARCH_ALL_MAX_PAGES + 1):
+        count = new = 0
+        for product in get_api().products.iter_search(
+            None, limit=SEARCH_RESULTS_LIMIT, current_page=page
+        ):
+            count += 1
+            if product.id not in products:
+                products[product.id] = product
+                new += 1
+        if count < SEARCH_RESULTS_LIMIT or not new:
+            return list(products.values())
+    logger.warning(
+        "Catalog sweep stopped after %d pages (%d products): the catalog may be "
+        "incomplete",
+        SEARCH_ALL_MAX_PAGES,
+        len(products),
+    )
+    return list(products.values())
+
+
+@sized_ttl_cache(max_age=CACHE_TTL_SECONDS, max_bytes=SHOPS_CACHE_MAX_BYTES)
+def get_catalog_products():
+    """Fetch the whole product catalog (cached), in O(pages) requests rather than one
+    per shop.
+
+    Registers every flavor in the catalog, and seeds the search cache with it as the
+    complete result of the empty query, so that every search is answered locally.
+    """
+    products, ttl = _fetch_shared("catalog", _search_all)
+    names = [product.name for product in products]
+    catalog.intern_all(names, normalize_all(names))
+    _search_cache.seed("", products)
+    _data_changed()
+    return Expiring(products, ttl)
+
+
+@sized_ttl_cache(
+    max_age=FAVORITES_AVAILABILITY_TTL_SECONDS, max_bytes=SHOPS_CACHE_MAX_BYTES
+)
+def get_favorite_availability() -> dict[int, frozenset[int]]:
+    """Flavor IDs of the account's favourite products in stock at each shop.
+
+    Read from the ``availableFavouriteProducts`` of a single shop-list request, so it
+    covers every shop without fetching their product lists.
+    """
+    return {
+        shop.id: catalog.intern_all(
+            product["name"] for product in shop.availableFavouriteProducts
+        )
+        for shop in get_api().shops.iter_all(limit=ALL_SHOPS_LIMIT)
+    }
 
 
-@ttl_cache(max_age=CACHE_TTL_SECONDS)
-def cached_flavor_search(query: str):
-    """Search for a flavor across *all* shops by scanning their current product lists."""
-    query_norm = normalize(query)
-    results = []
+def flavors_available_at(shops, query: str) -> list[tuple[str, str]]:
+    """Flavors matching *query* in stock at *shops*, from their cached product lists.
 
-    for shop in get_cached_shops():
-        try:
-            for product in get_products_at_shop(shop.id):
-                if query_norm in normalize(product.name):
-                    results.append((shop.name, format_flavor_name(product.name)))
-        except Exception:
-            logger.warning("Error fetching products for %s", shop.name, exc_info=True)
+    Returns:
+        ``(shop name, flavor display name)`` pairs, sorted by shop and flavor.
+    """
+    flavors = current_catalog()
+    matches = flavors.matching(query)
+    return sorted(
+        (shop.name, format_flavor_name(flavors.name_of(flavor_id)))
+        for shop in shops
+        for flavor_id in flavors.flavors_at(shop.id) & matches
+    )
 
-    return results
+
+def _new_search_cache() -> PrefixSearchCache:
+    return PrefixSearchCache(
+        max_age=CACHE_TTL_SECONDS,
+        normalize=normalize,
+        text_of=lambda product: product.name,
+    )
+
+
+_search_cache = _new_search_cache()
+
+
+def _current_search_cache() -> PrefixSearchCache:
+    """The search cache of the current snapshot if it has the catalog, else the one
+    searches upstream fill."""
+    snapshot = current_snapshot()
+    if snapshot is not None and snapshot.search is not None:
+        return snapshot.search
+    return _search_cache
 
 
-@ttl_cache(max_age=CACHE_TTL_SECONDS)
 def cached_api_search(query: str):
-    """Search using the API search endpoint (cached)."""
+    """Search using the API search endpoint (cached on the normalized query).
+
+    Refinements of an earlier complete search (e.g. "mascarpone" after "masc") are
+    answered by filtering its cached results instead of calling the API again.
+    """
+    query_norm = normalize(query)
+    search_cache = _current_search_cache()
+    results = search_cache.lookup(query_norm)
+    if results is not None:
+        return results
+
     try:
-        return get_api().products.search(query)
+        results, _ = _fetch_shared(
+            f"search:{query_norm}",
+            lambda: get_api().products.search(
+                query.strip(), limit=SEARCH_RESULTS_LIMIT
+            ),
+        )
     except Exception:
         logger.warning("Error searching via API for '%s'", query, exc_info=True)
         return []
 
+    search_cache.store(
+        query_norm, results, complete=len(results) < SEARCH_RESULTS_LIMIT
+    )
+    return results
+
+
+def cache_stats() -> dict[str, dict]:
+    """Return size, hit-rate and avoided-upstream-call figures for the caches."""
+    info = get_products_at_shop.cache_info()
+    snapshot = current_snapshot()
+    return {
+        "products": {
+            **info._asdict(),
+            "hit_rate": round(info.hit_rate, 3),
+        },
+        "search": _current_search_cache().stats(),
+        **({"shared": shared.stats()} if shared else {}),
+        **(
+            {"snapshot": {"version": snapshot.version, "age": round(snapshot.age)}}
+            if snapshot is not None
+            else {}
+        ),
+    }
+
+
+# ── Event-loop entry points ─────────────────────────────────────────
+# Loading and matching for coroutines: whatever would block the event loop (an
+# upstream fetch and its parsing, a matrix match) runs in a worker thread
+
+# Product-list loads in flight, shared by concurrent callers so that they don't each
+# hold a worker thread waiting for the same load
+_product_fetches: dict[int, asyncio.Future] = {}
+
+
+def _fetch_done(shop_id: int, fetch: asyncio.Future) -> None:
+    del _product_fetches[shop_id]
+    if not fetch.cancelled():
+        fetch.exception()  # retrieved, even if every caller waiting for it was cancelled
+
+
+async def load_products(shop_id: int):
+    """:func:`get_products_at_shop` without blocking the event loop: directly when the
+    list is loaded, else in a worker thread, joining a load already in flight."""
+    if products_loaded(shop_id):
+        return get_products_at_shop(shop_id)
+    fetch = _product_fetches.get(shop_id)
+    if fetch is None:
+        fetch = asyncio.ensure_future(asyncio.to_thread(get_products_at_shop, shop_id))
+        fetch.add_done_callback(lambda done: _fetch_done(shop_id, done))
+        _product_fetches[shop_id] = fetch
+    # A cancelled caller stops waiting without cancelling the load for the others
+    return await asyncio.shield(fetch)
+
+
+# Matches requested while the previous batch ran: (flavor IDs, shop IDs by the matrix
+# they are matched in, result)
+_match_queue: list[
+    tuple[frozenset[int], list[tuple[AvailabilityMatrix, list[int]]], asyncio.Future]
+] = []
+_matching = False
+
+
+def _match_batch(favorites: list[tuple[frozenset[int], list]]):
+    """Match every request with one ``match_all`` per matrix its shops are in."""
+    by_matrix: dict[int, tuple[AvailabilityMatrix, list]] = {}
+    for i, (flavor_ids, parts) in enumerate(favorites):
+        for matrix, shop_ids in parts:
+            by_matrix.setdefault(id(matrix), (matrix, []))[1].append(
+                (i, flavor_ids, shop_ids)
+            )
+    results: list[list[tuple[int, int]]] = [[] for _ in favorites]
+    for matrix, requests in by_matrix.values():
+        found = matrix.match_all(matrix.subscribers((f, s) for _, f, s in requests))
+        for (i, _, _), matches in zip(requests, found):
+            results[i] += matches
+    return results
+
+
+def _run_matches() -> None:
+    """Match every queued request with one :meth:`AvailabilityMatrix.match_all` in a
+    worker thread, then whatever was queued meanwhile."""
+    global _matching
+    if _matching or not _match_queue:
+        return
+    batch = list(_match_queue)
+    _match_queue.clear()
+    _matching = True
+
+    def done(task: asyncio.Future) -> None:
+        global _matching
+        _matching = False
+        for i, (_, _, result) in enumerate(batch):
+            if result.done():
+                continue  # the caller was cancelled
+            if task.cancelled():
+                result.cancel()
+            elif task.exception() is not None:
+                result.set_exception(task.exception())
+            else:
+                result.set_result(task.result()[i])
+        _run_matches()
+
+    favorites = [(flavor_ids, parts) for flavor_ids, parts, _ in batch]
+    asyncio.ensure_future(asyncio.to_thread(_match_batch, favorites)).add_done_callback(
+        done
+    )
+
+
+async def match_favorites(flavor_ids, shop_ids) -> list[tuple[int, int]]:
+    """:meth:`AvailabilityMatrix.match` in a worker thread.
+
+    Shops the current snapshot has are matched in its matrix, others in the one
+    fetches update. Requests made while a match runs (a morning wave of daily checks)
+    are queued and answered together by the next one, with a single vectorized
+    ``match_all`` per matrix.
+    """
+    snapshot = current_snapshot()
+    shop_ids = list(shop_ids)
+    if snapshot is None:
+        parts = [(availability, shop_ids)]
+    else:
+        frozen = [shop_id for shop_id in shop_ids if snapshot.has_products(shop_id)]
+        fetched = [
+            shop_id for shop_id in shop_ids if not snapshot.has_products(shop_id)
+        ]
+        parts = [(snapshot.availability, frozen), (availability, fetched)]
+    result = asyncio.get_running_loop().create_future()
+    _match_queue.append((frozenset(flavor_ids), parts, result))
+    if len(_match_queue) == 1:
+        asyncio.get_running_loop().call_soon(_run_matches)
+    return await result
+
 
 # ── Lookup helpers ──────────────────────────────────────────────────
 
@@ -0,0 +1,158 @@
+"""Cross-process cache tier — fetched data shared by every bot process on the host via SQLite."""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key     TEXT PRIMARY KEY,
+    value   BLOB NOT NULL,  -- pickled
+    expires REAL NOT NULL   -- unix time
+);
+
+-- A process holding an unexpired lease on a key is loading it; others wait for it
+CREATE TABLE IF NOT EXISTS leases (
+    key   TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    until REAL NOT NULL
+);
+"""
+
+
+class SharedCache:
+    """Key-value cache in a SQLite (WAL) file, with cross-process single-flight loading.
+
+    When an entry is missing or expired, the first process to take the key's *lease*
+    calls the loader and stores the result; the others poll until it appears. A lease
+    expires after *lease_seconds*, so a process that dies mid-load doesn't block the
+    key, and a failed load releases it for the next caller to retry.
+
+    Values are pickled, so only processes running the same code should share a file.
+
+    Args:
+        path: SQLite database file (created on first use, readable by its owner only).
+        lease_seconds: How long a loading process may hold a key.
+        poll_interval: Longest wait between checks while another process loads a key
+            (polling starts at 5 ms and backs off to this).
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 30.0, poll_interval=0.05):
+        self._path = path
+        self._lease_seconds = lease_seconds
+        self._poll_interval = poll_interval
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._hits = self._loads = self._waits = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+            # The file holds the API session token
+            os.close(os.open(self._path, os.O_CREAT | os.O_WRONLY, 0o600))
+            db = sqlite3.connect(
+                self._path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get(self, key: str, min_ttl: float = 0.0) -> tuple[bool, Any, float]:
+        """Look up *key*, treating entries that expire within *min_ttl* as missing.
+
+        Returns:
+            ``(found, value, seconds until expiry)``.
+        """
+        now = time.time()
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT value, expires FROM entries WHERE key = ? AND expires > ?",
+                    (key, now + min_ttl),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return False, None, 0.0
+        return True, pickle.loads(row[0]), row[1] - now
+
+    def put(self, key: str, value: Any, ttl: float) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+                (key, blob, time.time() + ttl),
+            )
+
+    def _acquire(self, key: str, owner: str) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._connect().execute(
+                "INSERT INTO leases (key, owner, until) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, "
+                "until = excluded.until WHERE leases.until < ?",
+                (key, owner, now + self._lease_seconds, now),
+            )
+            return cursor.rowcount == 1
+
+    def _release(self, key: str, owner: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner)
+            )
+
+    def get_or_load(
+        self, key: str, loader: Callable[[], Any], ttl: float, min_ttl: float = 0.0
+    ) -> tuple[Any, float]:
+        """Return the cached value of *key*, loading it in exactly one process if needed.
+
+        Args:
+            key: The cache key.
+            loader: Computes the value on a miss.
+            ttl: Time to live of a freshly loaded value (in seconds).
+            min_ttl: Entries expiring sooner than this are reloaded, so that a refresh
+                ahead of expiry fetches new data instead of re-reading the old.
+
+        Returns:
+            ``(value, seconds until expiry)``.
+        """
+        owner = uuid.uuid4().hex
+        delay = 0.005
+        while True:
+            found, value, expires_in = self.get(key, min_ttl)
+            if found:
+                self._hits += 1
+                return value, expires_in
+            if self._acquire(key, owner):
+                try:
+                    # Another process may have stored it before the lease was free
+                    found, value, expires_in = self.get(key, min_ttl)
+                    if found:
+                        self._hits += 1
+                        return value, expires_in
+                    value = loader()
+                    self.put(key, value, ttl)
+                    self._loads += 1
+                    return value, ttl
+                finally:
+                    self._release(key, owner)
+            self._waits += 1
+            time.sleep(delay)
+            delay = min(2 * delay, self._poll_interval)
+
+    def stats(self) -> dict[str, int]:
+        """Hits, loads and lease waits of this process since start-up."""
+        return {"hits": self._hits, "loads": self._loads, "waits": self._waits}
@@ -0,0 +1,357 @@
+"""Catalog snapshots — the fetched catalog as an immutable, versioned, memory-mapped file.
+
+Shops and product lists are stored pickled, and unpickling can run arbitrary code: a
+snapshot must only be writable by the ingest process and the bot itself (never put it
+on a volume other users or services can write to).
+"""
+
+import bisect
+import contextvars
+import logging
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"BOSKOSNP"
+FORMAT_VERSION = 1
+
+# magic, format version, section count, snapshot version, created (unix time)
+_HEADER = struct.Struct("<8sIIQd")
+# tag, offset, length
+_SECTION = struct.Struct("<4s4xQQ")
+_ALIGN = 8
+
+# Sections
+_SHOP_IDS = b"SHOP"  # uint32[shops], ascending
+_SHOPS = b"SOBJ"  # blobs: pickled Shop, by shop index
+_PRODUCTS = b"PROD"  # blobs: pickled product list by shop index (empty: not fetched)
+_FLAVORS = b"FLAV"  # blobs: UTF-8 display name by snapshot flavor ID
+_STOCK = b"STCK"  # uint32: offsets[shops + 1], then the flavor IDs of every shop
+_CATALOG = b"CTLG"  # pickled list of every product (empty: not fetched)
+
+
+def _blobs(items: list[bytes]) -> bytes:
+    """Pack byte strings as a count, ``uint64`` offsets and the concatenated data."""
+    offsets = [0]
+    for item in items:
+        offsets.append(offsets[-1] + len(item))
+    return b"".join([struct.pack(f"<Q{len(offsets)}Q", len(items), *offsets), *items])
+
+
+class _Blobs:
+    """Zero-copy view of :func:`_blobs` output."""
+
+    def __init__(self, view: memoryview):
+        (count,) = struct.unpack_from("<Q", view)
+        self._offsets = view[8 : 16 + 8 * count].cast("Q")
+        self._data = view[16 + 8 * count :]
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> memoryview:
+        return self._data[self._offsets[i] : self._offsets[i + 1]]
+
+
+def _uint32(values: Iterable[int]) -> bytes:
+    values = list(values)
+    return struct.pack(f"<{len(values)}I", *values)
+
+
+# ── Writing ─────────────────────────────────────────────────────────
+
+
+def read_version(path: str) -> int:
+    """Version of the snapshot at *path* (0 if there is none, or it is unreadable)."""
+    try:
+        with open(path, "rb") as file:
+            magic, _, _, version, _ = _HEADER.unpack(file.read(_HEADER.size))
+    except (OSError, struct.error):
+        return 0
+    return version if magic == MAGIC else 0
+
+
+def write_snapshot(
+    path: str,
+    shops: list,
+    products: dict[int, list],
+    catalog_products: list,
+    normalize: Callable[[str], str],
+) -> int:
+    """Publish a new version of the snapshot at *path*.
+
+    The file is written beside *path* and renamed over it, so readers see either the
+    old version or the new one, complete. Processes that have the old one mapped keep
+    reading it until they re-open the path.
+
+    Args:
+        shops: Every shop.
+        products: Product list of each shop whose list was fetched, by shop ID.
+        catalog_products: The whole product catalog, for searches (empty if unknown).
+        normalize: The normalization that decides when two names are the same flavor.
+
+    Returns:
+        The version written: one more than the version it replaces.
+    """
+    shops = sorted(shops, key=lambda shop: shop.id)
+    flavor_ids: dict[str, int] = {}
+    names: list[bytes] = []
+
+    def flavor_id(name: str) -> int:
+        key = normalize(name)
+        if key not in flavor_ids:
+            flavor_ids[key] = len(names)
+            names.append(name.encode())
+        return flavor_ids[key]
+
+    for product in catalog_products:
+        flavor_id(product.name)
+    offsets, stocked = [0], []
+    for shop in shops:
+        stocked += sorted({flavor_id(p.name) for p in products.get(shop.id, ())})
+        offsets.append(len(stocked))
+
+    dump = lambda value: pickle.dumps(value, pickle.HIGHEST_PROTOCOL)  # noqa: E731
+    sections = {
+        _SHOP_IDS: _uint32(shop.id for shop in shops),
+        _SHOPS: _blobs([dump(shop) for shop in shops]),
+        _PRODUCTS: _blobs(
+            [dump(products[s.id]) if s.id in products else b"" for s in shops]
+        ),
+        _FLAVORS: _blobs(names),
+        _STOCK: _uint32(offsets + stocked),
+        _CATALOG: dump(catalog_products) if catalog_products else b"",
+    }
+
+    version = read_version(path) + 1
+    table, body = [], bytearray()
+    start = _HEADER.size + _SECTION.size * len(sections)
+    for tag, payload in sections.items():
+        body += bytes(-(start + len(body)) % _ALIGN)
+        table.append(_SECTION.pack(tag, start + len(body), len(payload)))
+        body += payload
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            file.write(
+                _HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), version, time.time())
+            )
+            file.write(b"".join(table))
+            file.write(body)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+        raise
+    # Make the rename itself durable
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+    return version
+
+
+# ── Reading ─────────────────────────────────────────────────────────
+
+
+class CatalogSnapshot:
+    """One version of the snapshot, mapped into memory.
+
+    Lookups read the mapping in place: shop IDs and stocked flavor IDs are ``uint32``
+    memoryviews over it, and only the shops and product lists actually asked for are
+    unpickled (once each). The mapping stays valid after the file is replaced, for as
+    long as the object is in use.
+
+    ``catalog``, ``availability`` and ``search`` hold what the bot derives from this
+    version (its flavor catalog view, availability matrix and seeded search cache); the
+    store's *on_swap* sets them before the version is served.
+
+    Args:
+        path: Snapshot file written by :func:`write_snapshot`.
+
+    Raises:
+        ValueError: If *path* isn't a snapshot of this format.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        try:
+            magic, fmt, count, self.version, self.created = _HEADER.unpack_from(view)
+        except struct.error:
+            magic = fmt = None
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(
+                f"{path} is not a format {FORMAT_VERSION} catalog snapshot"
+            )
+        sections = {}
+        for i in range(count):
+            tag, offset, length = _SECTION.unpack_from(
+                view, _HEADER.size + i * _SECTION.size
+            )
+            sections[tag] = view[offset : offset + length]
+
+        self._shop_ids = sections[_SHOP_IDS].cast("I")
+        self._shop_blobs = _Blobs(sections[_SHOPS])
+        self._product_blobs = _Blobs(sections[_PRODUCTS])
+        self._flavor_blobs = _Blobs(sections[_FLAVORS])
+        stock = sections[_STOCK].cast("I")
+        self._stock_offsets = stock[: len(self._shop_ids) + 1]
+        self._stock = stock[len(self._shop_ids) + 1 :]
+        self._catalog_blob = sections[_CATALOG]
+
+        self._shops: list | None = None
+        self._products: dict[int, list] = {}
+        self._catalog: list | None = None
+
+        self.catalog = self.availability = self.search = None
+
+    def __repr__(self) -> str:
+        return f"<CatalogSnapshot v{self.version}: {len(self._shop_ids)} shops>"
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was written."""
+        return time.time() - self.created
+
+    def _index(self, shop_id: int) -> int | None:
+        i = bisect.bisect_left(self._shop_ids, shop_id)
+        if i < len(self._shop_ids) and self._shop_ids[i] == shop_id:
+            return i
+        return None
+
+    def shop_ids(self) -> memoryview:
+        """IDs of every shop, ascending."""
+        return self._shop_ids
+
+    def shops(self) -> list:
+        """Every shop, ordered by ID."""
+        if self._shops is None:
+            blobs = self._shop_blobs
+            self._shops = [pickle.loads(blobs[i]) for i in range(len(blobs))]
+        return self._shops
+
+    def has_products(self, shop_id: int) -> bool:
+        """Whether the snapshot has the product list of *shop_id*."""
+        i = self._index(shop_id)
+        return i is not None and len(self._product_blobs[i]) > 0
+
+    def products(self, shop_id: int) -> list | None:
+        """Product list of *shop_id*, or ``None`` if the snapshot doesn't have it."""
+        products = self._products.get(shop_id)
+        if products is None and self.has_products(shop_id):
+            blob = self._product_blobs[self._index(shop_id)]
+            products = self._products[shop_id] = pickle.loads(blob)
+        return products
+
+    def catalog_products(self) -> list:
+        """Every product in the catalog (empty if it wasn't fetched)."""
+        if self._catalog is None:
+            blob = self._catalog_blob
+            self._catalog = pickle.loads(blob) if len(blob) else []
+        return self._catalog
+
+    def flavor_names(self) -> list[str]:
+        """Display names of all flavors, indexed by snapshot flavor ID."""
+        blobs = self._flavor_blobs
+        return [str(blobs[i], "utf-8") for i in range(len(blobs))]
+
+    def flavor_ids_at(self, shop_id: int) -> memoryview:
+        """Snapshot flavor IDs stocked at *shop_id*, ascending (empty if unknown)."""
+        i = self._index(shop_id)
+        if i is None:
+            return self._stock[:0]
+        return self._stock[self._stock_offsets[i] : self._stock_offsets[i + 1]]
+
+
+# The snapshot an update was pinned to, for every handler and task working on it
+_pinned: contextvars.ContextVar[CatalogSnapshot | None] = contextvars.ContextVar(
+    "catalog_snapshot", default=None
+)
+
+
+class SnapshotStore:
+    """The latest snapshot at *path*, re-opened when a writer replaces the file.
+
+    Only :meth:`refresh` touches the file system (and decodes a new version), so that
+    it can run in a worker thread; the other methods return what it last found. A
+    snapshot older than *max_age* (e.g. its writer stopped) is no longer served.
+
+    Args:
+        path: Snapshot file (may not exist yet).
+        max_age: Seconds a snapshot is served for after it was written.
+        on_swap: Called with each newly opened version before it is served.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age: float,
+        on_swap: Callable[[CatalogSnapshot], None] | None = None,
+    ):
+        self._path = path
+        self._max_age = max_age
+        self._on_swap = on_swap
+        self._file: tuple | None = None
+        self._snapshot: CatalogSnapshot | None = None
+        self._lock = threading.Lock()
+
+    def latest(self) -> CatalogSnapshot | None:
+        """The newest fresh snapshot found so far, or ``None`` if there is none."""
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.age > self._max_age:
+            return None
+        return snapshot
+
+    def refresh(self) -> CatalogSnapshot | None:
+        """Open the snapshot at the path if it is a new version, then :meth:`latest`."""
+        with self._lock:
+            try:
+                stat = os.stat(self._path)
+            except FileNotFoundError:
+                return self.latest()
+            file = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if file != self._file:
+                self._file = file
+                self._open()
+        return self.latest()
+
+    def _open(self) -> None:
+        try:
+            snapshot = CatalogSnapshot(self._path)
+        except (OSError, ValueError):
+            logger.warning("Cannot open catalog snapshot %s", self._path, exc_info=True)
+            return
+        if self._snapshot is not None and snapshot.version == self._snapshot.version:
+            return
+        if self._on_swap is not None:
+            self._on_swap(snapshot)
+        self._snapshot = snapshot
+        logger.info("Serving catalog snapshot %s", snapshot)
+
+    def pin(self) -> CatalogSnapshot | None:
+        """Make the latest snapshot the one :meth:`pinned` returns in this context (an
+        update's task, and the tasks and threads it starts)."""
+        snapshot = self.latest()
+        _pinned.set(snapshot)
+        return snapshot
+
+    def pinned(self) -> CatalogSnapshot | None:
+        """The snapshot pinned in this context, else the latest one."""
+        snapshot = _pinned.get()
+        return snapshot if snapshot is not None else self.latest()
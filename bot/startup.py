@@ -0,0 +1,37 @@
+"""Start-up phase timing — how long each phase takes until the first reply is sent."""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Logs the duration of each named start-up phase and the time to the first reply.
+
+    The clock starts when this module is imported, which ``bot.bosko_bot`` does before
+    any heavy import.
+    """
+
+    def __init__(self):
+        self.started = self._last = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.first_reply: float | None = None
+
+    def mark(self, phase: str) -> None:
+        """Record that *phase* has just finished."""
+        now = time.perf_counter()
+        self.phases[phase] = now - self._last
+        self._last = now
+        logger.info("Start-up: %s took %.0f ms", phase, self.phases[phase] * 1000)
+
+    def reply_sent(self) -> None:
+        """Record the first handled update (a no-op after the first call)."""
+        if self.first_reply is None:
+            self.first_reply = time.perf_counter() - self.started
+            logger.info(
+                "Start-up: first reply %.0f ms after start", self.first_reply * 1000
+            )
+
+
+startup = StartupTimer()
@@ -0,0 +1,13 @@
+"""Text normalization — the keys flavor and shop names are matched on."""
+
+from unidecode import unidecode
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip, and transliterate to ASCII for fuzzy matching.
+
+    Kept free of bot state so that worker processes can run it (see
+    :func:`bot.workers.cpu_map`); use the cached :func:`bot.services.normalize`
+    everywhere else.
+    """
+    return unidecode(text.strip().lower())
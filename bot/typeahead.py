@@ -0,0 +1,201 @@
+"""Inline-query typeahead — flavor and shop suggestions answered from an in-memory prefix index."""
+
+import asyncio
+import bisect
+import heapq
+import logging
+from collections import Counter, defaultdict
+from typing import NamedTuple
+
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Update
+from telegram.ext import Application, ContextTypes
+
+from bot.constants import INLINE_CACHE_TIME_SECONDS, INLINE_RESULTS_LIMIT
+from bot.formatting import format_flavor_name
+from bot.services import (
+    current_catalog,
+    data_version,
+    get_cached_shops,
+    normalize,
+    normalize_all,
+)
+
+logger = logging.getLogger(__name__)
+
+# Prefixes up to this long match so many names that their top suggestions are kept
+_MEMO_PREFIX_LENGTH = 2
+_MAX_SHOPS_LISTED = 10
+
+
+class Suggestion(NamedTuple):
+    key: str  # normalized name
+    popularity: tuple[int, int]  # (users with it as a favorite, secondary signal)
+    article: InlineQueryResultArticle
+
+
+class PrefixIndex:
+    """Suggestions found by the prefix of any word of their name, most popular first.
+
+    Each word start of each normalized name is a key in one sorted list, so every
+    suggestion matching a prefix lies in the contiguous run of keys starting with it,
+    found by bisection. The top suggestions of very short prefixes, whose runs cover
+    much of the index, are computed once and remembered.
+
+    Args:
+        suggestions: Everything that can be suggested.
+    """
+
+    def __init__(self, suggestions: list[Suggestion]):
+        self._suggestions = suggestions
+        pairs = sorted(
+            (suggestion.key[start:], i)
+            for i, suggestion in enumerate(suggestions)
+            for start in range(len(suggestion.key))
+            if start == 0 or suggestion.key[start - 1] == " "
+        )
+        self._keys = [key for key, _ in pairs]
+        self._refs = [i for _, i in pairs]
+        self._memo: dict[tuple[str, int], list[Suggestion]] = {}
+
+    def __len__(self) -> int:
+        return len(self._suggestions)
+
+    def lookup(self, prefix: str, limit: int) -> list[Suggestion]:
+        """The *limit* most popular suggestions with a word starting with *prefix*
+        (which must be normalized)."""
+        memo = len(prefix) <= _MEMO_PREFIX_LENGTH
+        if memo and (prefix, limit) in self._memo:
+            return self._memo[(prefix, limit)]
+
+        low = bisect.bisect_left(self._keys, prefix)
+        high = bisect.bisect_left(self._keys, prefix + "\uffff", low)
+        matches = {self._refs[i] for i in range(low, high)}
+        top = heapq.nlargest(
+            limit, sorted(matches), key=lambda i: self._suggestions[i].popularity
+        )
+        result = [self._suggestions[i] for i in top]
+        if memo:
+            self._memo[(prefix, limit)] = result
+        return result
+
+
+def _article(result_id: str, title: str, description: str, text: str):
+    return InlineQueryResultArticle(
+        id=result_id,
+        title=title,
+        description=description,
+        input_message_content=InputTextMessageContent(text),
+    )
+
+
+def favorite_counts(user_data) -> tuple[Counter, Counter]:
+    """How many users have each flavor (by normalized name) and shop as a favorite."""
+    flavors, shops = Counter(), Counter()
+    for data in user_data.values():
+        flavors.update(normalize(name) for name in data.get("favorite_flavors", []))
+        shops.update(shop.id for shop in data.get("favorite_shops", []))
+    return flavors, shops
+
+
+def build_suggestions(
+    favorite_flavors: Counter, favorite_shops: Counter
+) -> list[Suggestion]:
+    """Suggestions for every known flavor and shop.
+
+    Flavors rank by how many users have them as a favorite, then by how many shops
+    stock them; shops by favorites, then by check-ins.
+    """
+    shops = get_cached_shops()
+    shop_names = {shop.id: shop.name for shop in shops}
+    catalog = current_catalog()
+    stocked_at: dict[int, list[str]] = defaultdict(list)
+    for shop_id, flavor_ids in catalog.stock().items():
+        if shop_id in shop_names:
+            for flavor_id in flavor_ids:
+                stocked_at[flavor_id].append(shop_names[shop_id])
+
+    names = catalog.names()
+    keys = normalize_all(names + [shop.name for shop in shops])
+    suggestions = []
+    for flavor_id, name in enumerate(names):
+        title = format_flavor_name(name)
+        where = sorted(stocked_at.get(flavor_id, ()))
+        if where:
+            description = f"In stock at {len(where)} shops"
+            text = f"🍦 {title} is in stock at: " + ", ".join(where[:_MAX_SHOPS_LISTED])
+            if len(where) > _MAX_SHOPS_LISTED:
+                text += f" and {len(where) - _MAX_SHOPS_LISTED} more"
+        else:
+            description = "Not in stock at the shops checked"
+            text = f"🍦 {title}"
+        key = keys[flavor_id]
+        suggestions.append(
+            Suggestion(
+                key,
+                (favorite_flavors[key], len(where)),
+                _article(f"flavor:{flavor_id}", title, description, text),
+            )
+        )
+
+    for shop, key in zip(shops, keys[len(names) :]):
+        address = f"{shop.address}, {shop.city.name}"
+        suggestions.append(
+            Suggestion(
+                key,
+                (favorite_shops[shop.id], shop.checkInsCount),
+                _article(
+                    f"shop:{shop.id}", shop.name, address, f"🏪 {shop.name}\n{address}"
+                ),
+            )
+        )
+    return suggestions
+
+
+# ── Current index ───────────────────────────────────────────────────
+_index: PrefixIndex | None = None
+_index_version: int | None = None
+_rebuild_lock = asyncio.Lock()
+
+
+async def refresh_typeahead(application: Application) -> None:
+    """Rebuild the index in a worker thread if the data changed since it was built."""
+    global _index, _index_version
+    async with _rebuild_lock:
+        version = data_version()
+        if version == _index_version:
+            return
+        # Counted here, as handlers may change user_data while the thread runs
+        favorites = favorite_counts(application.user_data)
+        try:
+            index = await asyncio.to_thread(
+                lambda: PrefixIndex(build_suggestions(*favorites))
+            )
+        except Exception:
+            logger.warning("Typeahead index rebuild failed", exc_info=True)
+            return
+        _index, _index_version = index, version
+        logger.info("Typeahead index rebuilt with %d suggestions", len(index))
+
+
+async def inline_suggestions(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Answer an inline query (``@bot pista…``) with matching flavors and shops.
+
+    Every keystroke is answered from the index. The suggestions are the same for
+    everyone, so Telegram may serve repeats of a query from its own cache. Before the
+    first index is built, queries get an uncached empty answer while it builds.
+    """
+    if _index is None:
+        if not _rebuild_lock.locked():
+            context.application.create_task(refresh_typeahead(context.application))
+        await update.inline_query.answer([], cache_time=0, is_personal=False)
+        return
+    suggestions = _index.lookup(
+        normalize(update.inline_query.query), INLINE_RESULTS_LIMIT
+    )
+    await update.inline_query.answer(
+        [suggestion.article for suggestion in suggestions],
+        cache_time=INLINE_CACHE_TIME_SECONDS,
+        is_personal=False,
+    )
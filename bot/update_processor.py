@@ -0,0 +1,68 @@
+"""Concurrent update processing that keeps updates from the same chat in order."""
+
+import asyncio
+from collections.abc import Awaitable
+from typing import Any
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Process up to ``max_concurrent_updates`` updates at once, one at a time per chat.
+
+    Updates from different chats run concurrently, so a slow handler only delays its own
+    chat. Updates from the same chat are serialized in arrival order, which keeps
+    ``ConversationHandler`` state transitions consistent.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self._chat_locks: dict[int, asyncio.Lock] = {}
+        self._waiting: dict[int, int] = {}
+
+    @staticmethod
+    def _chat_key(update: object) -> int | None:
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat:
+            return update.effective_chat.id
+        if update.effective_user:
+            return update.effective_user.id
+        return None
+
+    async def process_update(  # type: ignore[misc]  # final in PTB
+        self, update: object, coroutine: Awaitable[Any]
+    ) -> None:
+        """Wait for the update's chat to be free, then for one of the concurrency slots.
+
+        Overridden so that updates queued behind their own chat hold no slot: a chat
+        with many pending updates occupies one slot, not one per update.
+        """
+        key = self._chat_key(update)
+        if key is None:
+            await super().process_update(update, coroutine)
+            return
+
+        lock = self._chat_locks.setdefault(key, asyncio.Lock())
+        self._waiting[key] = self._waiting.get(key, 0) + 1
+        try:
+            async with lock:
+                await super().process_update(update, coroutine)
+        finally:
+            self._waiting[key] -= 1
+            if not self._waiting[key]:
+                del self._waiting[key]
+                del self._chat_locks[key]
+
+    async def do_process_update(
+        self, update: object, coroutine: Awaitable[Any]
+    ) -> None:
+        """Await *coroutine* (the chat lock is already held)."""
+        await coroutine
+
+    async def initialize(self) -> None:
+        """Nothing to allocate."""
+
+    async def shutdown(self) -> None:
+        """Nothing to release."""
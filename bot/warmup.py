@@ -0,0 +1,163 @@
+"""Cache warm-up and background refresh — keep the catalog, shops and product lists loaded ahead of use."""
+
+import asyncio
+import logging
+from time import perf_counter
+from typing import Collection
+
+from telegram.ext import ContextTypes
+
+from bot.constants import CACHE_REFRESH_AHEAD_SECONDS, CACHE_REFRESH_CONCURRENCY
+from bot.prefetch import prefetcher
+from bot.services import (
+    cache_stats,
+    check_snapshot,
+    current_snapshot,
+    get_cached_shops,
+    get_catalog_products,
+    get_products_at_shop,
+)
+from bot.typeahead import refresh_typeahead
+
+logger = logging.getLogger(__name__)
+
+# Entries expiring within this many seconds are refreshed now rather than on the next
+# run, which may start late
+REFRESH_AHEAD_SECONDS = CACHE_REFRESH_AHEAD_SECONDS
+
+
+# Shops whose last product-list refresh failed, retried on the next run
+_failed: set[int] = set()
+
+
+def _expiring(expires_in: float | None) -> bool:
+    return expires_in is not None and expires_in < REFRESH_AHEAD_SECONDS
+
+
+async def refresh_product_lists(shop_ids, concurrency: int) -> int:
+    """Re-fetch the product lists of *shop_ids* in worker threads, most popular first.
+
+    Popularity is the access frequency recorded by the product cache, so with a small
+    budget the lists users actually ask for are refreshed before the long tail.
+
+    Returns:
+        The number of product lists fetched successfully.
+    """
+    cache = get_products_at_shop.cache
+    ordered = sorted(shop_ids, key=lambda shop_id: -cache.frequency((shop_id,)))
+    slots = asyncio.Semaphore(concurrency)
+
+    async def refresh(shop_id: int) -> bool:
+        async with slots:
+            expires_in = cache.expires_in((shop_id,))
+            if expires_in is not None and not _expiring(expires_in):
+                return True  # loaded by a user request while this one was queued
+            try:
+                await asyncio.to_thread(get_products_at_shop.refresh, shop_id)
+            except Exception:
+                logger.warning(
+                    "Error refreshing products of shop %s", shop_id, exc_info=True
+                )
+                _failed.add(shop_id)
+                return False
+            _failed.discard(shop_id)
+            return True
+
+    # Tasks start in list order, so the semaphore hands out slots popular-first
+    return sum(await asyncio.gather(*(refresh(shop_id) for shop_id in ordered)))
+
+
+async def _refresh_if_due(cached):
+    """Refresh an argument-less cached function if its result is missing or expiring."""
+    expires_in = cached.cache.expires_in(())
+    if expires_in is None or _expiring(expires_in):
+        return await asyncio.to_thread(cached.refresh)
+    return cached()
+
+
+async def refresh_caches(load_missing: Collection[int] = ()) -> None:
+    """Refresh the catalog, the shop list and every product list about to expire.
+
+    Args:
+        load_missing: Shops whose product lists to load if they aren't cached at all.
+            Empty for the periodic refresh: once warmed up, a missing list was evicted
+            by the cache policy, and re-fetching it would only churn the cache.
+    """
+    if current_snapshot() is not None:
+        return  # kept up to date by the ingest process
+    started = perf_counter()
+    try:
+        await _refresh_if_due(get_catalog_products)
+    except Exception:
+        logger.warning("Error refreshing the product catalog", exc_info=True)
+    shops = await _refresh_if_due(get_cached_shops)
+
+    cache = get_products_at_shop.cache
+    due = []
+    for shop in shops:
+        expires_in = cache.expires_in((shop.id,))
+        if _expiring(expires_in) or (
+            expires_in is None and (shop.id in load_missing or shop.id in _failed)
+        ):
+            due.append(shop.id)
+    if not due:
+        return
+
+    refreshed = await refresh_product_lists(due, CACHE_REFRESH_CONCURRENCY)
+    logger.info(
+        "Refreshed %d/%d product lists in %.1fs",
+        refreshed,
+        len(due),
+        perf_counter() - started,
+    )
+
+
+async def warm_up_shops() -> None:
+    """Load the shop list in a worker thread (at start-up, before the first update).
+
+    This also imports the API client, which start-up otherwise defers. With a catalog
+    snapshot, opening it takes its place.
+    """
+    try:
+        if await asyncio.to_thread(check_snapshot) is not None:
+            return
+    except Exception:
+        logger.warning("Catalog snapshot failed to load", exc_info=True)
+    try:
+        await asyncio.to_thread(get_cached_shops.refresh)
+    except Exception:
+        logger.warning("Shop list warm-up failed", exc_info=True)
+
+
+async def warm_up_caches(shop_ids: Collection[int] = ()) -> None:
+    """Load the whole catalog in a few search requests, and the product lists of
+    *shop_ids* concurrently (after start-up).
+
+    Other shops' product lists are loaded when first needed.
+    """
+    try:
+        await refresh_caches(load_missing=frozenset(shop_ids))
+    except Exception:
+        logger.warning("Cache warm-up failed", exc_info=True)
+
+
+async def check_snapshot_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Repeating job: switch to a newly published catalog snapshot (in a worker thread,
+    as opening one decodes its shops)."""
+    try:
+        await asyncio.to_thread(check_snapshot)
+    except Exception:
+        logger.warning("Catalog snapshot check failed", exc_info=True)
+
+
+async def refresh_caches_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Repeating job: refresh cache entries ahead of their expiry, and the typeahead
+    index if they changed; logs how well the caches and speculative prefetch are
+    paying off."""
+    try:
+        await refresh_caches()
+    except Exception:
+        logger.warning("Cache refresh failed", exc_info=True)
+    await refresh_typeahead(context.application)
+    logger.info("Caches: %s", cache_stats())
+    logger.info("Speculative prefetch: %s", prefetcher.stats())
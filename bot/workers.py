@@ -0,0 +1,74 @@
+"""Worker pools — where blocking and CPU-heavy stages run instead of the event loop."""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from bot.constants import CPU_WORKERS, WORKER_THREADS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Fewer items than this are mapped in the calling thread: shipping them to a worker
+# process would cost more than the work
+CPU_MAP_MIN_ITEMS = 256
+
+_processes: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _processes
+    with _lock:
+        if _processes is None:
+            # Spawned rather than forked: the bot process is multi-threaded
+            _processes = ProcessPoolExecutor(
+                CPU_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info("Started %d CPU worker processes", CPU_WORKERS)
+        return _processes
+
+
+def install(loop: asyncio.AbstractEventLoop) -> None:
+    """Give *loop* ``WORKER_THREADS`` worker threads as its default executor, where
+    ``asyncio.to_thread`` runs: upstream fetches, response parsing (pydantic-core) and
+    vectorized matching (NumPy), none of which pays to move to another process.
+
+    The loop shuts them down when it closes.
+    """
+    loop.set_default_executor(
+        ThreadPoolExecutor(WORKER_THREADS, thread_name_prefix="worker")
+    )
+
+
+def cpu_map(
+    fn: Callable[[T], R],
+    items: list[T],
+    inline: Callable[[T], R] | None = None,
+) -> list[R]:
+    """``[fn(item) for item in items]``, split across the ``CPU_WORKERS`` worker
+    processes — for pure-Python work, which holds the GIL for as long as it runs.
+
+    Blocks until done, so call it from a worker thread. *fn* must be a module-level
+    function of a module that is cheap to import, with picklable arguments and
+    results. With no worker processes (or few items) it maps in the calling thread,
+    with *inline* if given (e.g. a cached version of *fn*).
+    """
+    if not CPU_WORKERS or len(items) < CPU_MAP_MIN_ITEMS:
+        return list(map(inline or fn, items))
+    chunk_size = -(-len(items) // CPU_WORKERS)
+    return list(_process_pool().map(fn, items, chunksize=chunk_size))
+
+
+def shutdown() -> None:
+    """Stop the worker processes."""
+    global _processes
+    with _lock:
+        if _processes is not None:
+            _processes.shutdown(wait=False, cancel_futures=True)
+            _processes = None
@@ -1,15 +1,21 @@
+import argparse
 import os
+import sys
+
 from api.client import BoskoAPI
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def main():
-    email = os.getenv("EMAIL")
-    password = os.getenv("PASSWORD")
 
+def login() -> BoskoAPI:
     api = BoskoAPI()
-    api.login(email, password)
+    api.login(os.getenv("EMAIL"), os.getenv("PASSWORD"))
+    return api
+
+
+def demo():
+    api = login()
 
     shops = api.shops.get_all()
 
@@ -21,11 +27,58 @@ def main():
     for product in products:
         print(f"- {product.name} (ID: {product.id})")
 
-    query = 'mascarpone'
+    query = "mascarpone"
     results = api.products.search(query=query)
     print(f"Search results for '{query}':")
     for product in results:
         print(f"- {product.name} (ID: {product.id})")
 
+
+def export(args):
+    from api.export import export_catalog, get_writer
+
+    try:
+        get_writer(args.format)
+    except ImportError as error:
+        sys.exit(str(error))
+
+    stats = export_catalog(
+        login(),
+        args.output,
+        fmt=args.format,
+        concurrency=args.concurrency,
+        incremental=args.incremental,
+    )
+    if stats.failed:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bosko API client")
+    commands = parser.add_subparsers(dest="command")
+
+    export_parser = commands.add_parser(
+        "export", help="dump every shop and its current products"
+    )
+    export_parser.add_argument("output", help="directory to write the export into")
+    export_parser.add_argument(
+        "--format", choices=("jsonl", "csv", "parquet"), default="jsonl"
+    )
+    export_parser.add_argument(
+        "--concurrency", type=int, default=8, help="product lists fetched at once"
+    )
+    export_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rewrite shops whose inventory changed since the last export",
+    )
+
+    args = parser.parse_args()
+    if args.command == "export":
+        export(args)
+    else:
+        demo()
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()